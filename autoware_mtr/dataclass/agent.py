@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import ClassVar
 from typing import Sequence
 
@@ -154,10 +154,10 @@ class AgentState:
     uuid: str
     timestamp: float = 0.0
     label_id: int = 0
-    xyz: NDArray = np.zeros(3)
-    size: NDArray = np.zeros(3)
+    xyz: NDArray = field(default_factory=lambda: np.zeros(3))
+    size: NDArray = field(default_factory=lambda: np.zeros(3))
     yaw: float = 0.0
-    vxy: NDArray = np.zeros(2)
+    vxy: NDArray = field(default_factory=lambda: np.zeros(2))
     is_valid: bool = False
 
     @property
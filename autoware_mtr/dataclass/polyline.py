@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, ClassVar, Sequence
 
 import numpy as np
 # from dataclasses import field
@@ -12,9 +12,9 @@ from awml_pred.datatype import MapType
 from awml_pred.dataclass.utils import to_np_f32
 
 if TYPE_CHECKING:
-    from awml_pred.typing import NDArray, NDArrayF32
+    from awml_pred.typing import NDArray, NDArrayF32, NDArrayI64
 
-__all__ = ["Polyline"]
+__all__ = ["Polyline", "PolylineTable"]
 
 
 @define
@@ -167,3 +167,113 @@ class Polyline:
             )
         else:
             return self.xyz if as_3d else self.xy
+
+
+def _compute_directions(points: NDArray, offsets: NDArrayI64) -> NDArray:
+    """Return normalized directions of points of concatenated polylines, the first of each polyline is zeros.
+
+    Args:
+    ----
+        points (NDArray): Points of concatenated polylines in shape (N, D).
+        offsets (NDArrayI64): Start indices of polylines in shape (S + 1,).
+
+    Returns:
+    -------
+        NDArray: Directions in shape (N, D), which are same as `Polyline.dxyz` or `Polyline.dxy`.
+
+    """
+    diff = np.zeros_like(points)
+    diff[1:] = points[1:] - points[:-1]
+    starts = offsets[:-1]
+    diff[starts[starts < len(points)]] = 0
+    norm = np.clip(np.linalg.norm(diff, axis=-1, keepdims=True), a_min=1e-6, a_max=1e9)
+    return np.divide(diff, norm)
+
+
+@define(frozen=True)
+class PolylineTable:
+    """Columnar store of polylines, where points of all polylines are stored in a flat array.
+
+    Points are read-only, so that polylines and exports sliced from them are not modified through another view.
+
+    Attributes
+    ----------
+        points (NDArrayF32): Points `(x, y, z, dx, dy, dz, type_id)` of all polylines in shape (N, 7).
+        offsets (NDArrayI64): Start indices of polylines in `points` in shape (S + 1,), the last item is N.
+        ids (NDArrayI64): IDs of segments which polylines belong to in shape (S,).
+        types (NDArrayI64): Type ids of polylines in shape (S,).
+
+    """
+
+    points: NDArrayF32
+    offsets: NDArrayI64
+    ids: NDArrayI64
+    types: NDArrayI64
+
+    @classmethod
+    def from_polylines(cls, ids: Sequence[int], polylines: Sequence[Polyline]) -> Self:
+        """Construct an instance by concatenating polylines.
+
+        Args:
+        ----
+            ids (Sequence[int]): IDs of segments which polylines belong to.
+            polylines (Sequence[Polyline]): `Polyline` instances.
+
+        Returns:
+        -------
+            PolylineTable: Constructed instance.
+
+        """
+        lengths = np.array([len(polyline) for polyline in polylines], dtype=np.int64)
+        offsets = np.zeros(len(polylines) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        types = np.array([polyline.polyline_type.value for polyline in polylines], dtype=np.int64)
+
+        points = np.empty((offsets[-1], Polyline.FULL_DIM3D), dtype=np.float32)
+        if len(points) > 0:
+            xyz = np.concatenate([polyline.xyz for polyline in polylines], axis=0)
+            points[:, :3] = xyz
+            points[:, 3:6] = _compute_directions(xyz, offsets)
+        points[:, 6] = np.repeat(types, lengths)
+        points.flags.writeable = False
+        return cls(points, offsets, np.array(ids, dtype=np.int64), types)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> NDArrayF32:
+        """Return points of a polyline without copy.
+
+        Args:
+        ----
+            index (int): Index of the polyline.
+
+        Returns:
+        -------
+            NDArrayF32: Points in shape (P, 7).
+
+        """
+        return self.points[self.offsets[index] : self.offsets[index + 1]]
+
+    def as_array(self, *, full: bool = False, as_3d: bool = True) -> NDArrayF32:
+        """Return points of all polylines, which are not copied except of `full=True` and `as_3d=False`.
+
+        Args:
+        ----
+            full (bool, optional): Indicates whether to return `(x, y, z, dx, dy, dz, type_id)`.
+                If `False`, returns `(x, y, z)`. Defaults to False.
+            as_3d (bool, optional): If `True` returns array containing 3D coordinates.
+                Otherwise, 2D coordinates. Defaults to True.
+
+        Returns:
+        -------
+            NDArrayF32: Points in shape (N, D).
+
+        """
+        if not full:
+            return self.points[:, :3] if as_3d else self.points[:, :2]
+        if as_3d:
+            return self.points
+        # NOTE: 2D directions are normalized in 2D, so they can not be sliced from 3D directions
+        xy = self.points[:, :2]
+        return np.concatenate([xy, _compute_directions(xy, self.offsets), self.points[:, 6:]], axis=1)
@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING, Any
 import numpy as np
 from typing_extensions import Self
 
-from .polyline import Polyline
+from .polyline import Polyline, PolylineTable
 
 if TYPE_CHECKING:
     from awml_pred.typing import NDArrayF32
@@ -20,6 +20,9 @@ __all__ = ("AWMLStaticMap", "LaneSegment", "BoundarySegment", "CrosswalkSegment"
 class AWMLStaticMap:
     """Represents a static map information.
 
+    Polylines of all segments are stored in a `PolylineTable` on construction in the order of `get_all_polyline`,
+    and polylines of segments become read-only views of it. Therefore, segments must not be modified after that.
+
     Attributes
     ----------
         id (str): Unique ID associated with this map.
@@ -45,6 +48,50 @@ class AWMLStaticMap:
         assert all(
             isinstance(item, BoundarySegment) for _, item in self.boundary_segments.items()
         ), "Expected all items are BoundarySegments."
+        self._build_polyline_table()
+
+    def _build_polyline_table(self) -> None:
+        ids: list[int] = []
+        polylines: list[Polyline] = []
+        for lane in self.lane_segments.values():
+            ids.append(lane.id)
+            polylines.append(lane.polyline)
+            # NOTE: boundaries are deduplicated only in each lane, which is same as `LaneSegment.as_array`
+            lane_boundary_ids: set[int] = set()
+            for bound in (*lane.left_boundaries, *lane.right_boundaries):
+                if bound.id in lane_boundary_ids:
+                    continue
+                lane_boundary_ids.add(bound.id)
+                ids.append(bound.id)
+                polylines.append(bound.polyline)
+        for crosswalk in self.crosswalk_segments.values():
+            ids.append(crosswalk.id)
+            polylines.append(crosswalk.polygon)
+        for boundary in self.boundary_segments.values():
+            ids.append(boundary.id)
+            polylines.append(boundary.polyline)
+
+        table = PolylineTable.from_polylines(ids, polylines)
+        # NOTE: a polyline shared by segments views its first occurrence
+        viewed: set[int] = set()
+        for i, polyline in enumerate(polylines):
+            if id(polyline) in viewed:
+                continue
+            viewed.add(id(polyline))
+            # NOTE: `object.__setattr__` skips the converter of `Polyline`, which copies waypoints
+            object.__setattr__(polyline, "waypoints", table[i][:, :3])
+        object.__setattr__(self, "_polyline_table", table)
+
+    @property
+    def polyline_table(self) -> PolylineTable:
+        """Return the columnar store of all polylines.
+
+        Returns
+        -------
+            PolylineTable: Polylines in the order of `get_all_polyline`.
+
+        """
+        return self._polyline_table
 
     @classmethod
     def from_dict(cls, data: dict) -> Self:
@@ -126,37 +173,32 @@ class AWMLStaticMap:
         Returns:
         -------
             list[Polyline] | NDArrayF32: List of `Polyline` instances or `NDArray`.
+                The array is a read-only view of `polyline_table` except of `full=True` and `as_3d=False`.
 
         """
-        all_polyline: list[Polyline | NDArrayF32] = []
+        if as_array:
+            return self._polyline_table.as_array(full=full, as_3d=as_3d)
+
+        all_polyline: list[Polyline] = []
 
-        duplicate_boundary_ids = []
+        duplicate_boundary_ids: set[int] = set()
 
         def _append_boundaries(boundaries: list[BoundarySegment]) -> None:
             for bound in boundaries:
                 if bound.id in duplicate_boundary_ids:
                     continue
-                duplicate_boundary_ids.append(bound.id)
+                duplicate_boundary_ids.add(bound.id)
                 all_polyline.append(bound.polyline)
 
         for _, lane in self.lane_segments.items():
-            if as_array:
-                all_polyline.append(lane.as_array(full=full, as_3d=as_3d))
-            else:
-                all_polyline.append(lane.polyline)
-                _append_boundaries(lane.left_boundaries)
-                _append_boundaries(lane.right_boundaries)
+            all_polyline.append(lane.polyline)
+            _append_boundaries(lane.left_boundaries)
+            _append_boundaries(lane.right_boundaries)
         for _, crosswalk in self.crosswalk_segments.items():
-            if as_array:
-                all_polyline.append(crosswalk.as_array(full=full, as_3d=as_3d))
-            else:
-                all_polyline.append(crosswalk.polygon)
+            all_polyline.append(crosswalk.polygon)
         for _, boundary in self.boundary_segments.items():
-            if as_array:
-                all_polyline.append(boundary.as_array(full=full, as_3d=as_3d))
-            else:
-                all_polyline.append(boundary.polyline)
-        return np.concatenate(all_polyline, axis=0, dtype=np.float32) if as_array else all_polyline
+            all_polyline.append(boundary.polyline)
+        return all_polyline
 
 
 def _to_boundary_segment(x: list[dict | BoundarySegment]) -> list[BoundarySegment]:
@@ -242,13 +284,13 @@ class LaneSegment:
 
         """
         all_polyline: list[NDArrayF32] = [self.polyline.as_array(full=full, as_3d=as_3d)]
-        duplicate_boundary_ids: list[int] = []
+        duplicate_boundary_ids: set[int] = set()
 
         def _append_boundaries(boundaries: list[BoundarySegment]) -> None:
             for bound in boundaries:
                 if bound.id in duplicate_boundary_ids:
                     continue
-                duplicate_boundary_ids.append(bound.id)
+                duplicate_boundary_ids.add(bound.id)
                 all_polyline.append(bound.as_array(full=full, as_3d=as_3d))
 
         _append_boundaries(self.left_boundaries)
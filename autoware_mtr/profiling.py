@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import os.path as osp
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+import torch
+from torch.profiler import ProfilerActivity, profile, record_function
+
+__all__ = ("PROFILE_MODES", "TickProfiler")
+
+# names of profilers which can be enabled in a window
+PROFILE_MODES = ("torch", "cprofile", "tracemalloc")
+
+logger = logging.getLogger(__name__)
+
+
+class TickProfiler:
+    """Profile a bounded window of ticks, which is requested at runtime.
+
+    In a window, `torch.profiler` records every tick with input shapes, `cProfile` records only the preprocess, and
+    `tracemalloc` snapshots are taken at the start and the end. On the end of the window, a Chrome trace, pstats and
+    snapshots are written to the output directory with the prefix of the start time and the window index.
+
+    A requested window starts on the next tick, so that `torch.profiler` is enabled on the thread running ticks.
+    Errors on writing files are reported by `on_error` and do not propagate to the tick.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_finish: Callable[[list[str]], None] | None = None,
+        on_error: Callable[[str], None] | None = None,
+        top_k: int = 30,
+    ) -> None:
+        """Construct instance.
+
+        Args:
+            directory (str): Output directory.
+            on_finish (Callable[[list[str]], None] | None, optional): Function called with written files on the end
+                of each window. Defaults to None.
+            on_error (Callable[[str], None] | None, optional): Function called with the message of each error on
+                writing files. Defaults to None, which logs a warning.
+            top_k (int, optional): Number of lines of the tracemalloc diff written as text. Defaults to 30.
+        """
+        self.directory = directory
+        self.on_finish = on_finish
+        self.on_error = on_error or logger.warning
+        self.top_k = top_k
+
+        self._lock = threading.Lock()
+        self._request: tuple[int, tuple[str, ...]] | None = None
+        self._remaining = 0
+        self._num_windows = 0
+        self._prefix = ""
+        self._torch_profiler: profile | None = None
+        self._cprofile: cProfile.Profile | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._started_tracemalloc = False
+
+    @property
+    def is_active(self) -> bool:
+        return self._remaining > 0 or self._request is not None
+
+    def start(self, num_ticks: int, modes: Sequence[str] = PROFILE_MODES) -> None:
+        """Request a window of ticks, which replaces the current window on the next tick.
+
+        Args:
+            num_ticks (int): Number of ticks to be profiled, 0 to stop the current window.
+            modes (Sequence[str], optional): Names of profilers in `PROFILE_MODES`. Defaults to all of them.
+        """
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"Unexpected profile modes: {sorted(unknown)}, expected in {PROFILE_MODES}")
+        with self._lock:
+            self._request = (num_ticks, tuple(modes))
+
+    @contextmanager
+    def tick(self, name: str = "tick") -> Iterator[None]:
+        """Profile a tick in the window, and finish the window after the last tick.
+
+        Args:
+            name (str, optional): Name of the tick recorded by `torch.profiler`. Defaults to "tick".
+        """
+        files = []
+        with self._lock:
+            if self._request is not None:
+                files += self._finish()
+                self._begin(*self._request)
+                self._request = None
+            active = self._remaining > 0
+            recording = self._torch_profiler is not None
+
+        try:
+            if recording:
+                with record_function(name):
+                    yield
+            else:
+                yield
+        finally:
+            if active:
+                with self._lock:
+                    self._remaining -= 1
+                    if self._remaining <= 0:
+                        files += self._finish()
+            if files and self.on_finish is not None:
+                self.on_finish(files)
+
+    @contextmanager
+    def preprocess(self) -> Iterator[None]:
+        """Profile the preprocess by `cProfile` in the window."""
+        cprofile = self._cprofile
+        if cprofile is None:
+            yield
+            return
+
+        cprofile.enable()
+        try:
+            yield
+        finally:
+            cprofile.disable()
+
+    def _begin(self, num_ticks: int, modes: tuple[str, ...]) -> None:
+        if num_ticks <= 0:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            self.on_error(f"Profiling window is not started: {e}")
+            return
+        # NOTE: the window index makes prefixes unique for windows started in the same second
+        self._prefix = osp.join(self.directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{self._num_windows:03d}")
+        self._num_windows += 1
+        self._remaining = num_ticks
+
+        if "torch" in modes:
+            activities = [ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(ProfilerActivity.CUDA)
+            self._torch_profiler = profile(activities=activities, record_shapes=True)
+            self._torch_profiler.__enter__()
+        if "cprofile" in modes:
+            self._cprofile = cProfile.Profile()
+        if "tracemalloc" in modes:
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start()
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def _write(self, filepath: str, write: Callable[[str], None], files: list[str]) -> None:
+        """Write a file, and append it to the written files unless it fails.
+
+        Args:
+            filepath (str): Output file path.
+            write (Callable[[str], None]): Function writing the file to the path.
+            files (list[str]): Written files.
+        """
+        try:
+            write(filepath)
+        except (OSError, RuntimeError) as e:
+            self.on_error(f"Failed to write {filepath}: {e}")
+            return
+        # NOTE: `export_chrome_trace` logs errors of kineto without raising
+        if not osp.exists(filepath):
+            self.on_error(f"Failed to write {filepath}")
+            return
+        files.append(filepath)
+
+    def _write_diff(self, filepath: str, snapshot: tracemalloc.Snapshot) -> None:
+        with open(filepath, "w") as f:
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[: self.top_k]:
+                f.write(f"{stat}\n")
+
+    def _finish(self) -> list[str]:
+        files = []
+        if self._torch_profiler is not None:
+            self._torch_profiler.__exit__(None, None, None)
+            self._write(f"{self._prefix}_torch.json", self._torch_profiler.export_chrome_trace, files)
+            self._torch_profiler = None
+
+        if self._cprofile is not None:
+            self._write(f"{self._prefix}_preprocess.pstats", self._cprofile.dump_stats, files)
+            self._cprofile = None
+
+        if self._snapshot is not None:
+            snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            for suffix, item in (("start", self._snapshot), ("end", snapshot)):
+                self._write(f"{self._prefix}_tracemalloc_{suffix}.snapshot", item.dump, files)
+            self._write(
+                f"{self._prefix}_tracemalloc_diff.txt",
+                lambda filepath: self._write_diff(filepath, snapshot),
+                files,
+            )
+            self._snapshot = None
+
+        self._remaining = 0
+        return files
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Sequence
+
+import numpy as np
+import torch
+
+from autoware_mtr.dataclass.agent import AgentTrajectory
+from awml_pred.typing import NDArray, Tensor
+
+__all__ = ("PredictionReuse", "reproject_trajectories", "shift_trajectories")
+
+
+def _normalize_angle(angle: float) -> float:
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def _rotate(xy: Tensor, angle: float) -> Tensor:
+    cos, sin = math.cos(angle), math.sin(angle)
+    x, y = xy[..., 0], xy[..., 1]
+    return torch.stack((cos * x - sin * y, sin * x + cos * y), dim=-1)
+
+
+def reproject_trajectories(pred_trajs: Tensor, source: AgentTrajectory, target: AgentTrajectory) -> Tensor:
+    """Re-project predicted trajectories from the source agent centric coords to the target agent centric coords.
+
+    Args:
+        pred_trajs (Tensor): Predicted trajectories in the shape of (N, M, T, 7), where positions and velocities are
+            at [0:2] and [5:7] respectively.
+        source (AgentTrajectory): Latest state of the agent which `pred_trajs` is centered on, in the shape of (1, D).
+        target (AgentTrajectory): Latest state of the agent to be centered on, in the shape of (1, D).
+
+    Returns:
+        Tensor: Re-projected trajectories in the same shape.
+    """
+    source_yaw, target_yaw = float(source.yaw[0]), float(target.yaw[0])
+    dyaw = source_yaw - target_yaw
+    offset = torch.as_tensor(source.xy[0] - target.xy[0], dtype=pred_trajs.dtype, device=pred_trajs.device)
+
+    ret = pred_trajs.clone()
+    ret[..., 0:2] = _rotate(pred_trajs[..., 0:2], dyaw) + _rotate(offset, -target_yaw)
+    ret[..., 5:7] = _rotate(pred_trajs[..., 5:7], dyaw)
+    return ret
+
+
+def shift_trajectories(pred_trajs: Tensor, elapsed: float, time_step: float = 0.1) -> Tensor:
+    """Advance predicted trajectories by the elapsed time.
+
+    Waypoints are linearly interpolated onto the shifted timestamps, and waypoints beyond the prediction horizon hold
+    the last waypoint, so that the shape is kept without extrapolation.
+
+    Args:
+        pred_trajs (Tensor): Predicted trajectories in the shape of (N, M, T, D), where the t-th waypoint is at
+            `(t + 1) * time_step`.
+        elapsed (float): Elapsed time since the prediction in [s].
+        time_step (float, optional): Time step of waypoints in [s]. Defaults to 0.1.
+
+    Returns:
+        Tensor: Shifted trajectories in the same shape.
+    """
+    num_future = pred_trajs.shape[-2]
+    if elapsed <= 0.0 or num_future < 2:
+        return pred_trajs
+
+    positions = (torch.arange(num_future, dtype=torch.float64) + elapsed / time_step).clamp(max=num_future - 1)
+    start = positions.floor().long().clamp(max=num_future - 2)
+    weight = (positions - start).to(device=pred_trajs.device, dtype=pred_trajs.dtype)[:, None]
+    start = start.to(pred_trajs.device)
+    return pred_trajs[..., start, :] + weight * (pred_trajs[..., start + 1, :] - pred_trajs[..., start, :])
+
+
+@dataclass
+class _ReuseEntry:
+    timestamp: float
+    target: AgentTrajectory
+    agents: NDArray
+    agent_ids: list[str]
+    pred_scores: Tensor
+    pred_trajs: Tensor
+
+
+@dataclass
+class PredictionReuse:
+    """A class to reuse the last prediction of each target while its scene does not change.
+
+    The scene is compared against the inputs of the last inference, not the last reuse,
+    so that small changes can not accumulate without inference.
+
+    Attributes:
+        position_threshold (float): Threshold of the target displacement in [m].
+        yaw_threshold (float): Threshold of the target rotation in [rad].
+        velocity_threshold (float): Threshold of the target velocity change in [m/s].
+        agent_threshold (float): Threshold of the displacement of every agent in [m].
+        max_age (float): Max age of the reused prediction in [s].
+        time_step (float): Time step of predicted waypoints in [s].
+    """
+
+    position_threshold: float = 0.1
+    yaw_threshold: float = 0.02
+    velocity_threshold: float = 0.1
+    agent_threshold: float = 0.2
+    max_age: float = 1.0
+    time_step: float = 0.1
+    entries: dict[str, _ReuseEntry] = field(default_factory=dict, init=False)
+
+    def is_changed(self, key: str, target: AgentTrajectory, agents: AgentTrajectory, agent_ids: Sequence[str]) -> bool:
+        """Check whether the scene has changed since the last inference.
+
+        Args:
+            key (str): Key of the target, e.g. uuid.
+            target (AgentTrajectory): Latest state of the target in the shape of (1, D).
+            agents (AgentTrajectory): Latest states of all agents in the shape of (N, D).
+            agent_ids (Sequence[str]): Uuids of agents.
+
+        Returns:
+            bool: True if there is no previous inference or any difference exceeds thresholds.
+        """
+        entry = self.entries.get(key)
+        if entry is None or list(agent_ids) != entry.agent_ids:
+            return True
+
+        if np.linalg.norm(target.xy[0] - entry.target.xy[0]) > self.position_threshold:
+            return True
+        if abs(_normalize_angle(float(target.yaw[0] - entry.target.yaw[0]))) > self.yaw_threshold:
+            return True
+        if np.linalg.norm(target.vxy[0] - entry.target.vxy[0]) > self.velocity_threshold:
+            return True
+
+        is_valid = agents.is_valid.astype(bool)
+        if np.any(is_valid != entry.agents[:, AgentTrajectory.IS_VALID_IDX].astype(bool)):
+            return True
+        displacements = np.linalg.norm(agents.xy[is_valid] - entry.agents[is_valid][:, AgentTrajectory.XY_IDX], axis=-1)
+        return bool(np.any(displacements > self.agent_threshold))
+
+    def lookup(
+        self,
+        key: str,
+        timestamp: float,
+        target: AgentTrajectory,
+        agents: AgentTrajectory,
+        agent_ids: Sequence[str],
+    ) -> tuple[Tensor, Tensor] | None:
+        """Return the last prediction re-projected and time-shifted to the current target, if reusable.
+
+        Args:
+            key (str): Key of the target, e.g. uuid.
+            timestamp (float): Current time in [s].
+            target (AgentTrajectory): Latest state of the target in the shape of (1, D).
+            agents (AgentTrajectory): Latest states of all agents in the shape of (N, D).
+            agent_ids (Sequence[str]): Uuids of agents.
+
+        Returns:
+            tuple[Tensor, Tensor] | None: Predicted scores and trajectories centered on the current target,
+                or None if the scene has changed or the prediction is too old.
+        """
+        if self.is_changed(key, target, agents, agent_ids):
+            return None
+        return self.extrapolate(key, timestamp, target)
+
+    def extrapolate(self, key: str, timestamp: float, target: AgentTrajectory) -> tuple[Tensor, Tensor] | None:
+        """Return the last prediction re-projected and time-shifted to the current target regardless of the scene.
+
+        Args:
+            key (str): Key of the target, e.g. uuid.
+            timestamp (float): Current time in [s].
+            target (AgentTrajectory): Latest state of the target in the shape of (1, D).
+
+        Returns:
+            tuple[Tensor, Tensor] | None: Predicted scores and trajectories centered on the current target,
+                or None if there is no prediction or it is too old.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        elapsed = timestamp - entry.timestamp
+        if elapsed > self.max_age:
+            return None
+
+        pred_trajs = shift_trajectories(entry.pred_trajs, elapsed, self.time_step)
+        return entry.pred_scores, reproject_trajectories(pred_trajs, entry.target, target)
+
+    def update(
+        self,
+        key: str,
+        timestamp: float,
+        target: AgentTrajectory,
+        agents: AgentTrajectory,
+        agent_ids: Sequence[str],
+        pred_scores: Tensor,
+        pred_trajs: Tensor,
+    ) -> None:
+        """Store the inputs and outputs of the inference.
+
+        Args:
+            key (str): Key of the target, e.g. uuid.
+            timestamp (float): Time of the inference in [s].
+            target (AgentTrajectory): Latest state of the target in the shape of (1, D).
+            agents (AgentTrajectory): Latest states of all agents in the shape of (N, D).
+            agent_ids (Sequence[str]): Uuids of agents.
+            pred_scores (Tensor): Predicted scores in the shape of (1, M).
+            pred_trajs (Tensor): Predicted trajectories centered on the target in the shape of (1, M, T, 7).
+        """
+        self.entries[key] = _ReuseEntry(
+            timestamp=timestamp,
+            target=target,
+            agents=agents.waypoints.copy(),
+            agent_ids=list(agent_ids),
+            pred_scores=pred_scores,
+            pred_trajs=pred_trajs,
+        )
+
+    def clear(self) -> None:
+        """Clear all stored predictions."""
+        self.entries.clear()
@@ -6,9 +6,10 @@ from torch import nn
 
 from awml_pred.typing import Module, Optimizer, Tensor
 
-__all__ = ("get_checkpoint_state", "save_checkpoint", "load_checkpoint", "is_parallel")
+__all__ = ("get_checkpoint_state", "save_checkpoint", "load_checkpoint", "load_checkpoint_file", "is_parallel")
 
 CHECKPOINT_KEYS = ("epoch", "model", "optimizer")
+SAFETENSORS_SUFFIX = ".safetensors"
 
 
 def get_checkpoint_state(model: Module, optimizer: Optimizer, epoch: int) -> dict[str, Any]:
@@ -63,12 +64,47 @@ def save_checkpoint(state: dict, filename: str) -> None:
     torch.save(state, filename)
 
 
+def load_checkpoint_file(filename: str, map_location: torch.device | None = None, *, mmap: bool = False) -> dict:
+    """Load checkpoint from file.
+
+    `.safetensors` files are weights-only checkpoints converted by `python -m awml_pred.deploy.convert_checkpoint`,
+    which are always memory-mapped and the epoch is stored in metadata.
+
+    Args:
+    ----
+        filename (str): Checkpoint filepath, `.pth` or `.safetensors`.
+        map_location (torch.device | None, optional): Device to map tensors. Defaults to None.
+        mmap (bool, optional): Whether to memory-map `.pth` files instead of reading them into memory,
+            which requires the zipfile serialization of `torch.save`. Defaults to False.
+
+    Returns:
+    -------
+        dict: Checkpoint containing `model` and `epoch` at least.
+
+    """
+    if filename.endswith(SAFETENSORS_SUFFIX):
+        try:
+            from safetensors import safe_open
+        except ImportError as e:
+            msg = f"safetensors is required to load {filename}"
+            raise ImportError(msg) from e
+
+        device = "cpu" if map_location is None else str(map_location)
+        with safe_open(filename, framework="pt", device=device) as f:
+            metadata = f.metadata() or {}
+            model_state = {key: f.get_tensor(key) for key in f.keys()}
+        return {"model": model_state, "epoch": int(metadata.get("epoch", -1))}
+
+    return torch.load(filename, map_location=map_location, weights_only=True, mmap=mmap)
+
+
 def load_checkpoint(
     model: Module,
     checkpoint: dict | str,
     optimizer: Optimizer | None = None,
     *,
     is_distributed: bool = False,
+    mmap: bool = False,
 ) -> tuple[nn.Module, int]:
     """Load checkpoint.
 
@@ -78,6 +114,9 @@ def load_checkpoint(
         checkpoint (dict): State dict of checkpoint or filepath.
         optimizer (Optimizer | None, optional): Optimizer. Defaults to None.
         is_distributed (bool): Whether distributed is. Defaults to False.
+        mmap (bool, optional): Whether to memory-map the checkpoint file. Weights with the same dtype as the model
+            are assigned without copy, so processes loading the same file share the page cache until weights are
+            modified. Defaults to False.
 
     Returns:
     -------
@@ -86,7 +125,7 @@ def load_checkpoint(
     """
     if not isinstance(checkpoint, dict):
         map_location = None if is_distributed else torch.device("cpu")
-        checkpoint = torch.load(checkpoint, map_location=map_location, weights_only=True)
+        checkpoint = load_checkpoint_file(checkpoint, map_location=map_location, mmap=mmap)
 
     if is_parallel(model):
         state_dict: dict = model.module.state_dict()
@@ -109,12 +148,13 @@ def load_checkpoint(
             )
             logging.warning(msg)
             continue
-        load_dict[name] = ckpt_weight
+        # weights-only checkpoints may be stored in a different dtype, which is cast back to the dtype of the model
+        load_dict[name] = ckpt_weight.to(weight.dtype)
 
     if is_parallel(model):
-        model.module.load_state_dict(load_dict)
+        model.module.load_state_dict(load_dict, assign=mmap)
     else:
-        model.load_state_dict(load_dict)
+        model.load_state_dict(load_dict, assign=mmap)
 
     if optimizer is not None and checkpoint.get("optimizer"):
         optimizer.load_state_dict(checkpoint["optimizer"])
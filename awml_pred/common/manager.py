@@ -17,6 +17,7 @@ __all__ = (
     "SCENARIO_FILTERS",
     "LR_SCHEDULERS",
     "OPTIMIZERS",
+    "BACKENDS",
 )
 
 
@@ -214,3 +215,4 @@ TRANSFORMS = ModuleManager("transforms")
 SCENARIO_FILTERS = ModuleManager("scenario_filters")
 LR_SCHEDULERS = ModuleManager("lr_schedulers")
 OPTIMIZERS = ModuleManager("optimizers")
+BACKENDS = ModuleManager("backends")
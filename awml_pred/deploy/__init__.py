@@ -0,0 +1,7 @@
+from .backends import *  # noqa
+from .export import *  # noqa
+from .fuse import *  # noqa
+from .quantization import *  # noqa
+from .recorder import *  # noqa
+from .rewriters import *  # noqa
+from .utils import *  # noqa
@@ -0,0 +1,7 @@
+from .base import *  # noqa
+from .bucket import *  # noqa
+from .builder import *  # noqa
+from .eager import *  # noqa
+from .ort import *  # noqa
+from .torch_compile import *  # noqa
+from .torchscript import *  # noqa
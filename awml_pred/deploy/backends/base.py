@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from abc import ABCMeta, abstractmethod
+from typing import TYPE_CHECKING
+
+import torch
+
+from awml_pred.common import items2device
+
+from .bucket import ShapeBucket
+
+if TYPE_CHECKING:
+    from awml_pred.typing import DeviceLike, Module, Tensor
+
+__all__ = ("PRECISIONS", "BaseBackend")
+
+# Names of inference precisions and their data types.
+PRECISIONS = {"fp32": torch.float32, "bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+class BaseBackend(metaclass=ABCMeta):
+    """Base class of inference backends, which run `MTR` on inputs keyed by the argument names of forward.
+
+    Backends which build a graph for each input shape, e.g. by tracing or compilation, set `requires_static_shapes`,
+    and callers should pad inputs to a bounded set of shapes with `ShapeBucket` for them. Other backends run inputs of
+    any shape as they are.
+    """
+
+    requires_static_shapes: bool = True
+
+    def __init__(
+        self,
+        model: Module | None,
+        device: DeviceLike = "cpu",
+        shape_bucket: ShapeBucket | dict | None = None,
+        precision: str = "fp32",
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            model (Module | None): Model loaded with weights. None is allowed for backends which run
+                serialized models.
+            device (DeviceLike, optional): Device name. Defaults to "cpu".
+            shape_bucket (ShapeBucket | dict | None, optional): Shape bucket or its configuration.
+                Defaults to None.
+            precision (str, optional): Inference precision, which is one of `fp32`, `bf16` or `fp16`.
+                Weights are stored in the precision and forward runs under autocast, while numerically sensitive
+                operations are kept in fp32 by themselves. Defaults to "fp32".
+
+        """
+        if precision not in PRECISIONS:
+            msg = f"Unexpected precision: {precision}, expected one of {tuple(PRECISIONS)}"
+            raise ValueError(msg)
+        self.device = torch.device(device)
+        self.dtype = PRECISIONS[precision]
+        if self.dtype == torch.float16 and self.device.type != "cuda":
+            msg = "fp16 is only supported on CUDA, use bf16 on CPU"
+            raise ValueError(msg)
+
+        if model is not None:
+            model = model.cuda(self.device) if self.device.type == "cuda" else model.cpu()
+            model.to(self.dtype).eval()
+        self.model = model
+
+        if isinstance(shape_bucket, dict):
+            shape_bucket = ShapeBucket(**shape_bucket)
+        self.shape_bucket = shape_bucket
+
+    def __call__(self, **inputs: Tensor) -> tuple[Tensor, Tensor]:
+        """Run inference.
+
+        Args:
+        ----
+            **inputs (Tensor): Inputs of `MTR`.
+
+        Returns:
+        -------
+            tuple[Tensor, Tensor]: Predicted scores in (B, M) and trajectories in (B, M, T, 7).
+
+        """
+        num_target = len(inputs["obj_trajs"])
+        if self.shape_bucket is not None:
+            inputs = self.shape_bucket.pad(inputs)
+        inputs = items2device(inputs, self.device)
+        if self.dtype == torch.float32:
+            with torch.no_grad():
+                pred_scores, pred_trajs = self.forward(inputs)
+        else:
+            with torch.no_grad(), torch.autocast(device_type=self.device.type, dtype=self.dtype):
+                pred_scores, pred_trajs = self.forward(inputs)
+            pred_scores, pred_trajs = pred_scores.float(), pred_trajs.float()
+        # outputs of padded targets are dropped
+        return pred_scores[:num_target], pred_trajs[:num_target]
+
+    @abstractmethod
+    def forward(self, inputs: dict[str, Tensor]) -> tuple[Tensor, Tensor]:
+        """Run inference on the inputs, which are already padded and allocated on the device.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Inputs of `MTR`.
+
+        Returns:
+        -------
+            tuple[Tensor, Tensor]: Predicted scores and trajectories.
+
+        """
+        ...
+
+    def warmup(self, inputs: dict[str, Tensor], num_iters: int = 1) -> None:
+        """Run inference for every bucket shape, which triggers compilation before the first actual input.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Sample inputs, which should have the smallest shapes.
+            num_iters (int, optional): Number of iterations for each shape. Defaults to 1.
+
+        """
+        samples = [inputs] if self.shape_bucket is None else list(self.shape_bucket.expand(inputs))
+        for sample in samples:
+            for _ in range(num_iters):
+                self(**sample)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from itertools import product
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+import torch
+import torch.nn.functional as F
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Tensor
+
+__all__ = ("ShapeBucket",)
+
+# Input keys which have the number of targets (B) at dim=0.
+TARGET_KEYS = (
+    "obj_trajs",
+    "obj_trajs_mask",
+    "obj_trajs_last_pos",
+    "map_polylines",
+    "map_polylines_mask",
+    "map_polylines_center",
+    "track_index_to_predict",
+    "intention_points",
+)
+# Input keys which have the number of agents (A) at dim=1.
+AGENT_KEYS = ("obj_trajs", "obj_trajs_mask", "obj_trajs_last_pos")
+# Input keys which have the number of polylines (K) at dim=1.
+POLYLINE_KEYS = ("map_polylines", "map_polylines_mask", "map_polylines_center")
+
+
+class ShapeBucket:
+    """Pad the number of targets, agents and polylines to a small set of sizes.
+
+    Backends which specialize on input shapes, e.g. `torch.compile` and TorchScript, are compiled once per
+    bucket instead of once per observed shape. Padded agents and polylines are invalid in masks, so they do not
+    contribute to the outputs. Padded targets are copies of the last target, whose outputs are dropped by
+    the backend.
+    """
+
+    def __init__(
+        self,
+        agent_sizes: Sequence[int] | None = None,
+        polyline_sizes: Sequence[int] | None = None,
+        target_sizes: Sequence[int] | None = None,
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            agent_sizes (Sequence[int] | None, optional): Bucket sizes of the number of agents.
+                Defaults to None, which does not pad agents.
+            polyline_sizes (Sequence[int] | None, optional): Bucket sizes of the number of polylines.
+                Defaults to None, which does not pad polylines.
+            target_sizes (Sequence[int] | None, optional): Bucket sizes of the number of targets.
+                Defaults to None, which does not pad targets.
+
+        """
+        self.agent_sizes = sorted(agent_sizes) if agent_sizes else []
+        self.polyline_sizes = sorted(polyline_sizes) if polyline_sizes else []
+        self.target_sizes = sorted(target_sizes) if target_sizes else []
+
+    @property
+    def max_num_target(self) -> int | None:
+        """Return the largest bucket size of the number of targets, or None if targets are not padded."""
+        return self.target_sizes[-1] if self.target_sizes else None
+
+    @staticmethod
+    def _get_size(num: int, sizes: list[int]) -> int:
+        """Return the smallest bucket size, which is larger than or equal to the input.
+
+        Args:
+        ----
+            num (int): Actual size.
+            sizes (list[int]): Sorted bucket sizes.
+
+        Returns:
+        -------
+            int: Bucket size. If no bucket can contain the input, returns the input as it is.
+
+        """
+        for size in sizes:
+            if num <= size:
+                return size
+        return num
+
+    @staticmethod
+    def _pad(inputs: dict[str, Tensor], keys: tuple[str, ...], size: int) -> None:
+        for key in keys:
+            item = inputs[key]
+            num_pad = size - item.shape[1]
+            if num_pad <= 0:
+                continue
+            # pad=(0, 0) for each trailing dimension after dim=1
+            pad = (0, 0) * (item.dim() - 2) + (0, num_pad)
+            inputs[key] = F.pad(item, pad, mode="constant", value=0)
+
+    @staticmethod
+    def _pad_target(inputs: dict[str, Tensor], size: int) -> None:
+        for key in TARGET_KEYS:
+            item = inputs[key]
+            num_pad = size - item.shape[0]
+            if num_pad <= 0:
+                continue
+            # NOTE: the last target is repeated, because targets without valid agents are not supported by the model
+            inputs[key] = torch.cat((item, item[-1:].expand(num_pad, *item.shape[1:])))
+
+    def pad(self, inputs: dict[str, Tensor]) -> dict[str, Tensor]:
+        """Pad the inputs to the bucket sizes.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Inputs of `MTR`.
+
+        Returns:
+        -------
+            dict[str, Tensor]: Padded inputs.
+
+        """
+        return self.pad_to(
+            inputs,
+            num_agent=self._get_size(inputs[AGENT_KEYS[0]].shape[1], self.agent_sizes),
+            num_polyline=self._get_size(inputs[POLYLINE_KEYS[0]].shape[1], self.polyline_sizes),
+            num_target=self._get_size(inputs[AGENT_KEYS[0]].shape[0], self.target_sizes),
+        )
+
+    def pad_to(
+        self,
+        inputs: dict[str, Tensor],
+        num_agent: int,
+        num_polyline: int,
+        num_target: int | None = None,
+    ) -> dict[str, Tensor]:
+        """Pad the inputs to the specified sizes.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Inputs of `MTR`.
+            num_agent (int): Number of agents after padding.
+            num_polyline (int): Number of polylines after padding.
+            num_target (int | None, optional): Number of targets after padding. Defaults to None, which does not
+                pad targets.
+
+        Returns:
+        -------
+            dict[str, Tensor]: Padded inputs.
+
+        """
+        inputs = dict(inputs)
+        self._pad(inputs, AGENT_KEYS, num_agent)
+        self._pad(inputs, POLYLINE_KEYS, num_polyline)
+        if num_target is not None:
+            self._pad_target(inputs, num_target)
+        return inputs
+
+    def expand(self, inputs: dict[str, Tensor]) -> Iterator[dict[str, Tensor]]:
+        """Yield the inputs padded to every bucket, which can contain them.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Inputs of `MTR`.
+
+        Yields:
+        ------
+            dict[str, Tensor]: Padded inputs.
+
+        """
+        num_target, num_agent = inputs[AGENT_KEYS[0]].shape[:2]
+        num_polyline = inputs[POLYLINE_KEYS[0]].shape[1]
+        agent_sizes = [size for size in self.agent_sizes if num_agent <= size] or [num_agent]
+        polyline_sizes = [size for size in self.polyline_sizes if num_polyline <= size] or [num_polyline]
+        target_sizes = [size for size in self.target_sizes if num_target <= size] or [num_target]
+        for agent_size, polyline_size, target_size in product(agent_sizes, polyline_sizes, target_sizes):
+            yield self.pad_to(inputs, agent_size, polyline_size, target_size)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from omegaconf import DictConfig, OmegaConf
+
+from awml_pred.common import BACKENDS
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Module
+
+    from .base import BaseBackend
+
+__all__ = ("build_backend",)
+
+
+def build_backend(cfg: dict | DictConfig, model: Module | None) -> BaseBackend:
+    """Return inference backend.
+
+    Expecting configuration format as below:
+
+    ```
+    backend:
+        name: <BACKEND NAME>
+        ...PARAMETERS
+    ```
+
+    Supported backends:
+    * EagerBackend
+    * TorchCompileBackend
+    * TorchScriptBackend
+    * OnnxRuntimeBackend
+
+    Args:
+    ----
+        cfg (dict | DictConfig): Configuration of the backend.
+        model (Module | None): Model loaded with weights.
+
+    Returns:
+    -------
+        BaseBackend: Backend instance.
+
+    """
+    if isinstance(cfg, DictConfig):
+        cfg = OmegaConf.to_container(cfg, resolve=True)
+    return BACKENDS.build({**cfg, "model": model})
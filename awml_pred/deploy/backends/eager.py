@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from awml_pred.common import BACKENDS
+
+from .base import BaseBackend
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Tensor
+
+__all__ = ("EagerBackend",)
+
+
+@BACKENDS.register()
+class EagerBackend(BaseBackend):
+    """Run the model in eager mode."""
+
+    requires_static_shapes = False
+
+    def forward(self, inputs: dict[str, Tensor]) -> tuple[Tensor, Tensor]:
+        return self.model(**inputs)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os.path as osp
+from importlib import import_module
+from typing import TYPE_CHECKING, Sequence
+
+import torch
+
+from awml_pred.common import BACKENDS
+
+from .base import BaseBackend
+from .bucket import AGENT_KEYS, POLYLINE_KEYS, ShapeBucket
+
+if TYPE_CHECKING:
+    from awml_pred.typing import DeviceLike, Module, Tensor
+
+__all__ = ("OnnxRuntimeBackend",)
+
+# domain of custom operations which are implemented by Python kernels of `onnxruntime-extensions`
+PYOP_DOMAIN = "ai.onnx.contrib"
+
+
+@BACKENDS.register()
+class OnnxRuntimeBackend(BaseBackend):
+    """Run the exported ONNX model with ONNX Runtime.
+
+    Custom operations, e.g. `awml_pred::KnnBatch`, are executed by Python kernels of `onnxruntime-extensions`,
+    which are registered by importing the modules specified by `custom_imports`.
+
+    Models exported by `awml_pred.deploy.export` have dynamic numbers of targets, agents and polylines. For models with
+    static shapes, the shape bucket is derived from them, and buckets of other sizes are rejected.
+    """
+
+    def __init__(
+        self,
+        model: Module | None,
+        onnx_path: str,
+        device: DeviceLike = "cpu",
+        shape_bucket: ShapeBucket | dict | None = None,
+        providers: Sequence[str] = ("CPUExecutionProvider",),
+        num_threads: int | None = None,
+        custom_imports: Sequence[str] = (),
+        custom_domain: str = "awml_pred",
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            model (Module | None): Not used, the model is loaded from `onnx_path`.
+            onnx_path (str): Path to the exported ONNX model.
+            device (DeviceLike, optional): Device of outputs. Defaults to "cpu".
+            shape_bucket (ShapeBucket | dict | None, optional): Shape bucket or its configuration, which must be
+                consistent with static shapes of the exported model. Defaults to None, which is derived from static
+                shapes if exist.
+            providers (Sequence[str], optional): Execution providers. Defaults to ("CPUExecutionProvider",).
+            num_threads (int | None, optional): Number of intra-op threads. Defaults to None.
+            custom_imports (Sequence[str], optional): Modules which register kernels of custom operations.
+                Defaults to ().
+            custom_domain (str, optional): Domain of custom operations in the ONNX model. Defaults to "awml_pred".
+
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            msg = "onnxruntime is required to use OnnxRuntimeBackend"
+            raise ImportError(msg) from e
+
+        if not osp.exists(onnx_path):
+            msg = f"ONNX model is not found: {onnx_path}"
+            raise FileNotFoundError(msg)
+
+        super().__init__(model=None, device=device, shape_bucket=shape_bucket)
+
+        for name in custom_imports:
+            import_module(name)
+
+        session_options = self.create_session_options(use_custom_ops=len(custom_imports) > 0)
+        if num_threads is not None:
+            session_options.intra_op_num_threads = num_threads
+        model = self.load_model(onnx_path, custom_domain) if custom_imports else onnx_path
+        self.session = ort.InferenceSession(model, sess_options=session_options, providers=list(providers))
+        self.input_names = [item.name for item in self.session.get_inputs()]
+        self.shape_bucket = self._check_static_shapes(self.shape_bucket)
+
+    def _check_static_shapes(self, shape_bucket: ShapeBucket | None) -> ShapeBucket | None:
+        """Return the shape bucket which is consistent with static dimensions of the ONNX model.
+
+        Args:
+        ----
+            shape_bucket (ShapeBucket | None): Shape bucket given by the configuration.
+
+        Returns:
+        -------
+            ShapeBucket | None: The given shape bucket, or the bucket of static sizes if it is None.
+
+        """
+        shapes = {item.name: item.shape for item in self.session.get_inputs()}
+        # NOTE: dynamic dimensions are names or None, and static ones are integers
+        num_target = shapes[AGENT_KEYS[0]][0]
+        self.num_target = num_target if isinstance(num_target, int) else None
+        static_sizes = {
+            name: [shapes[keys[0]][dim]]
+            for name, keys, dim in (
+                ("agent_sizes", AGENT_KEYS, 1),
+                ("polyline_sizes", POLYLINE_KEYS, 1),
+                ("target_sizes", AGENT_KEYS, 0),
+            )
+            if isinstance(shapes[keys[0]][dim], int)
+        }
+        if len(static_sizes) == 0:
+            return shape_bucket
+        if shape_bucket is None:
+            return ShapeBucket(**static_sizes)
+        for name, sizes in static_sizes.items():
+            if getattr(shape_bucket, name) != sizes:
+                msg = (
+                    f"{name} of the shape bucket must be {sizes} for the ONNX model with static shapes, "
+                    f"but got {getattr(shape_bucket, name)}. Export the model with dynamic axes by "
+                    "`awml_pred.deploy.export`"
+                )
+                raise ValueError(msg)
+        return shape_bucket
+
+    @staticmethod
+    def load_model(onnx_path: str, custom_domain: str) -> bytes:
+        """Load the ONNX model and move custom operations to the domain of Python kernels.
+
+        Args:
+        ----
+            onnx_path (str): Path to the ONNX model.
+            custom_domain (str): Domain of custom operations.
+
+        Returns:
+        -------
+            bytes: Serialized ONNX model.
+
+        """
+        import onnx
+
+        model = onnx.load(onnx_path)
+        for node in model.graph.node:
+            if node.domain == custom_domain:
+                node.domain = PYOP_DOMAIN
+        for opset in model.opset_import:
+            if opset.domain == custom_domain:
+                opset.domain = PYOP_DOMAIN
+        return model.SerializeToString()
+
+    def create_session_options(self, *, use_custom_ops: bool = False) -> object:
+        """Return session options of ONNX Runtime.
+
+        Args:
+        ----
+            use_custom_ops (bool, optional): Whether to register the library of `onnxruntime-extensions`.
+                Defaults to False.
+
+        Returns:
+        -------
+            onnxruntime.SessionOptions: Session options.
+
+        """
+        import onnxruntime as ort
+
+        session_options = ort.SessionOptions()
+        if use_custom_ops:
+            from onnxruntime_extensions import get_library_path
+
+            session_options.register_custom_ops_library(get_library_path())
+        return session_options
+
+    def forward(self, inputs: dict[str, Tensor]) -> tuple[Tensor, Tensor]:
+        num_target = len(inputs[AGENT_KEYS[0]])
+        if self.num_target is not None and num_target != self.num_target:
+            msg = (
+                f"The ONNX model has the static number of targets {self.num_target}, but got {num_target} "
+                "after padding. Export the model with dynamic axes by `awml_pred.deploy.export`"
+            )
+            raise ValueError(msg)
+        feed = {name: inputs[name].cpu().numpy() for name in self.input_names}
+        pred_scores, pred_trajs = self.session.run(None, feed)
+        return torch.from_numpy(pred_scores).to(self.device), torch.from_numpy(pred_trajs).to(self.device)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import torch
+
+from awml_pred.common import BACKENDS
+
+from .base import BaseBackend
+
+if TYPE_CHECKING:
+    from awml_pred.typing import DeviceLike, Module, Tensor
+
+    from .bucket import ShapeBucket
+
+__all__ = ("TorchCompileBackend",)
+
+
+@BACKENDS.register()
+class TorchCompileBackend(BaseBackend):
+    """Run the model compiled by `torch.compile`.
+
+    Recompilation is triggered by unseen input shapes, so it is recommended to use with `ShapeBucket` to bound
+    the number of compiled graphs.
+    """
+
+    def __init__(
+        self,
+        model: Module,
+        device: DeviceLike = "cpu",
+        shape_bucket: ShapeBucket | dict | None = None,
+        compile_backend: str = "inductor",
+        mode: str | None = None,
+        *,
+        dynamic: bool | None = None,
+        precision: str = "fp32",
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            model (Module): Model loaded with weights.
+            device (DeviceLike, optional): Device name. Defaults to "cpu".
+            shape_bucket (ShapeBucket | dict | None, optional): Shape bucket or its configuration.
+                Defaults to None.
+            compile_backend (str, optional): Backend of `torch.compile`. Defaults to "inductor".
+            mode (str | None, optional): Compilation mode, e.g. "max-autotune". Defaults to None.
+            dynamic (bool | None, optional): Whether to compile with dynamic shapes. Defaults to None, which
+                specializes on the first shape and makes dimensions dynamic after recompilation.
+            precision (str, optional): Inference precision, which is one of `fp32`, `bf16` or `fp16`.
+                Defaults to "fp32".
+
+        """
+        super().__init__(model=model, device=device, shape_bucket=shape_bucket, precision=precision)
+        self.compiled_model = torch.compile(self.model, backend=compile_backend, mode=mode, dynamic=dynamic)
+
+    def forward(self, inputs: dict[str, Tensor]) -> tuple[Tensor, Tensor]:
+        return self.compiled_model(**inputs)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import torch
+
+from awml_pred.common import BACKENDS
+
+from .base import BaseBackend
+
+if TYPE_CHECKING:
+    from awml_pred.typing import DeviceLike, Module, Tensor
+
+    from .bucket import ShapeBucket
+
+__all__ = ("TorchScriptBackend",)
+
+
+@BACKENDS.register()
+class TorchScriptBackend(BaseBackend):
+    """Run the model traced by TorchScript and frozen for inference.
+
+    The model is traced once per input shape, so it is recommended to use with `ShapeBucket`.
+    """
+
+    def __init__(
+        self,
+        model: Module,
+        device: DeviceLike = "cpu",
+        shape_bucket: ShapeBucket | dict | None = None,
+        *,
+        freeze: bool = True,
+        optimize: bool = True,
+        precision: str = "fp32",
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            model (Module): Model loaded with weights.
+            device (DeviceLike, optional): Device name. Defaults to "cpu".
+            shape_bucket (ShapeBucket | dict | None, optional): Shape bucket or its configuration.
+                Defaults to None.
+            freeze (bool, optional): Whether to freeze the traced module. Defaults to True.
+            optimize (bool, optional): Whether to apply `torch.jit.optimize_for_inference` to
+                the frozen module. Defaults to True.
+            precision (str, optional): Inference precision, which is one of `fp32`, `bf16` or `fp16`.
+                Defaults to "fp32".
+
+        """
+        super().__init__(model=model, device=device, shape_bucket=shape_bucket, precision=precision)
+        self.freeze = freeze
+        self.optimize = optimize
+        self._traced_models: dict[tuple, torch.jit.ScriptModule] = {}
+
+    def _trace(self, inputs: dict[str, Tensor]) -> torch.jit.ScriptModule:
+        traced = torch.jit.trace(self.model, example_kwarg_inputs=inputs, check_trace=False, strict=False)
+        if self.freeze:
+            traced = torch.jit.freeze(traced)
+            if self.optimize:
+                traced = torch.jit.optimize_for_inference(traced)
+        return traced
+
+    def forward(self, inputs: dict[str, Tensor]) -> tuple[Tensor, Tensor]:
+        key = tuple((name, tuple(item.shape)) for name, item in inputs.items())
+        if key not in self._traced_models:
+            self._traced_models[key] = self._trace(inputs)
+        return self._traced_models[key](**inputs)
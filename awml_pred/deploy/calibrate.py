@@ -0,0 +1,62 @@
+"""Calibrate activation ranges for static INT8 quantization of `MTR`.
+
+Example:
+-------
+    $ python -m awml_pred.deploy.calibrate config/mtr.yaml mtr_best.pth --inputs recorded/ --output calib.pth
+
+The output is passed to `quantize_model(model, mode="static", calibration="calib.pth")`.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.models import build_model
+
+from .quantization import calibrate_model
+from .utils import create_dummy_inputs, load_recorded_inputs
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Calibrate MTR for static INT8 quantization.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("checkpoint", type=str, help="Checkpoint file.")
+    parser.add_argument("--inputs", type=str, default=None, help="Recorded inputs, a .npz file or a directory.")
+    parser.add_argument(
+        "--num-synthetic",
+        type=int,
+        default=16,
+        help="Number of synthetic inputs, which are used only if --inputs is omitted.",
+    )
+    parser.add_argument("--output", type=str, default="calib.pth", help="Output file of calibration.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    model, _ = load_checkpoint(model, args.checkpoint)
+
+    if args.inputs is not None:
+        inputs = load_recorded_inputs(args.inputs)
+    else:
+        inputs = [
+            create_dummy_inputs(
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                seed=i,
+            )
+            for i in range(args.num_synthetic)
+        ]
+
+    calibration = calibrate_model(model, inputs)
+    torch.save(calibration, args.output)
+    print(f"Calibration with {len(inputs)} inputs is saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Convert a training checkpoint into a weights-only checkpoint for inference.
+
+Example:
+-------
+    $ python -m awml_pred.deploy.convert_checkpoint mtr_best.pth mtr_best.safetensors --dtype bf16
+
+The optimizer state is stripped and floating point weights are cast to `--dtype`. `.safetensors` outputs require
+the `safetensors` package, otherwise `.pth` outputs can be memory-mapped by `load_checkpoint(..., mmap=True)`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os.path as osp
+
+import torch
+
+from awml_pred.common import load_checkpoint_file
+
+from .backends import PRECISIONS
+
+__all__ = ("convert_checkpoint",)
+
+
+def convert_checkpoint(src: str, dst: str, dtype: torch.dtype = torch.float32) -> None:
+    """Convert a training checkpoint into a weights-only checkpoint.
+
+    Args:
+    ----
+        src (str): Source checkpoint filepath.
+        dst (str): Output filepath, `.pth` or `.safetensors`.
+        dtype (torch.dtype, optional): Data type of floating point weights. Defaults to torch.float32.
+
+    """
+    checkpoint = load_checkpoint_file(src, map_location=torch.device("cpu"))
+    model_state = {
+        name: (weight.to(dtype) if weight.is_floating_point() else weight).contiguous()
+        for name, weight in checkpoint["model"].items()
+    }
+    epoch = checkpoint.get("epoch", -1)
+
+    if dst.endswith(".safetensors"):
+        try:
+            from safetensors.torch import save_file
+        except ImportError as e:
+            msg = "safetensors is required to save .safetensors"
+            raise ImportError(msg) from e
+        save_file(model_state, dst, metadata={"epoch": str(epoch)})
+    else:
+        torch.save({"model": model_state, "epoch": epoch}, dst)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert a checkpoint into a weights-only checkpoint.")
+    parser.add_argument("checkpoint", type=str, help="Source checkpoint file.")
+    parser.add_argument("output", type=str, help="Output file, .pth or .safetensors.")
+    parser.add_argument("--dtype", type=str, default="fp32", choices=tuple(PRECISIONS), help="Weight dtype.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    convert_checkpoint(args.checkpoint, args.output, dtype=PRECISIONS[args.dtype])
+    src_size, dst_size = osp.getsize(args.checkpoint), osp.getsize(args.output)
+    print(f"Converted {args.checkpoint} ({src_size / 1024**2:.1f}MiB) to {args.output} ({dst_size / 1024**2:.1f}MiB)")
+
+
+if __name__ == "__main__":
+    main()
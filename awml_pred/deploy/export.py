@@ -0,0 +1,131 @@
+"""Export `MTR` to ONNX with custom operations.
+
+Example:
+-------
+    $ python -m awml_pred.deploy.export config/mtr.yaml mtr_best.pth --output mtr.onnx --num-agent 8
+
+The numbers of targets, agents and polylines are dynamic, so a single model serves every bucket size. Top-k sizes of
+the decoder are fixed on export, so the number of polylines at runtime must not be less than the decoder collects,
+e.g. `num_base_map_polylines`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import inspect
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.models import build_model
+
+from .rewriters import RewriterContext
+from .utils import create_dummy_inputs
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Module, Tensor
+
+__all__ = ("export_onnx",)
+
+OUTPUT_NAMES = ("pred_scores", "pred_trajs")
+
+# dynamic dimensions of inputs and outputs, the number of targets (B), agents (A) and polylines (K)
+DYNAMIC_AXES = {
+    "obj_trajs": {0: "num_target", 1: "num_agent"},
+    "obj_trajs_mask": {0: "num_target", 1: "num_agent"},
+    "map_polylines": {0: "num_target", 1: "num_polyline"},
+    "map_polylines_mask": {0: "num_target", 1: "num_polyline"},
+    "map_polylines_center": {0: "num_target", 1: "num_polyline"},
+    "obj_trajs_last_pos": {0: "num_target", 1: "num_agent"},
+    "track_index_to_predict": {0: "num_target"},
+    "intention_points": {0: "num_target"},
+    "pred_scores": {0: "num_target"},
+    "pred_trajs": {0: "num_target"},
+}
+
+
+def export_onnx(
+    model: Module,
+    inputs: dict[str, Tensor],
+    output: str,
+    backend: str = "onnxruntime",
+    opset_version: int = 17,
+) -> None:
+    """Export the model to ONNX, where custom operations are rewritten for the backend.
+
+    The numbers of targets, agents and polylines are exported as dynamic axes of `DYNAMIC_AXES`.
+
+    Args:
+    ----
+        model (Module): Model to be exported.
+        inputs (dict[str, Tensor]): Sample inputs keyed by the argument names of forward.
+        output (str): Output ONNX file path.
+        backend (str, optional): Backend name of rewriters, which is one of `onnxruntime` or `tensorrt`.
+            Defaults to "onnxruntime".
+        opset_version (int, optional): ONNX opset version. Defaults to 17.
+
+    """
+    model.eval()
+    # order inputs by the signature of forward, which is used for the input names of the ONNX model
+    params = inspect.signature(model.forward).parameters
+    input_names = [name for name in params if name in inputs]
+
+    with RewriterContext(backend=backend), torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(inputs[name] for name in input_names),
+            output,
+            input_names=input_names,
+            output_names=list(OUTPUT_NAMES),
+            dynamic_axes={name: axes for name, axes in DYNAMIC_AXES.items() if name in (*input_names, *OUTPUT_NAMES)},
+            opset_version=opset_version,
+            dynamo=False,
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export MTR to ONNX.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("checkpoint", type=str, help="Checkpoint file.")
+    parser.add_argument("--output", type=str, default="mtr.onnx", help="Output ONNX file.")
+    parser.add_argument("--backend", type=str, default="onnxruntime", help="Backend name of rewriters.")
+    parser.add_argument(
+        "--custom-imports",
+        type=str,
+        nargs="*",
+        default=["projects.MTR.deploys"],
+        help="Modules which register rewriters.",
+    )
+    parser.add_argument("--num-target", type=int, default=1, help="Number of target agents of sample inputs.")
+    parser.add_argument("--num-agent", type=int, default=1, help="Number of agents of sample inputs.")
+    parser.add_argument("--num-polyline", type=int, default=768, help="Number of polylines of sample inputs.")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for name in args.custom_imports:
+        import_module(name)
+
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    model, _ = load_checkpoint(model, args.checkpoint)
+    model.cpu()
+
+    inputs = create_dummy_inputs(
+        num_target=args.num_target,
+        num_agent=args.num_agent,
+        num_polyline=args.num_polyline,
+        num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+        num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+        seed=0,
+    )
+    export_onnx(model, inputs, args.output, backend=args.backend, opset_version=args.opset)
+    print(f"ONNX model is exported to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from torch import nn
+from torch.nn.utils.fusion import fuse_linear_bn_eval
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Module
+
+__all__ = ("fuse_for_inference",)
+
+
+def fuse_for_inference(model: Module) -> Module:
+    """Fold every `BatchNorm1d` into the preceding `Linear` in place, which is built by `build_mlps`.
+
+    Folded BatchNorm layers are replaced with `Identity`, so that indices of layers in `Sequential` are kept.
+    The model is set to evaluation mode, because running statistics are folded.
+
+    Args:
+    ----
+        model (Module): Model loaded with weights.
+
+    Returns:
+    -------
+        Module: Fused model.
+
+    """
+    model.eval()
+    for module in model.modules():
+        if not isinstance(module, nn.Sequential):
+            continue
+        for i in range(len(module) - 1):
+            linear, norm = module[i], module[i + 1]
+            if isinstance(linear, nn.Linear) and isinstance(norm, nn.BatchNorm1d) and norm.track_running_stats:
+                module[i] = fuse_linear_bn_eval(linear, norm)
+                module[i + 1] = nn.Identity()
+    return model
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+import torch
+from torch import nn
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+from .fuse import fuse_for_inference
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Module, Tensor
+
+__all__ = ("QUANTIZATION_MODES", "calibrate_model", "quantize_model")
+
+QUANTIZATION_MODES = ("dynamic", "static")
+
+# layers which can be statically quantized as a block of Linear-BN-ReLU, where BN may be folded into Identity
+_MLP_LAYERS = (nn.Linear, nn.BatchNorm1d, nn.ReLU, nn.Identity)
+# key of observers of activations in the state dict of a prepared block
+_OBSERVER_KEY = "activation_post_process"
+
+
+def _get_engine() -> str:
+    engines = torch.backends.quantized.supported_engines
+    return "x86" if "x86" in engines else "fbgemm" if "fbgemm" in engines else torch.backends.quantized.engine
+
+
+def _is_mlp_block(module: Module) -> bool:
+    """Return whether the module is an MLP block built by `build_mlps` or a plain stack of Linear and ReLU."""
+    return (
+        isinstance(module, nn.Sequential)
+        and len(module) > 0
+        and isinstance(module[0], nn.Linear)
+        and all(isinstance(layer, _MLP_LAYERS) for layer in module)
+    )
+
+
+def _replace_module(model: Module, name: str, module: Module) -> None:
+    parent_name, _, child_name = name.rpartition(".")
+    parent = model.get_submodule(parent_name) if parent_name else model
+    setattr(parent, child_name, module)
+
+
+def _split_in_proj(model: Module) -> None:
+    """Split packed input projections of attention layers, so that they can be quantized as `Linear`."""
+    for module in model.modules():
+        if hasattr(module, "split_in_proj"):
+            module.split_in_proj()
+
+
+def _prepare_static(model: Module) -> list[str]:
+    """Insert observers into every MLP block in place.
+
+    Args:
+    ----
+        model (Module): Model in evaluation mode.
+
+    Returns:
+    -------
+        list[str]: Names of prepared blocks.
+
+    """
+    qconfig_mapping = get_default_qconfig_mapping(_get_engine())
+    names = [name for name, module in model.named_modules() if _is_mlp_block(module)]
+    for name in names:
+        block = model.get_submodule(name)
+        example_inputs = (torch.zeros(2, block[0].in_features),)
+        _replace_module(model, name, prepare_fx(block, qconfig_mapping, example_inputs=example_inputs))
+    return names
+
+
+def calibrate_model(model: Module, inputs: Iterable[dict[str, Tensor]]) -> dict[str, Tensor]:
+    """Collect statistics of activations of MLP blocks for static quantization.
+
+    Note that the model is modified in place, so pass a copy of the model if it is used later.
+
+    Args:
+    ----
+        model (Module): Float model loaded with weights.
+        inputs (Iterable[dict[str, Tensor]]): Recorded inputs keyed by the argument names of forward.
+
+    Returns:
+    -------
+        dict[str, Tensor]: Statistics of observers, which is passed to `quantize_model(..., calibration=...)`.
+
+    """
+    fuse_for_inference(model.cpu())
+    _split_in_proj(model)
+    _prepare_static(model)
+    with torch.no_grad():
+        for item in inputs:
+            model(**item)
+    return {key: value for key, value in model.state_dict().items() if _OBSERVER_KEY in key}
+
+
+def quantize_model(model: Module, mode: str = "dynamic", calibration: str | dict | None = None) -> Module:
+    """Quantize `Linear` layers to INT8 for CPU inference in place.
+
+    * `dynamic`: Weights of all `Linear` layers are quantized, and activations are quantized on the fly.
+    * `static`: MLP blocks are quantized with activation ranges of calibration, where ReLU is fused into `Linear`.
+        The other `Linear` layers are dynamically quantized.
+
+    BatchNorm layers are folded by `fuse_for_inference` in advance.
+
+    Args:
+    ----
+        model (Module): Float model loaded with weights.
+        mode (str, optional): Quantization mode. Defaults to "dynamic".
+        calibration (str | dict | None, optional): Statistics returned by `calibrate_model`, or its file path.
+            Required for `static` mode. Defaults to None.
+
+    Returns:
+    -------
+        Module: Quantized model on CPU.
+
+    """
+    if mode not in QUANTIZATION_MODES:
+        msg = f"Unexpected quantization mode: {mode}, expected one of {QUANTIZATION_MODES}"
+        raise ValueError(msg)
+
+    torch.backends.quantized.engine = _get_engine()
+    fuse_for_inference(model.cpu())
+    _split_in_proj(model)
+
+    if mode == "static":
+        if calibration is None:
+            msg = "calibration is required for static quantization"
+            raise ValueError(msg)
+        if isinstance(calibration, str):
+            calibration = torch.load(calibration, map_location="cpu", weights_only=True)
+        names = _prepare_static(model)
+        incompatible = model.load_state_dict(calibration, strict=False)
+        if len(incompatible.unexpected_keys) > 0:
+            msg = f"calibration does not match the model: {incompatible.unexpected_keys}"
+            raise KeyError(msg)
+        for name in names:
+            _replace_module(model, name, convert_fx(model.get_submodule(name)))
+
+    return quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import os
+import os.path as osp
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .utils import INPUT_NAMES
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Tensor
+
+__all__ = ("InputRecorder",)
+
+logger = logging.getLogger(__name__)
+
+# names of recorded outputs, which are stored with inputs keyed by `INPUT_NAMES`
+OUTPUT_NAMES = ("pred_scores", "pred_trajs")
+
+# names of files written by `InputRecorder`, `YYYYmmdd_HHMMSS_NNNNNN.npz`
+_FILENAME_PATTERN = re.compile(r"\d{8}_\d{6}_\d{6}\.npz")
+
+
+class InputRecorder:
+    """Record inputs and outputs of `MTR` to a ring of compressed `.npz` files.
+
+    Tensors are copied to host memory on the caller thread, and compression and file I/O run on a background thread.
+    If the writer can not keep up, new records are dropped instead of blocking the caller. Files left in the directory
+    by earlier runs count toward `max_files`, and other files in the directory are left untouched. Failures of file I/O
+    are logged, and the record is skipped. Recorded files can be loaded by `load_recorded_inputs`.
+    """
+
+    def __init__(self, directory: str, max_files: int = 100, max_pending: int = 4) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            directory (str): Output directory.
+            max_files (int, optional): Max number of files, the oldest file is removed first. Defaults to 100.
+            max_pending (int, optional): Max number of records waiting to be written. Defaults to 4.
+
+        """
+        assert max_files > 0, f"max_files must be positive, but got {max_files}"
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_files = max_files
+        self.num_dropped = 0
+
+        self._prefix = time.strftime("%Y%m%d_%H%M%S")
+        self._index = 0
+        # files of earlier runs are removed first, whose names are sorted by their start time
+        filenames = sorted(name for name in os.listdir(directory) if _FILENAME_PATTERN.fullmatch(name))
+        self._files: deque[str] = deque(osp.join(directory, name) for name in filenames)
+        self._queue: queue.Queue[dict[str, np.ndarray] | None] = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def record(self, inputs: dict[str, Tensor], outputs: tuple[Tensor, Tensor], latency: float | None = None) -> bool:
+        """Enqueue inputs and outputs to be written.
+
+        Args:
+        ----
+            inputs (dict[str, Tensor]): Inputs keyed by `INPUT_NAMES`.
+            outputs (tuple[Tensor, Tensor]): Predicted scores and trajectories.
+            latency (float | None, optional): Inference latency in [s]. Defaults to None.
+
+        Returns:
+        -------
+            bool: Whether the record is enqueued, False if it is dropped.
+
+        """
+        if self._queue.full():
+            self.num_dropped += 1
+            return False
+
+        arrays = {name: inputs[name].detach().cpu().numpy() for name in INPUT_NAMES}
+        for name, value in zip(OUTPUT_NAMES, outputs):
+            arrays[name] = value.detach().float().cpu().numpy()
+        if latency is not None:
+            arrays["latency"] = np.array(latency)
+        arrays["timestamp"] = np.array(time.time())
+
+        try:
+            self._queue.put_nowait(arrays)
+        except queue.Full:
+            self.num_dropped += 1
+            return False
+        return True
+
+    def _write_loop(self) -> None:
+        while (arrays := self._queue.get()) is not None:
+            filepath = osp.join(self.directory, f"{self._prefix}_{self._index:06d}.npz")
+            self._index += 1
+            try:
+                np.savez_compressed(filepath, **arrays)
+            except OSError as e:
+                logger.warning(f"Failed to write {filepath}: {e}")
+                continue
+            self._files.append(filepath)
+            while len(self._files) > self.max_files:
+                oldest = self._files.popleft()
+                try:
+                    if osp.exists(oldest):
+                        os.remove(oldest)
+                except OSError as e:
+                    logger.warning(f"Failed to remove {oldest}: {e}")
+
+    def close(self) -> None:
+        """Write pending records and stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
@@ -0,0 +1 @@
+from .function_rewriter import *  # noqa
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import Any, Callable
+
+__all__ = ("FunctionRewriter", "FUNCTION_REWRITER", "RewriterContext")
+
+# References:
+#   https://github.com/open-mmlab/mmdeploy/blob/main/mmdeploy/core/rewriters/function_rewriter.py
+
+
+def _import_function(func_name: str) -> tuple[Any, str]:
+    """Return the owner module and the attribute name of the function specified by its import path.
+
+    Args:
+    ----
+        func_name (str): Import path of the function, e.g. `projects.MTR.mtr.ops.knn_batch`.
+
+    Returns:
+    -------
+        tuple[Any, str]: Owner module and attribute name.
+
+    """
+    module_name, attr_name = func_name.rsplit(".", maxsplit=1)
+    module = import_module(module_name)
+    if not hasattr(module, attr_name):
+        msg = f"{attr_name} is not found in {module_name}"
+        raise AttributeError(msg)
+    return module, attr_name
+
+
+class FunctionRewriter:
+    """A registry of functions, which replace the original functions during export for a specific backend."""
+
+    def __init__(self) -> None:
+        self._records: dict[str, dict[str, Callable]] = {}
+        self._origins: dict[str, Callable] = {}
+        self._patches: list[tuple[Any, str, Callable]] = []
+
+    def register(self, func_name: str, backend: str = "default") -> Callable:
+        """Register a rewrite function.
+
+        Args:
+        ----
+            func_name (str): Import path of the original function.
+            backend (str, optional): Backend name. Defaults to "default", which is used for all backends
+                unless a backend specific rewrite is registered.
+
+        Returns:
+        -------
+            Callable: Decorator.
+
+        """
+
+        def _register(func: Callable) -> Callable:
+            records = self._records.setdefault(backend, {})
+            if func_name in records:
+                msg = f"{func_name} is already registered for {backend}"
+                raise KeyError(msg)
+            records[func_name] = func
+            return func
+
+        return _register
+
+    def get_records(self, backend: str) -> dict[str, Callable]:
+        """Return rewrite functions for the backend.
+
+        Args:
+        ----
+            backend (str): Backend name.
+
+        Returns:
+        -------
+            dict[str, Callable]: Rewrite functions keyed by the import paths of the original functions.
+
+        """
+        return {**self._records.get("default", {}), **self._records.get(backend, {})}
+
+    def get_origin(self, func_name: str) -> Callable:
+        """Return the original function, which is available while rewriting.
+
+        Args:
+        ----
+            func_name (str): Import path of the original function.
+
+        Returns:
+        -------
+            Callable: Original function.
+
+        """
+        if func_name in self._origins:
+            return self._origins[func_name]
+        module, attr_name = _import_function(func_name)
+        return getattr(module, attr_name)
+
+    def enter(self, backend: str) -> None:
+        """Replace the original functions with the rewrite functions.
+
+        In addition to the owner module, the references imported by `from ... import ...` in any loaded module are
+        replaced.
+
+        Args:
+        ----
+            backend (str): Backend name.
+
+        """
+        if self._patches:
+            msg = "FunctionRewriter is already active"
+            raise RuntimeError(msg)
+
+        for func_name, rewrite in self.get_records(backend).items():
+            module, attr_name = _import_function(func_name)
+            origin = getattr(module, attr_name)
+            self._origins[func_name] = origin
+            for target in list(sys.modules.values()):
+                namespace = getattr(target, "__dict__", None)
+                if namespace is None:
+                    continue
+                for name, value in list(namespace.items()):
+                    if value is origin:
+                        self._patches.append((target, name, origin))
+                        setattr(target, name, rewrite)
+
+    def exit(self) -> None:
+        """Restore the original functions."""
+        for target, name, origin in reversed(self._patches):
+            setattr(target, name, origin)
+        self._patches.clear()
+        self._origins.clear()
+
+
+FUNCTION_REWRITER = FunctionRewriter()
+
+
+class RewriterContext:
+    """A context to rewrite functions for the backend.
+
+    Examples:
+    --------
+        >>> with RewriterContext(backend="onnxruntime"):
+        ...     torch.onnx.export(model, ...)
+
+    """
+
+    def __init__(self, backend: str, rewriter: FunctionRewriter = FUNCTION_REWRITER) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            backend (str): Backend name.
+            rewriter (FunctionRewriter, optional): Function rewriter. Defaults to FUNCTION_REWRITER.
+
+        """
+        self.backend = backend
+        self.rewriter = rewriter
+
+    def __enter__(self) -> RewriterContext:
+        self.rewriter.enter(self.backend)
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.rewriter.exit()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os.path as osp
+from glob import glob
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+
+if TYPE_CHECKING:
+    from awml_pred.typing import DeviceLike, Tensor
+
+__all__ = ("INPUT_NAMES", "create_dummy_inputs", "load_recorded_inputs")
+
+# Argument names of `MTR.forward` for inference.
+INPUT_NAMES = (
+    "obj_trajs",
+    "obj_trajs_mask",
+    "map_polylines",
+    "map_polylines_mask",
+    "map_polylines_center",
+    "obj_trajs_last_pos",
+    "track_index_to_predict",
+    "intention_points",
+)
+
+
+def create_dummy_inputs(
+    num_target: int = 1,
+    num_agent: int = 1,
+    num_polyline: int = 768,
+    num_timestamp: int = 11,
+    num_agent_dim: int = 29,
+    num_point: int = 20,
+    num_point_dim: int = 9,
+    num_intention: int = 64,
+    device: DeviceLike = "cpu",
+    seed: int | None = None,
+) -> dict[str, Tensor]:
+    """Return synthetic inputs of `MTR`, which are used for warm-up, tracing and export.
+
+    Args:
+    ----
+        num_target (int, optional): Number of target agents (B). Defaults to 1.
+        num_agent (int, optional): Number of agents (A). Defaults to 1.
+        num_polyline (int, optional): Number of polylines (K). Defaults to 768.
+        num_timestamp (int, optional): Number of past timestamps (T). Defaults to 11.
+        num_agent_dim (int, optional): Number of agent features (Da). Defaults to 29.
+        num_point (int, optional): Number of points of each polyline (P). Defaults to 20.
+        num_point_dim (int, optional): Number of point features (Dp). Defaults to 9.
+        num_intention (int, optional): Number of intention points. Defaults to 64.
+        device (DeviceLike, optional): Device name. Defaults to "cpu".
+        seed (int | None, optional): Random seed. Defaults to None.
+
+    Returns:
+    -------
+        dict[str, Tensor]: Input tensors keyed by the argument names of `MTR.forward`.
+
+    """
+    generator = torch.Generator()
+    if seed is not None:
+        generator.manual_seed(seed)
+
+    def randn(*shape: int, scale: float = 1.0) -> Tensor:
+        return (torch.randn(*shape, generator=generator) * scale).to(device)
+
+    return {
+        "obj_trajs": randn(num_target, num_agent, num_timestamp, num_agent_dim),
+        "obj_trajs_mask": torch.ones(num_target, num_agent, num_timestamp, dtype=torch.bool, device=device),
+        "map_polylines": randn(num_target, num_polyline, num_point, num_point_dim, scale=20.0),
+        "map_polylines_mask": torch.ones(num_target, num_polyline, num_point, dtype=torch.bool, device=device),
+        "map_polylines_center": randn(num_target, num_polyline, 3, scale=50.0),
+        "obj_trajs_last_pos": randn(num_target, num_agent, 3, scale=20.0),
+        "track_index_to_predict": torch.zeros(num_target, dtype=torch.int32, device=device),
+        "intention_points": randn(num_target, num_intention, 2, scale=30.0),
+    }
+
+
+def load_recorded_inputs(path: str, device: DeviceLike = "cpu") -> list[dict[str, Tensor]]:
+    """Load recorded inputs of `MTR` from `.npz` files.
+
+    Each file must contain arrays keyed by `INPUT_NAMES`, and other arrays are ignored.
+
+    Args:
+    ----
+        path (str): Path to a `.npz` file or a directory containing `.npz` files.
+        device (DeviceLike, optional): Device name. Defaults to "cpu".
+
+    Returns:
+    -------
+        list[dict[str, Tensor]]: Inputs sorted by file name.
+
+    """
+    filepaths = sorted(glob(osp.join(path, "*.npz"))) if osp.isdir(path) else [path]
+    if len(filepaths) == 0:
+        msg = f"No recorded inputs are found in {path}"
+        raise FileNotFoundError(msg)
+
+    ret = []
+    for filepath in filepaths:
+        with np.load(filepath) as data:
+            ret.append({name: torch.from_numpy(data[name]).to(device) for name in INPUT_NAMES})
+    return ret
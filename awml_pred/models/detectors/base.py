@@ -35,9 +35,9 @@ class BaseDetector(nn.Module):
         Returns:
             Self: Instance of myself.
         """
-        self.encoder.to(args, kwargs)
-        self.decoder.to(args, kwargs)
-        return super().to(args, kwargs)
+        self.encoder.to(*args, **kwargs)
+        self.decoder.to(*args, **kwargs)
+        return super().to(*args, **kwargs)
 
     def cuda(self, device: int | device | None = None) -> Self:
         """Move all parameters and buffers to the GPU.
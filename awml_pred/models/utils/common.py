@@ -6,23 +6,35 @@ __all__ = ("get_batch_offsets",)
 def get_batch_offsets(
     batch_idxs: torch.Tensor,
     batch_size: int,
-    device: str | torch.device = "cuda",
+    device: str | torch.device | None = None,
 ) -> torch.Tensor:
     """
     Return the batch offsets.
 
+    Indices out of the range `[0, batch_size)` are ignored.
+
     Args:
     ----
         batch_idxs (torch.Tensor): Batch indices, in shape (N,).
-        bs (int): Batch size.
-        device (str | torch.device): Device name. Defaults to "cuda".
+        batch_size (int): Batch size.
+        device (str | torch.device | None): Device name. Defaults to None, which uses the device of `batch_idxs`.
 
     Returns:
     -------
         torch.Tensor: Batch offsets, in shape (bs + 1,).
     """
-    batch_offsets = torch.zeros(batch_size + 1, device=device).int()
-    for i in range(batch_size):
-        batch_offsets[i + 1] = batch_offsets[i] + (batch_idxs == i).sum()
-    # assert batch_offsets[-1] == batch_idxs.shape[0]
+    if device is None:
+        device = batch_idxs.device
+    batch_idxs = batch_idxs.to(device=device, dtype=torch.long)
+
+    if torch.onnx.is_in_onnx_export():
+        # NOTE: bincount is not supported in ONNX
+        batch_range = torch.arange(batch_size, device=device)
+        batch_cnt = (batch_idxs[None, :] == batch_range[:, None]).sum(dim=-1)
+    else:
+        # shift by 1 to count negative indices into the first bin, which is dropped
+        batch_cnt = torch.bincount(batch_idxs.clamp(min=-1) + 1, minlength=batch_size + 1)[1 : batch_size + 1]
+
+    batch_offsets = torch.zeros(batch_size + 1, dtype=torch.int, device=device)
+    batch_offsets[1:] = batch_cnt.cumsum(dim=0)
     return batch_offsets
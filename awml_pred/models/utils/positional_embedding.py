@@ -16,6 +16,8 @@ def sine_positional_embed(positions: torch.Tensor, hidden_dim: int) -> torch.Ten
     -------
         torch.Tensor: _description_
     """
+    # NOTE: large positions lose precision in sin/cos with half precision, so it is always computed in fp32
+    positions = positions.float()
     half_hidden_dim = hidden_dim // 2
     scale = 2.0 * torch.pi
     dim_t = torch.arange(half_hidden_dim, dtype=torch.float32, device=positions.device)
@@ -2,14 +2,76 @@ import torch
 
 from awml_pred.typing import Tensor
 
+__all__ = ("batch_nms", "batch_nms_indices")
 
-def batch_nms(
+
+@torch.jit.script
+def _greedy_select(sorted_scores: Tensor, cover_mask: Tensor, num_ret_modes: int) -> Tensor:
+    """Run greedy NMS selection over the score-sorted modes.
+
+    Args:
+    ----
+        sorted_scores (Tensor): Scores sorted in descending order, in shape (B, N).
+        cover_mask (Tensor): Whether i-th mode covers j-th mode, in shape (B, N, N).
+        num_ret_modes (int): The number of result modes.
+
+    Returns:
+    -------
+        Tensor: Selected indices of the sorted modes, in shape (B, num_ret_modes).
+
+    """
+    batch_size, num_modes = sorted_scores.shape
+    uncover_mask = (~cover_mask).to(sorted_scores.dtype)
+
+    point_val = sorted_scores.clone()
+    point_val_selected = torch.zeros_like(point_val)
+    ret_idxs = torch.zeros(batch_size, num_ret_modes, dtype=torch.long, device=sorted_scores.device)
+
+    for k in range(num_ret_modes):
+        cur_idx = point_val.argmax(dim=-1)
+        ret_idxs[:, k] = cur_idx
+
+        new_uncover_mask = uncover_mask.gather(1, cur_idx[:, None, None].expand(batch_size, 1, num_modes))
+        point_val = point_val * new_uncover_mask[:, 0]
+        point_val_selected.scatter_(1, cur_idx[:, None], -1.0)
+        point_val = point_val + point_val_selected
+
+    return ret_idxs
+
+
+def _trajectory_distance(trajs: Tensor, chunk_size: int = 8) -> Tensor:
+    """Return the average per-timestep distance between every pair of trajectories.
+
+    Args:
+    ----
+        trajs (Tensor): Trajectories, in shape (B, N, T, D).
+        chunk_size (int, optional): Number of timestamps accumulated at once. Defaults to 8.
+
+    Returns:
+    -------
+        Tensor: Distances, in shape (B, N, N).
+
+    """
+    num_timestamps = trajs.shape[2]
+    dist = None
+    for start in range(0, num_timestamps, chunk_size):
+        xy = trajs[:, :, start : start + chunk_size, 0:2]
+        diff_y = xy[:, :, None, :, 1] - xy[:, None, :, :, 1]
+        chunk_dist = (xy[:, :, None, :, 0] - xy[:, None, :, :, 0]).square_().addcmul_(diff_y, diff_y)
+        chunk_dist = chunk_dist.sqrt_().sum(dim=-1)
+        dist = chunk_dist if dist is None else dist + chunk_dist
+    return dist / num_timestamps
+
+
+def batch_nms_indices(
     pred_trajs: Tensor,
     pred_scores: Tensor,
-    dist_thresh: Tensor,
+    dist_thresh: float,
     num_ret_modes: int = 6,
-) -> tuple[Tensor, Tensor, Tensor]:
-    """Execute NMS in batch.
+    *,
+    use_traj_dist: bool = False,
+) -> tuple[Tensor, Tensor]:
+    """Execute NMS in batch and return only the selected scores and indices.
 
     Args:
     ----
@@ -17,50 +79,77 @@ def batch_nms(
         pred_scores (Tensor): (batch_size, num_modes)
         dist_thresh (float): Distance threshold.
         num_ret_modes (int, optional): The number of result modes. Defaults to 6.
+        use_traj_dist (bool, optional): Whether to use the average per-timestep distance of
+            whole trajectories instead of the distance of goals. Defaults to False.
 
     Returns:
     -------
-        tuple[Tensor, Tensor, Tensor]:
-            ret_trajs (batch_size, num_ret_modes, num_timestamps, 5)
+        tuple[Tensor, Tensor]:
             ret_scores (batch_size, num_ret_modes)
             ret_idxs (batch_size, num_ret_modes)
 
     """
-    batch_size, num_modes, num_timestamps, num_feat_dim = pred_trajs.shape
-
     # FIXME: some values are nan
     pred_scores = torch.nan_to_num(pred_scores)
 
-    sorted_idxs = pred_scores.argsort(dim=-1, descending=True)
-    bs_idxs_full = torch.arange(batch_size).type_as(sorted_idxs)[:, None].repeat(1, num_modes)
-    sorted_pred_scores = pred_scores[bs_idxs_full, sorted_idxs]
-    sorted_pred_trajs = pred_trajs[bs_idxs_full, sorted_idxs]  # (batch_size, num_modes, num_timestamps, 7)
-    sorted_pred_goals = sorted_pred_trajs[:, :, -1, :]  # (batch_size, num_modes, 7)
-
-    dist = (sorted_pred_goals[:, :, None, 0:2] - sorted_pred_goals[:, None, :, 0:2]).norm(dim=-1)
+    sorted_pred_scores, sorted_idxs = pred_scores.sort(dim=-1, descending=True)
+
+    # NOTE: distances are compared with the threshold in fp32 even if predictions are in half precision
+    pred_trajs = pred_trajs.float()
+    if use_traj_dist:
+        dist = _trajectory_distance(pred_trajs)
+        dist = dist.gather(1, sorted_idxs[:, :, None].expand_as(dist))
+        dist = dist.gather(2, sorted_idxs[:, None, :].expand_as(dist))
+    else:
+        goals = pred_trajs[:, :, -1, 0:2]
+        sorted_goals = goals.gather(1, sorted_idxs[..., None].expand(-1, -1, 2))
+        dist = (sorted_goals[:, :, None, :] - sorted_goals[:, None, :, :]).norm(dim=-1)
     point_cover_mask = dist < dist_thresh
 
-    point_val = sorted_pred_scores.clone()  # (batch_size, N)
-    point_val_selected = torch.zeros_like(point_val)  # (batch_size, N)
+    ret_sorted_idxs = _greedy_select(sorted_pred_scores, point_cover_mask, num_ret_modes)
 
-    ret_idxs = sorted_idxs.new_zeros(batch_size, num_ret_modes).long()
-    ret_trajs = sorted_pred_trajs.new_zeros(batch_size, num_ret_modes, num_timestamps, num_feat_dim)
-    ret_scores = sorted_pred_trajs.new_zeros(batch_size, num_ret_modes)
-    bs_idxs = torch.arange(batch_size).type_as(ret_idxs)
+    ret_scores = sorted_pred_scores.gather(1, ret_sorted_idxs)
+    ret_idxs = sorted_idxs.gather(1, ret_sorted_idxs)
+    return ret_scores, ret_idxs
 
-    for k in range(num_ret_modes):
-        cur_idx = point_val.argmax(dim=-1)  # (batch_size)
-        ret_idxs[:, k] = cur_idx
 
-        new_cover_mask = point_cover_mask[bs_idxs, cur_idx]  # (batch_size, N)
-        point_val = point_val * (~new_cover_mask).float()  # (batch_size, N)
-        point_val_selected[bs_idxs, cur_idx] = -1
-        point_val += point_val_selected
+def batch_nms(
+    pred_trajs: Tensor,
+    pred_scores: Tensor,
+    dist_thresh: float,
+    num_ret_modes: int = 6,
+    *,
+    use_traj_dist: bool = False,
+) -> tuple[Tensor, Tensor, Tensor]:
+    """Execute NMS in batch.
 
-        ret_trajs[:, k] = sorted_pred_trajs[bs_idxs, cur_idx]
-        ret_scores[:, k] = sorted_pred_scores[bs_idxs, cur_idx]
+    Args:
+    ----
+        pred_trajs (Tensor): (batch_size, num_modes, num_timestamps, 7)
+        pred_scores (Tensor): (batch_size, num_modes)
+        dist_thresh (float): Distance threshold.
+        num_ret_modes (int, optional): The number of result modes. Defaults to 6.
+        use_traj_dist (bool, optional): Whether to use the average per-timestep distance of
+            whole trajectories instead of the distance of goals. Defaults to False.
 
-    bs_idxs = torch.arange(batch_size).type_as(sorted_idxs)[:, None].repeat(1, num_ret_modes)
+    Returns:
+    -------
+        tuple[Tensor, Tensor, Tensor]:
+            ret_trajs (batch_size, num_ret_modes, num_timestamps, 7)
+            ret_scores (batch_size, num_ret_modes)
+            ret_idxs (batch_size, num_ret_modes)
 
-    ret_idxs = sorted_idxs[bs_idxs, ret_idxs]
+    """
+    _, _, num_timestamps, num_feat_dim = pred_trajs.shape
+
+    ret_scores, ret_idxs = batch_nms_indices(
+        pred_trajs=pred_trajs,
+        pred_scores=pred_scores,
+        dist_thresh=dist_thresh,
+        num_ret_modes=num_ret_modes,
+        use_traj_dist=use_traj_dist,
+    )
+
+    # gather full trajectories only for the selected modes
+    ret_trajs = pred_trajs.gather(1, ret_idxs[:, :, None, None].expand(-1, -1, num_timestamps, num_feat_dim))
     return ret_trajs, ret_scores, ret_idxs
@@ -0,0 +1,99 @@
+"""Compare the latency of inference backends, which are selectable in the node by `inference_backend`.
+
+Example:
+-------
+    $ python -m benchmarks.backends config/mtr.yaml --backend EagerBackend TorchScriptBackend --num-agent 1 8 32
+
+    # ONNX Runtime with the model exported by `python -m awml_pred.deploy.export`, which has dynamic shapes
+    $ python -m benchmarks.backends config/mtr.yaml --backend EagerBackend OnnxRuntimeBackend --onnx mtr.onnx --num-agent 1 8
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, create_dummy_inputs
+from awml_pred.models import build_model
+
+from .common import measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="A/B latency report of inference backends.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument(
+        "--backend",
+        type=str,
+        nargs="+",
+        default=["EagerBackend", "TorchCompileBackend", "TorchScriptBackend"],
+        help="Names of backends, the first one is used as the reference.",
+    )
+    parser.add_argument("--onnx", type=str, default=None, help="ONNX model used by OnnxRuntimeBackend.")
+    parser.add_argument("--num-agent", type=int, nargs="+", default=[1, 8, 32], help="Numbers of agents.")
+    parser.add_argument("--agent-bucket", type=int, nargs="*", default=None, help="Bucket sizes of agents.")
+    parser.add_argument("--num-polyline", type=int, default=768, help="Number of polylines.")
+    parser.add_argument("--num-iters", type=int, default=20, help="Number of measured iterations.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint)
+
+    samples = {
+        num_agent: create_dummy_inputs(
+            num_agent=num_agent,
+            num_polyline=args.num_polyline,
+            num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+            num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+            device=args.device,
+            seed=num_agent,
+        )
+        for num_agent in args.num_agent
+    }
+
+    reference: dict[int, tuple[torch.Tensor, torch.Tensor]] = {}
+    for name in args.backend:
+        backend_cfg = {"name": name, "device": args.device}
+        if args.agent_bucket:
+            backend_cfg["shape_bucket"] = {"agent_sizes": args.agent_bucket}
+        if args.onnx is not None and name == "OnnxRuntimeBackend":
+            backend_cfg["onnx_path"] = args.onnx
+            backend_cfg["custom_imports"] = ["projects.MTR.deploys.ort_kernels"]
+        backend = build_backend(backend_cfg, model)
+
+        start = time.perf_counter()
+        backend.warmup(samples[min(samples)])
+        for sample in samples.values():
+            backend(**sample)
+        warmup_time = time.perf_counter() - start
+        print(f"[{name}] warm-up: {warmup_time:.2f}s")
+
+        for num_agent, sample in samples.items():
+            pred_scores, pred_trajs = backend(**sample)
+            if num_agent not in reference:
+                reference[num_agent] = (pred_scores, pred_trajs)
+            ref_scores, ref_trajs = reference[num_agent]
+            max_diff = max(
+                (pred_scores - ref_scores).abs().max().item(),
+                (pred_trajs - ref_trajs).abs().max().item(),
+            )
+            latency = measure_latency(lambda s=sample: backend(**s), num_iters=args.num_iters, num_warmup=0)
+            print(
+                f"[{name}] A={num_agent}: mean={latency['mean']:.2f}ms, p50={latency['p50']:.2f}ms, "
+                f"p99={latency['p99']:.2f}ms, max diff={max_diff:.2e}",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare the time to load checkpoints into `MTR`, which is a large part of the node startup.
+
+Example:
+-------
+    $ python -m awml_pred.deploy.convert_checkpoint mtr_best.pth mtr_weights.pth --dtype bf16
+    $ python -m benchmarks.checkpoint config/mtr.yaml mtr_best.pth mtr_weights.pth
+
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.models import build_model
+
+from .common import measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency report of loading checkpoints.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("checkpoints", type=str, nargs="+", help="Checkpoint files.")
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+
+    for checkpoint in args.checkpoints:
+        for mmap in (False, True):
+            latency = measure_latency(
+                lambda c=checkpoint, m=mmap: load_checkpoint(model, c, mmap=m),
+                num_iters=args.num_iters,
+                num_warmup=1,
+            )
+            print(f"[{checkpoint}] mmap={mmap}: mean={latency['mean']:.2f}ms, max={latency['max']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
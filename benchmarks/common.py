@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import resource
+import time
+from typing import Any, Callable
+
+import numpy as np
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+__all__ = (
+    "compute_min_ade_fde",
+    "get_peak_rss",
+    "measure_latency",
+    "measure_peak_memory",
+    "reset_peak_rss",
+    "summarize_latency",
+)
+
+
+def summarize_latency(latencies: list[float]) -> dict[str, float]:
+    """Return the summary of latencies.
+
+    Args:
+    ----
+        latencies (list[float]): Latencies in [ms].
+
+    Returns:
+    -------
+        dict[str, float]: Mean, median, p90, p99 and max latencies in [ms].
+
+    """
+    values = np.asarray(latencies, dtype=np.float64)
+    return {
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def measure_latency(func: Callable[[], Any], num_iters: int = 50, num_warmup: int = 5) -> dict[str, float]:
+    """Measure latencies of the input function.
+
+    Args:
+    ----
+        func (Callable[[], Any]): Function to be measured.
+        num_iters (int, optional): Number of measured iterations. Defaults to 50.
+        num_warmup (int, optional): Number of warmup iterations. Defaults to 5.
+
+    Returns:
+    -------
+        dict[str, float]: Summary of latencies in [ms].
+
+    """
+    for _ in range(num_warmup):
+        func()
+
+    latencies = []
+    for _ in range(num_iters):
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        func()
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        latencies.append((time.perf_counter() - start) * 1e3)
+    return summarize_latency(latencies)
+
+
+def measure_peak_memory(func: Callable[[], Any], device: str | torch.device = "cpu") -> int:
+    """Measure the peak memory allocated by torch while running the input function.
+
+    On CUDA, the allocator statistics are used. On CPU, allocation events recorded by `torch.profiler`
+    are accumulated in time order.
+
+    Args:
+    ----
+        func (Callable[[], Any]): Function to be measured.
+        device (str | torch.device, optional): Device name. Defaults to "cpu".
+
+    Returns:
+    -------
+        int: Peak memory in [byte], relative to the memory allocated before running.
+
+    """
+    device = torch.device(device)
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+        torch.cuda.reset_peak_memory_stats(device)
+        base = torch.cuda.memory_allocated(device)
+        func()
+        torch.cuda.synchronize(device)
+        return torch.cuda.max_memory_allocated(device) - base
+
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        func()
+
+    current = peak = 0
+    for event in sorted(prof.events(), key=lambda e: e.time_range.start):
+        current += event.self_cpu_memory_usage
+        peak = max(peak, current)
+    return peak
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size of the current process, which is supported only on Linux.
+
+    Returns:
+    -------
+        bool: Whether the peak is reset.
+
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def get_peak_rss() -> int:
+    """Return the peak resident set size of the current process.
+
+    `VmHWM` is read on Linux, which is reset by `reset_peak_rss()`. Otherwise, the peak since the process started is
+    returned.
+
+    Returns:
+    -------
+        int: Peak RSS in [byte].
+
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def compute_min_ade_fde(pred_trajs: torch.Tensor, gt_trajs: torch.Tensor) -> dict[str, float]:
+    """Return minADE and minFDE averaged over targets.
+
+    Args:
+    ----
+        pred_trajs (torch.Tensor): Predicted trajectories, in shape (B, M, T, D) where D >= 2.
+        gt_trajs (torch.Tensor): Reference trajectories, in shape (B, T, D) where D >= 2.
+
+    Returns:
+    -------
+        dict[str, float]: minADE and minFDE in [m].
+
+    """
+    dist = (pred_trajs[..., :2] - gt_trajs[:, None, :, :2]).norm(dim=-1)
+    return {
+        "minADE": dist.mean(dim=-1).amin(dim=-1).mean().item(),
+        "minFDE": dist[..., -1].amin(dim=-1).mean().item(),
+    }
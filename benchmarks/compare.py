@@ -0,0 +1,96 @@
+"""Compare results of `benchmarks.end_to_end` with a baseline, and flag regressions.
+
+Results are matched by scene parameters, and a regression is flagged if the mean or p90 latency of any stage, or the
+peak RSS, exceeds the baseline by more than the threshold. The exit code is 1 if any regression is found.
+
+Example:
+-------
+    $ python -m benchmarks.compare baseline.json result.json --threshold 0.1
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+METRICS = ("mean", "p90")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare end-to-end benchmark results with a baseline.")
+    parser.add_argument("baseline", type=str, help="Baseline JSON file.")
+    parser.add_argument("result", type=str, help="Result JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative increase.")
+    parser.add_argument("--memory-threshold", type=float, default=None, help="Allowed relative increase of RSS.")
+    return parser.parse_args()
+
+
+def _key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def compare(baseline: dict, result: dict, threshold: float, memory_threshold: float | None = None) -> list[str]:
+    """Compare results with the baseline.
+
+    Args:
+    ----
+        baseline (dict): Baseline report.
+        result (dict): Result report.
+        threshold (float): Allowed relative increase of latency.
+        memory_threshold (float | None, optional): Allowed relative increase of peak RSS. Defaults to `threshold`.
+
+    Returns:
+    -------
+        list[str]: Messages of regressions.
+
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    baseline_results = {_key(item["params"]): item for item in baseline["results"]}
+
+    regressions = []
+    for item in result["results"]:
+        name = ", ".join(f"{k}={v}" for k, v in item["params"].items())
+        base = baseline_results.get(_key(item["params"]))
+        if base is None:
+            print(f"[{name}] no baseline")
+            continue
+
+        values = [
+            (f"{stage}.{metric}", base["latency"][stage][metric], item["latency"][stage][metric], threshold, "ms")
+            for stage in item["latency"]
+            if stage in base["latency"]
+            for metric in METRICS
+        ]
+        values.append(("peak_rss", base["peak_rss"] / 1024**2, item["peak_rss"] / 1024**2, memory_threshold, "MiB"))
+        for metric, base_value, value, limit, unit in values:
+            ratio = value / base_value - 1.0 if base_value > 0 else 0.0
+            flag = ratio > limit
+            print(
+                f"[{name}] {metric}: {base_value:.2f}{unit} -> {value:.2f}{unit} ({ratio:+.1%})"
+                + (" REGRESSION" if flag else ""),
+            )
+            if flag:
+                regressions.append(f"[{name}] {metric}: {ratio:+.1%} > {limit:.1%}")
+    return regressions
+
+
+def main() -> None:
+    args = parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.result) as f:
+        result = json.load(f)
+
+    regressions = compare(baseline, result, args.threshold, args.memory_threshold)
+    if len(regressions) > 0:
+        print(f"{len(regressions)} regressions are found:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions are found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark `MTRDecoder.apply_dynamic_map_collection` against the dense reference implementation.
+
+Example:
+-------
+    $ python -m benchmarks.dynamic_map_collection --batch-size 1 4 --chunk-size 8 16 80
+
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import torch
+import torch.nn.functional as F
+
+from awml_pred.common import Config
+from awml_pred.models import build_decoder
+from awml_pred.typing import Tensor
+
+from .common import measure_latency, measure_peak_memory
+
+
+def dense_map_collection(
+    map_pos: Tensor,
+    map_mask: Tensor,
+    pred_waypoints: Tensor,
+    base_map_idxs: Tensor,
+    num_waypoint_polylines: int,
+) -> Tensor:
+    """Reference implementation, which materializes the (B, Q, K, T) distance tensor.
+
+    Args:
+    ----
+        map_pos (Tensor): Polyline centers, in shape (B, K, 3).
+        map_mask (Tensor): Polyline valid mask, in shape (B, K).
+        pred_waypoints (Tensor): Predicted waypoints, in shape (B, Q, T, 2).
+        base_map_idxs (Tensor): Base region indices, in shape (B, Q, Nb).
+        num_waypoint_polylines (int): Number of polylines collected around waypoints.
+
+    Returns:
+    -------
+        Tensor: Sorted collected indices, where duplicates are filled with -1.
+
+    """
+    map_pos = map_pos.clone()
+    map_pos.masked_fill_(~map_mask[..., None], torch.nan)
+    num_polylines = map_pos.shape[1]
+
+    dynamic_dist: Tensor = (pred_waypoints[:, :, None, :, 0:2] - map_pos[:, None, :, None, 0:2]).norm(dim=-1)
+    dynamic_dist = dynamic_dist.min(dim=-1)[0]
+
+    dynamic_topk_dist, dynamic_map_idxs = dynamic_dist.topk(
+        k=min(num_polylines, num_waypoint_polylines),
+        dim=-1,
+        largest=False,
+    )
+    dynamic_map_idxs.masked_fill_(dynamic_topk_dist.isnan(), -1)
+    if dynamic_map_idxs.shape[-1] < num_waypoint_polylines:
+        dynamic_map_idxs = F.pad(
+            dynamic_map_idxs,
+            pad=(0, num_waypoint_polylines - dynamic_map_idxs.shape[-1]),
+            mode="constant",
+            value=-1,
+        )
+
+    collected_idxs = torch.cat([base_map_idxs, dynamic_map_idxs], dim=-1)
+
+    sorted_idxs: Tensor = collected_idxs.sort(dim=-1)[0]
+    duplicate_mask = torch.ones_like(collected_idxs, dtype=torch.bool)
+    duplicate_mask[..., 1:] = sorted_idxs[..., 1:] - sorted_idxs[..., :-1] != 0
+    return torch.masked_fill(sorted_idxs, ~duplicate_mask, -1).int()
+
+
+def _is_same_collection(lhs: Tensor, rhs: Tensor) -> bool:
+    """Return whether two collections contain the same indices for every query, ignoring the order."""
+    return torch.equal(lhs.sort(dim=-1)[0], rhs.sort(dim=-1)[0])
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark dynamic map collection of MTRDecoder.")
+    parser.add_argument("--config", type=str, default="config/mtr.yaml", help="Model config file.")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 4], help="Numbers of target agents.")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[8, 16, 80], help="Waypoint chunk sizes.")
+    parser.add_argument("--num-query", type=int, default=64, help="Number of intention queries.")
+    parser.add_argument("--num-polylines", type=int, default=768, help="Number of map polylines.")
+    parser.add_argument("--num-iters", type=int, default=50, help="Number of measured iterations.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    decoder = build_decoder(cfg.model.decoder).to(args.device).eval()
+
+    num_future_frames = decoder.num_future_frames
+    for batch_size in args.batch_size:
+        map_pos = torch.randn(batch_size, args.num_polylines, 3, device=args.device) * 100.0
+        map_mask = torch.rand(batch_size, args.num_polylines, device=args.device) > 0.1
+        pred_waypoints = torch.randn(batch_size, args.num_query, num_future_frames, 2, device=args.device) * 50.0
+
+        with torch.no_grad():
+            _, base_map_idxs = decoder.apply_dynamic_map_collection(
+                map_pos=map_pos,
+                map_mask=map_mask,
+                pred_waypoints=pred_waypoints,
+                base_region_offset=decoder.map_center_offset,
+                num_query=args.num_query,
+                num_waypoint_polylines=decoder.num_waypoint_map_polylines,
+                num_base_polylines=decoder.num_base_map_polylines,
+            )
+
+            def run_dense() -> Tensor:
+                return dense_map_collection(
+                    map_pos,
+                    map_mask,
+                    pred_waypoints,
+                    base_map_idxs,
+                    decoder.num_waypoint_map_polylines,
+                )
+
+            dense_idxs = run_dense()
+            dense_latency = measure_latency(run_dense, num_iters=args.num_iters)
+            dense_memory = measure_peak_memory(run_dense, device=args.device)
+            print(
+                f"[B={batch_size}] dense: "
+                f"mean={dense_latency['mean']:.3f}ms, peak={dense_memory / 1024**2:.2f}MiB",
+            )
+
+            for chunk_size in args.chunk_size:
+                decoder.map_collection_chunk_size = chunk_size
+
+                def run_chunked() -> Tensor:
+                    return decoder.apply_dynamic_map_collection(
+                        map_pos=map_pos,
+                        map_mask=map_mask,
+                        pred_waypoints=pred_waypoints,
+                        base_region_offset=decoder.map_center_offset,
+                        num_query=args.num_query,
+                        num_waypoint_polylines=decoder.num_waypoint_map_polylines,
+                        num_base_polylines=decoder.num_base_map_polylines,
+                        base_map_idxs=base_map_idxs,
+                    )[0]
+
+                is_same = _is_same_collection(run_chunked(), dense_idxs)
+                latency = measure_latency(run_chunked, num_iters=args.num_iters)
+                memory = measure_peak_memory(run_chunked, device=args.device)
+                print(
+                    f"[B={batch_size}] chunk={chunk_size}: "
+                    f"mean={latency['mean']:.3f}ms, peak={memory / 1024**2:.2f}MiB, "
+                    f"memory reduction={dense_memory / max(memory, 1):.1f}x, same result={is_same}",
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Report end-to-end latency of preprocess, inference and postprocess on synthetic scenarios without ROS.
+
+Scenarios are generated by `benchmarks.synthetic` for every combination of map sizes, numbers of agents, history
+lengths and numbers of ego hypotheses, and each hypothesis is predicted in order as the node does. Latency of each
+stage, peak RSS and throughput are written to a JSON file, which can be compared with a baseline by
+`benchmarks.compare`.
+
+The preprocess stage runs `TargetCentricPolyline` and `embed_agents` of `utils.scenario`, which is the vectorized
+equivalent of the agent embedding of the node. History lengths other than the one embedded by the model configuration
+are rejected, because the time embedding is a part of agent features.
+
+Example:
+-------
+    $ python -m benchmarks.end_to_end config/mtr.yaml --checkpoint mtr_best.pth \
+        --intention-point-file data/cluster64_dict.pkl --map-sizes 200 400 --num-agents 16 64 --output result.json
+    $ python -m benchmarks.compare baseline.json result.json --threshold 0.1
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, replace
+
+import numpy as np
+import torch
+
+from autoware_mtr.datatype import AgentLabel
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, fuse_for_inference
+from awml_pred.models import build_model
+from utils.load import LoadIntentionPoint
+from utils.scenario import ScenarioPreprocessor, to_world_coords
+
+from .common import get_peak_rss, reset_peak_rss, summarize_latency
+from .synthetic import SceneConfig, generate_scenarios
+
+STAGES = ("preprocess", "inference", "postprocess", "total")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end latency report on synthetic scenarios.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--intention-point-file", type=str, required=True, help="Intention point file.")
+    parser.add_argument("--backend", type=str, default="EagerBackend", help="Name of the inference backend.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--num-threads", type=int, default=None, help="Number of torch threads.")
+    parser.add_argument("--map-sizes", type=float, nargs="+", default=[200.0], help="Map sizes in [m].")
+    parser.add_argument("--num-agents", type=int, nargs="+", default=[32], help="Numbers of agents.")
+    parser.add_argument(
+        "--num-timestamps",
+        type=int,
+        nargs="+",
+        default=[11],
+        help="Numbers of past timestamps, which must be the one of the model configuration.",
+    )
+    parser.add_argument("--num-hypotheses", type=int, nargs="+", default=[1], help="Numbers of ego hypotheses.")
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations.")
+    parser.add_argument("--num-warmup", type=int, default=1, help="Number of warmup iterations.")
+    parser.add_argument("--output", type=str, default=None, help="Output JSON file.")
+    return parser.parse_args()
+
+
+def measure_scene(
+    backend: object,
+    intention_points: np.ndarray,
+    scene_cfg: SceneConfig,
+    device: str,
+    num_iters: int,
+    num_warmup: int,
+) -> dict:
+    """Measure latency of each stage for all hypotheses of a synthetic scene.
+
+    Args:
+    ----
+        backend (object): Inference backend.
+        intention_points (np.ndarray): Intention points of vehicles in the shape of (1, M, 2).
+        scene_cfg (SceneConfig): Scene configuration.
+        device (str): Device name.
+        num_iters (int): Number of measured iterations.
+        num_warmup (int): Number of warmup iterations.
+
+    Returns:
+    -------
+        dict: Latency summaries of stages in [ms], peak RSS in [byte] and throughput.
+
+    """
+    # NOTE: the map is shared by hypotheses as the node converts it once on startup
+    scenarios = generate_scenarios(scene_cfg)
+    preprocess = ScenarioPreprocessor(intention_points, [AgentLabel.VEHICLE.value], polylines=scenarios[0].polylines)
+    scenarios = [replace(scenario, polylines=None) for scenario in scenarios]
+    latencies = {name: [] for name in STAGES}
+    reset_peak_rss()
+    for i in range(num_warmup + num_iters):
+        elapsed = dict.fromkeys(STAGES, 0.0)
+        for scenario in scenarios:
+            start = time.perf_counter()
+            inputs, current_targets = preprocess(scenario)
+            inputs = {name: torch.from_numpy(value).to(device) for name, value in inputs.items()}
+            end_preprocess = time.perf_counter()
+
+            with torch.no_grad():
+                pred_scores, pred_trajs = backend(**inputs)
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+            end_inference = time.perf_counter()
+
+            to_world_coords(pred_scores.cpu().numpy(), pred_trajs.cpu().numpy(), current_targets)
+            end = time.perf_counter()
+
+            elapsed["preprocess"] += end_preprocess - start
+            elapsed["inference"] += end_inference - end_preprocess
+            elapsed["postprocess"] += end - end_inference
+            elapsed["total"] += end - start
+        if i >= num_warmup:
+            for name, value in elapsed.items():
+                latencies[name].append(value * 1e3)
+
+    total = np.mean(latencies["total"]) / 1e3
+    return {
+        "latency": {name: summarize_latency(values) for name, values in latencies.items()},
+        "peak_rss": get_peak_rss(),
+        "throughput": {
+            "scenes": 1.0 / total,
+            "agents": scene_cfg.num_agent / total,
+        },
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if args.num_threads is not None:
+        torch.set_num_threads(args.num_threads)
+
+    cfg = Config.from_file(args.config)
+    # NOTE: agent features are 17 dims and the time embedding of T + 1 dims, see `embed_agents`
+    num_timestamp = cfg.model.encoder.agent_polyline_encoder.in_channels - 1 - 18
+    if any(value != num_timestamp for value in args.num_timestamps):
+        msg = f"--num-timestamps must be {num_timestamp} for {args.config}, but got {args.num_timestamps}"
+        raise SystemExit(msg)
+
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint, mmap=True)
+    model = fuse_for_inference(model).eval()
+    backend = build_backend({"name": args.backend, "device": args.device}, model)
+
+    intention_points = LoadIntentionPoint(args.intention_point_file, ["VEHICLE"])()["intention_points"]
+
+    results = []
+    for map_size, num_agent, num_timestamp, num_hypothesis in itertools.product(
+        args.map_sizes,
+        args.num_agents,
+        args.num_timestamps,
+        args.num_hypotheses,
+    ):
+        scene_cfg = SceneConfig(
+            map_size=map_size,
+            num_agent=num_agent,
+            num_timestamp=num_timestamp,
+            num_hypothesis=num_hypothesis,
+        )
+        result = measure_scene(backend, intention_points, scene_cfg, args.device, args.num_iters, args.num_warmup)
+        results.append({"params": asdict(scene_cfg), **result})
+
+        latency = result["latency"]
+        print(
+            f"[map={map_size:.0f}m, agents={num_agent}, timestamps={num_timestamp}, hypotheses={num_hypothesis}] "
+            + ", ".join(f"{name}: {latency[name]['mean']:.2f}ms" for name in STAGES)
+            + f", peak RSS: {result['peak_rss'] / 1024**2:.1f}MiB, "
+            f"throughput: {result['throughput']['scenes']:.2f} scenes/s, {result['throughput']['agents']:.1f} agents/s",
+        )
+
+    if args.output is not None:
+        report = {
+            "environment": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "torch": torch.__version__,
+                "num_threads": torch.get_num_threads(),
+                "num_cpus": os.cpu_count(),
+            },
+            "args": vars(args),
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
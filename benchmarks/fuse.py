@@ -0,0 +1,75 @@
+"""Check the equivalence and speedup of folding BatchNorm into Linear with a trained checkpoint.
+
+Example:
+-------
+    $ python -m benchmarks.fuse config/mtr.yaml mtr_best.pth --inputs recorded/
+
+"""
+
+from __future__ import annotations
+
+import argparse
+from copy import deepcopy
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import create_dummy_inputs, fuse_for_inference, load_recorded_inputs
+from awml_pred.models import build_model
+
+from .common import measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Equivalence and latency of BatchNorm folding.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("checkpoint", type=str, help="Trained checkpoint file, whose BatchNorm has running stats.")
+    parser.add_argument("--inputs", type=str, default=None, help="Recorded inputs, a .npz file or a directory.")
+    parser.add_argument("--num-synthetic", type=int, default=4, help="Number of synthetic inputs without --inputs.")
+    parser.add_argument("--atol", type=float, default=1e-4, help="Absolute tolerance of outputs.")
+    parser.add_argument("--num-iters", type=int, default=10, help="Number of measured iterations.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    model, _ = load_checkpoint(model, args.checkpoint)
+    model.to(args.device).eval()
+    fused = fuse_for_inference(deepcopy(model))
+    num_norm = sum(isinstance(m, torch.nn.BatchNorm1d) for m in model.modules())
+    num_left = sum(isinstance(m, torch.nn.BatchNorm1d) for m in fused.modules())
+    print(f"BatchNorm layers: {num_norm} -> {num_left}")
+
+    if args.inputs is not None:
+        inputs = load_recorded_inputs(args.inputs, device=args.device)
+    else:
+        inputs = [
+            create_dummy_inputs(
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                device=args.device,
+                seed=i,
+            )
+            for i in range(args.num_synthetic)
+        ]
+
+    max_diff = 0.0
+    with torch.no_grad():
+        for item in inputs:
+            for lhs, rhs in zip(model(**item), fused(**item)):
+                max_diff = max(max_diff, (lhs - rhs).abs().max().item())
+
+        base_latency = measure_latency(lambda: model(**inputs[0]), num_iters=args.num_iters)
+        fused_latency = measure_latency(lambda: fused(**inputs[0]), num_iters=args.num_iters)
+    print(f"max diff: {max_diff:.2e} ({'OK' if max_diff <= args.atol else 'NG'} with atol={args.atol})")
+    print(
+        f"latency: {base_latency['mean']:.2f}ms -> {fused_latency['mean']:.2f}ms "
+        f"({base_latency['mean'] / fused_latency['mean']:.2f}x)",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Benchmark the conversion of lanelet maps to `AWMLStaticMap` against the reference interpolation.
+
+The resampling of raw polylines is compared with the loop-based reference with `interp1d`, and `convert_lanelet` is
+measured serially and with process pools, followed by exports of all polylines. Besides the given `.osm` files, a
+synthetic map of a road grid is written with `--synthetic`, where adjacent lanes share their boundaries.
+
+Example:
+-------
+    $ python -m benchmarks.lanelet_conversion data/bs.lanelet2_map.osm --synthetic 16 --num-workers 0 2 4
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import os.path as osp
+import tempfile
+import time
+
+import lanelet2
+import numpy as np
+from scipy.interpolate import interp1d
+
+from utils.lanelet_converter import WAYPOINT_INTERVAL, _get_waypoints, _interpolate_lane, _load_osm, convert_lanelet
+
+from .common import measure_latency
+
+# origin of the synthetic map, which is written in lat/lon
+SYNTHETIC_ORIGIN = (35.0, 139.0)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the conversion of lanelet maps.")
+    parser.add_argument("maps", type=str, nargs="*", help="Lanelet map files (.osm).")
+    parser.add_argument("--synthetic", type=int, default=None, help="Number of roads in each axis of a synthetic map.")
+    parser.add_argument("--num-lanes", type=int, default=3, help="Number of lanes of each synthetic road.")
+    parser.add_argument("--num-workers", type=int, nargs="+", default=[0, 2], help="Numbers of worker processes.")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Number of lanelets in each chunk.")
+    parser.add_argument("--num-iters", type=int, default=3, help="Number of measured iterations.")
+    return parser.parse_args()
+
+
+def interpolate_lane_reference(waypoints: np.ndarray, interval: float = WAYPOINT_INTERVAL) -> np.ndarray:
+    """Reference implementation, which accumulates distances in a loop and interpolates with `interp1d`.
+
+    Args:
+    ----
+        waypoints (np.ndarray): Waypoints in shape (N, 3).
+        interval (float, optional): Interval of resampled waypoints in [m]. Defaults to `WAYPOINT_INTERVAL`.
+
+    Returns:
+    -------
+        np.ndarray: Resampled waypoints in shape (M, 3).
+
+    """
+    distances = np.zeros(len(waypoints))
+    for i in range(1, len(waypoints)):
+        distances[i] = distances[i - 1] + np.linalg.norm(waypoints[i] - waypoints[i - 1])
+
+    new_distances = np.append(np.arange(0, distances[-1], interval), distances[-1])
+    new_waypoints = np.vstack(
+        [interp1d(distances, waypoints[:, i], kind="linear")(new_distances) for i in range(3)],
+    ).T
+
+    if not np.allclose(new_waypoints[0], waypoints[0]):
+        new_waypoints = np.vstack((waypoints[0], new_waypoints))
+    if not np.allclose(new_waypoints[-1], waypoints[-1]):
+        new_waypoints = np.vstack((new_waypoints, waypoints[-1]))
+    return new_waypoints
+
+
+def write_synthetic_map(filename: str, num_roads: int, num_lanes: int = 3, road_interval: float = 100.0) -> None:
+    """Write a grid of straight roads, whose lanes share boundaries with adjacent lanes and successors.
+
+    Each road between intersections is split into lanelets of 25m, and a crosswalk is placed at the start of each road.
+
+    Args:
+    ----
+        filename (str): Output `.osm` file.
+        num_roads (int): Number of roads in each axis.
+        num_lanes (int, optional): Number of lanes of each road. Defaults to 3.
+        road_interval (float, optional): Distance between roads in [m]. Defaults to 100.0.
+
+    """
+    lane_width, lanelet_length, point_interval = 3.5, 25.0, 1.0
+    lanelet_map = lanelet2.core.LaneletMap()
+
+    def linestring(points: list[lanelet2.core.Point3d], attributes: dict[str, str]) -> lanelet2.core.LineString3d:
+        return lanelet2.core.LineString3d(lanelet2.core.getId(), points, lanelet2.core.AttributeMap(attributes))
+
+    def lanelet(left: lanelet2.core.LineString3d, right: lanelet2.core.LineString3d, subtype: str) -> None:
+        attributes = {"type": "lanelet", "subtype": subtype, "location": "urban", "one_way": "yes"}
+        lanelet_map.add(
+            lanelet2.core.Lanelet(lanelet2.core.getId(), left, right, lanelet2.core.AttributeMap(attributes)),
+        )
+
+    num_points = int(lanelet_length / point_interval) + 1
+    for axis in range(2):
+        for i in range(num_roads):
+            for j in range(num_roads - 1):
+                start = j * road_interval
+                # NOTE: points at the ends of lanelets are shared with successors
+                stations: list[list[lanelet2.core.Point3d]] = []
+                for k in range(num_lanes + 1):
+                    across = i * road_interval + (k - num_lanes / 2) * lane_width
+                    coords = [
+                        (start + along, across) if axis == 0 else (across, start + along)
+                        for along in np.arange(0, road_interval + 1e-3, point_interval)
+                    ]
+                    stations.append([lanelet2.core.Point3d(lanelet2.core.getId(), x, y, 0.0) for x, y in coords])
+
+                step = num_points - 1
+                for s in range(0, len(stations[0]) - 1, step):
+                    bounds = []
+                    for k, points in enumerate(stations):
+                        is_edge = k in (0, num_lanes)
+                        attributes = {"type": "road_border"} if is_edge else {"type": "line_thin", "subtype": "dashed"}
+                        bounds.append(linestring(points[s : s + num_points], attributes))
+                    for k in range(num_lanes):
+                        lanelet(bounds[k + 1], bounds[k], "road")
+
+                crosswalk = [stations[0][:4], stations[-1][:4]]
+                lanelet(
+                    linestring(crosswalk[1], {"type": "virtual"}),
+                    linestring(crosswalk[0], {"type": "virtual"}),
+                    "crosswalk",
+                )
+
+    projector = lanelet2.projection.UtmProjector(lanelet2.io.Origin(*SYNTHETIC_ORIGIN))
+    lanelet2.io.write(filename, lanelet_map, projector)
+
+
+def measure_map(filename: str, num_workers: list[int], chunk_size: int, num_iters: int) -> None:
+    lanelet_map = _load_osm(filename)
+    polylines = [_get_waypoints(lanelet.centerline) for lanelet in lanelet_map.laneletLayer]
+    polylines += [_get_waypoints(linestring) for linestring in lanelet_map.lineStringLayer]
+    num_lanelets, num_points = len(lanelet_map.laneletLayer), sum(len(polyline) for polyline in polylines)
+    print(f"[{osp.basename(filename)}] lanelets: {num_lanelets}, polylines: {len(polylines)}, points: {num_points}")
+
+    error = max(
+        np.abs(interpolate_lane_reference(polyline) - _interpolate_lane(polyline)).max() for polyline in polylines
+    )
+    for name, func in (("reference", interpolate_lane_reference), ("interp", _interpolate_lane)):
+        latency = measure_latency(lambda f=func: [f(polyline) for polyline in polylines], num_iters, num_warmup=1)
+        print(f"    resample[{name}]: mean={latency['mean']:.2f}ms, p50={latency['p50']:.2f}ms")
+    print(f"    max error of resampling: {error:.2e}m")
+
+    expected = None
+    for workers in num_workers:
+        static_map = None
+        latencies = []
+        for _ in range(num_iters):
+            start = time.perf_counter()
+            static_map = convert_lanelet(filename, num_workers=workers, chunk_size=chunk_size)
+            latencies.append((time.perf_counter() - start) * 1e3)
+        polyline = static_map.get_all_polyline(as_array=True, full=True)
+        expected = polyline if expected is None else expected
+        is_same = polyline.shape == expected.shape and np.array_equal(polyline, expected)
+        boundaries = [
+            bound for lane in static_map.get_lane_segments() for bound in lane.left_boundaries + lane.right_boundaries
+        ]
+        num_unique = len({id(bound) for bound in boundaries})
+        print(
+            f"    convert[workers={workers}]: mean={np.mean(latencies):.2f}ms, min={np.min(latencies):.2f}ms, "
+            f"boundaries: {num_unique}/{len(boundaries)} converted, same as first: {is_same}",
+        )
+
+    for full, as_3d in ((True, True), (True, False), (False, True)):
+        latency = measure_latency(
+            lambda f=full, d=as_3d: static_map.get_all_polyline(as_array=True, full=f, as_3d=d),
+            num_iters,
+            num_warmup=1,
+        )
+        print(f"    export[full={full}, as_3d={as_3d}]: mean={latency['mean']:.3f}ms")
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filenames = list(args.maps)
+        if args.synthetic is not None:
+            filename = osp.join(tmpdir, f"synthetic_{args.synthetic}.osm")
+            write_synthetic_map(filename, args.synthetic, num_lanes=args.num_lanes)
+            filenames.append(filename)
+
+        for filename in filenames:
+            measure_map(filename, args.num_workers, args.chunk_size, args.num_iters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Compare the adaptive resampling of map polylines with the fixed interval on a lanelet map.
+
+The map is converted with the fixed interval and with `AdaptiveResampling` for each tolerance, and the number of map
+points and batch polylines, the latency of conversion and preprocess, and the drift of predictions from the fixed
+interval are reported. Agents drive along lane centerlines of the map, and the drift is minADE and minFDE of
+predictions on the simplified map against the most likely mode on the fixed interval map.
+
+Example:
+-------
+    $ python -m benchmarks.map_resampling data/bs.lanelet2_map.osm config/mtr.yaml --checkpoint mtr_best.pth \
+        --intention-point-file data/cluster64_dict.pkl --tolerances 0.05 0.1 0.2
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from autoware_mtr.datatype import AgentLabel
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.datatype import MapType
+from awml_pred.deploy import build_backend, fuse_for_inference
+from awml_pred.models import build_model
+from utils.lanelet_converter import AdaptiveResampling, convert_lanelet
+from utils.load import LoadIntentionPoint
+from utils.polyline import TargetCentricPolyline
+from utils.scenario import Scenario, ScenarioPreprocessor
+
+from .common import compute_min_ade_fde, measure_latency
+
+# types of polylines simplified, the other types are resampled with the fixed interval
+SIMPLIFY_TYPES = (MapType.ROADWAY, MapType.DASHED, MapType.SOLID)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the adaptive resampling of map polylines.")
+    parser.add_argument("map", type=str, help="Lanelet map file (.osm).")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file.")
+    parser.add_argument("--intention-point-file", type=str, required=True, help="Intention point file.")
+    parser.add_argument("--tolerances", type=float, nargs="+", default=[0.05, 0.1, 0.2], help="Tolerances in [m].")
+    parser.add_argument("--max-interval", type=float, default=5.0, help="Max interval of simplified points in [m].")
+    parser.add_argument("--num-agents", type=int, default=32, help="Number of agents of each scenario.")
+    parser.add_argument("--num-scenarios", type=int, default=8, help="Number of scenarios.")
+    parser.add_argument("--num-iters", type=int, default=10, help="Number of measured iterations.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    return parser.parse_args()
+
+
+def generate_scenarios(points: np.ndarray, num_agents: int, num_scenarios: int, seed: int = 0) -> list[Scenario]:
+    """Generate scenarios where all agents are targets, and drive along lane centerlines at constant speeds.
+
+    Args:
+    ----
+        points (np.ndarray): Map points with the fixed interval in shape (N, 7).
+        num_agents (int): Number of agents of each scenario.
+        num_scenarios (int): Number of scenarios.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+    -------
+        list[Scenario]: Scenarios without maps.
+
+    """
+    rng = np.random.default_rng(seed)
+    starts = np.all(points[:, 3:6] == 0, axis=-1).nonzero()[0]
+    lanes = [
+        lane[:, :3]
+        for lane in np.split(points, starts[1:])
+        if lane[0, -1] == MapType.ROADWAY and len(lane) > 1
+    ]
+    timestamps = np.arange(11, dtype=np.float32) * 0.1
+
+    scenarios = []
+    for i in range(num_scenarios):
+        agents = np.zeros((num_agents, len(timestamps), 10))
+        for n in range(num_agents):
+            lane = lanes[rng.integers(len(lanes))]
+            distances = np.append(0.0, np.cumsum(np.linalg.norm(np.diff(lane, axis=0), axis=-1)))
+            speed = rng.uniform(0.0, 10.0)
+            current = rng.uniform(0.5, 1.0) * distances[-1]
+            stations = np.clip(current + (timestamps - timestamps[-1]) * speed, 0.0, distances[-1])
+            xyz = np.stack([np.interp(stations, distances, lane[:, k]) for k in range(3)], axis=-1)
+            segment = np.clip(np.searchsorted(distances, stations, side="right") - 1, 0, len(lane) - 2)
+            direction = lane[segment + 1] - lane[segment]
+            yaw = np.arctan2(direction[:, 1], direction[:, 0])
+            agents[n, :, 0:3] = xyz
+            agents[n, :, 3:6] = (4.5, 2.0, 1.7)
+            agents[n, :, 6] = yaw
+            agents[n, :, 7] = speed * np.cos(yaw)
+            agents[n, :, 8] = speed * np.sin(yaw)
+            agents[n, :, 9] = 1
+        scenarios.append(
+            Scenario(
+                scenario_id=f"seed{seed}_{i}",
+                agents=agents,
+                label_ids=np.zeros(num_agents, dtype=np.int64),
+                timestamps=timestamps,
+                target_indices=np.arange(num_agents),
+            ),
+        )
+    return scenarios
+
+
+def main() -> None:
+    args = parse_args()
+    model = build_model(Config.from_file(args.config).model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint, mmap=True)
+    model = fuse_for_inference(model).eval()
+    backend = build_backend({"name": "EagerBackend", "device": args.device}, model)
+    intention_points = LoadIntentionPoint(args.intention_point_file, ["VEHICLE"])()["intention_points"]
+
+    settings: dict[str, dict | None] = {"fixed": None}
+    for tolerance in args.tolerances:
+        config = AdaptiveResampling(tolerance=tolerance, max_interval=args.max_interval)
+        settings[f"tolerance={tolerance}"] = dict.fromkeys(SIMPLIFY_TYPES, config)
+
+    scenarios, reference = None, None
+    for name, resampling in settings.items():
+        start = time.perf_counter()
+        points = convert_lanelet(args.map, resampling=resampling).get_all_polyline(as_array=True, full=True)
+        convert_latency = (time.perf_counter() - start) * 1e3
+        if scenarios is None:
+            scenarios = generate_scenarios(points, args.num_agents, args.num_scenarios)
+
+        # NOTE: simplified polylines are separated by segments, because their intervals exceed the break distance
+        transform = TargetCentricPolyline(break_distance=1.0 if resampling is None else None)
+        start = time.perf_counter()
+        preprocess = ScenarioPreprocessor(
+            intention_points,
+            [AgentLabel.VEHICLE.value],
+            polylines=points,
+            polyline_transform=transform,
+        )
+        batch_latency = (time.perf_counter() - start) * 1e3
+        num_polylines = len(preprocess._shared_map[0])
+
+        latency = measure_latency(lambda p=preprocess: [p(scenario) for scenario in scenarios], args.num_iters)
+        outputs = []
+        with torch.no_grad():
+            for scenario in scenarios:
+                inputs, _ = preprocess(scenario)
+                inputs = {key: torch.from_numpy(value).to(args.device) for key, value in inputs.items()}
+                pred_scores, pred_trajs = backend(**inputs)
+                outputs.append((pred_scores.float().cpu(), pred_trajs.float().cpu()))
+
+        message = (
+            f"[{name}] points: {len(points)}, polylines: {num_polylines}, convert: {convert_latency:.1f}ms, "
+            f"batch: {batch_latency:.1f}ms, preprocess: {latency['mean'] / len(scenarios):.2f}ms/scenario"
+        )
+        if reference is None:
+            reference = outputs
+        else:
+            errors = []
+            for (_, pred_trajs), (ref_scores, ref_trajs) in zip(outputs, reference):
+                best = ref_trajs[torch.arange(len(ref_trajs)), ref_scores.argmax(dim=-1)]
+                errors.append(compute_min_ade_fde(pred_trajs, best))
+            message += ", " + ", ".join(
+                f"drift {key}: {np.mean([error[key] for error in errors]):.3f}m" for key in ("minADE", "minFDE")
+            )
+        print(message)
+
+
+if __name__ == "__main__":
+    main()
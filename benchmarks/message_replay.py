@@ -0,0 +1,384 @@
+"""Replay message streams through callbacks of the node with simulated time, and report node-level throughput.
+
+Streams of `TrackedObjects`, `Odometry` and `Trajectory` are stored in JSON Lines, where each line is
+`{"time": <sec>, "topic": <topic>, "msg": <fields>}`. Messages are delivered to `_tracked_objects_callback`,
+`_odometry_callback` and `_previous_trajectory_callback`, and `_callback` (and `_inference_callback` in the decoupled
+mode) runs at the period of its timer, all in the order of simulated time without waiting. If ROS 2 is not installed,
+stand-ins of `benchmarks.ros_standin` are used.
+
+Callbacks of the default callback group are mutually exclusive, so the queueing delay of each callback is simulated
+from measured costs as if messages arrived in real time. As subscriptions keep the last message and timers do not
+catch up, an event is dropped without running if the next event of the same callback arrives before it starts. The
+max sustainable tick rate is where the default callback group is fully busy with ticks and messages at their rates.
+
+Example:
+-------
+    # write a synthetic stream on the grid map of `benchmarks.synthetic`
+    $ python -m benchmarks.message_replay synthetic stream.jsonl --duration 30 --num-agent 32
+
+    $ python -m benchmarks.message_replay run stream.jsonl --params-file params.yaml --map synthetic:200 \
+        --param checkpoint_path:=mtr_best.pth --param inference_device:=cpu
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import sys
+import time
+import uuid as uuid_lib
+from typing import TYPE_CHECKING, Any, Callable, Iterable, NamedTuple
+
+import numpy as np
+
+from . import ros_standin
+from .common import summarize_latency
+from .synthetic import SceneConfig, generate_map
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# message types and callbacks of topics
+TOPICS = {
+    "tracked_objects": ("autoware_perception_msgs.msg", "TrackedObjects", "_tracked_objects_callback"),
+    "odometry": ("nav_msgs.msg", "Odometry", "_odometry_callback"),
+    "trajectory": ("autoware_planning_msgs.msg", "Trajectory", "_previous_trajectory_callback"),
+}
+
+
+class Event(NamedTuple):
+    time: float
+    order: int
+    name: str
+    callback: Callable[..., None]
+    args: tuple
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Node-level replay of message streams with simulated time.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Replay a stream through the node.")
+    run.add_argument("stream", type=str, help="Stream file in JSON Lines.")
+    run.add_argument("--params-file", type=str, default=None, help="Parameter file of the node.")
+    run.add_argument("--param", type=str, action="append", default=[], help="Parameter override, `name:=value`.")
+    run.add_argument("--map", type=str, default=None, help="`synthetic:<size>` or .npz of map points, not lanelet.")
+    run.add_argument("--output", type=str, default=None, help="Output JSON file.")
+
+    synthetic = subparsers.add_parser("synthetic", help="Write a synthetic stream.")
+    synthetic.add_argument("stream", type=str, help="Output stream file in JSON Lines.")
+    synthetic.add_argument("--duration", type=float, default=10.0, help="Duration in [s].")
+    synthetic.add_argument("--map-size", type=float, default=200.0, help="Map size in [m].")
+    synthetic.add_argument("--num-agent", type=int, default=32, help="Number of agents including the ego.")
+    synthetic.add_argument("--object-rate", type=float, default=10.0, help="Rate of tracked objects in [Hz].")
+    synthetic.add_argument("--odometry-rate", type=float, default=50.0, help="Rate of odometry in [Hz].")
+    synthetic.add_argument("--trajectory-rate", type=float, default=10.0, help="Rate of trajectory in [Hz], 0 to skip.")
+    synthetic.add_argument("--seed", type=int, default=0, help="Random seed.")
+    return parser.parse_args()
+
+
+def _message_type(topic: str) -> type:
+    module, name, _ = TOPICS[topic]
+    return getattr(importlib.import_module(module), name)
+
+
+def write_stream(filepath: str, records: Iterable[tuple[float, str, Any]]) -> None:
+    """Write messages to a stream file.
+
+    Args:
+    ----
+        filepath (str): Stream file in JSON Lines.
+        records (Iterable[tuple[float, str, Any]]): Simulated times in [s], topics and messages.
+
+    """
+    with open(filepath, "w") as f:
+        for t, topic, msg in records:
+            f.write(json.dumps({"time": t, "topic": topic, "msg": ros_standin.message_to_dict(msg)}) + "\n")
+
+
+def read_stream(filepath: str) -> list[tuple[float, str, Any]]:
+    """Read messages from a stream file, which are sorted by time.
+
+    Args:
+    ----
+        filepath (str): Stream file in JSON Lines.
+
+    Returns:
+    -------
+        list[tuple[float, str, Any]]: Simulated times in [s], topics and messages.
+
+    """
+    records = []
+    with open(filepath) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            msg = ros_standin.message_from_dict(_message_type(record["topic"]), record["msg"])
+            records.append((record["time"], record["topic"], msg))
+    records.sort(key=lambda record: record[0])
+    return records
+
+
+def _set_pose(pose: Any, xy: NDArray, yaw: float) -> None:
+    pose.position.x, pose.position.y, pose.position.z = float(xy[0]), float(xy[1]), 0.0
+    pose.orientation.z, pose.orientation.w = float(np.sin(yaw / 2)), float(np.cos(yaw / 2))
+
+
+def _set_stamp(header: Any, t: float) -> None:
+    header.stamp.sec, header.stamp.nanosec = int(t), int(round((t % 1) * 1e9)) % 10**9
+    header.frame_id = "map"
+
+
+def generate_stream(args: argparse.Namespace) -> list[tuple[float, str, Any]]:
+    """Generate a stream of agents driving along lanes of the synthetic map, where the first agent is the ego.
+
+    Returns:
+    -------
+        list[tuple[float, str, Any]]: Simulated times in [s], topics and messages.
+
+    """
+    rng = np.random.default_rng(args.seed)
+    _, lanes = generate_map(SceneConfig(map_size=args.map_size))
+    origins, velocities, yaws = [], [], []
+    for _ in range(args.num_agent):
+        start, end = lanes[rng.integers(len(lanes))]
+        direction = (end - start) / np.linalg.norm(end - start)
+        origins.append(start + direction * rng.uniform(0.1, 0.5) * np.linalg.norm(end - start))
+        velocities.append(direction * rng.uniform(0.0, 15.0))
+        yaws.append(float(np.arctan2(direction[1], direction[0])))
+
+    TrackedObjects, Odometry, Trajectory = (_message_type(topic) for topic in TOPICS)  # noqa: N806
+    msg_module = importlib.import_module("autoware_perception_msgs.msg")
+    planning_module = importlib.import_module("autoware_planning_msgs.msg")
+
+    records = []
+    for t in np.arange(0.0, args.duration, 1.0 / args.object_rate):
+        msg = TrackedObjects()
+        _set_stamp(msg.header, t)
+        for i in range(1, args.num_agent):
+            obj = msg_module.TrackedObject()
+            obj.object_id.uuid = list(uuid_lib.UUID(int=i).bytes)
+            obj.existence_probability = 1.0
+            obj.classification = [msg_module.ObjectClassification(label=msg_module.ObjectClassification.CAR, probability=1.0)]
+            _set_pose(obj.kinematics.pose_with_covariance.pose, origins[i] + velocities[i] * t, yaws[i])
+            obj.kinematics.twist_with_covariance.twist.linear.x = float(np.linalg.norm(velocities[i]))
+            obj.shape.dimensions.x, obj.shape.dimensions.y, obj.shape.dimensions.z = 4.5, 2.0, 1.7
+            msg.objects.append(obj)
+        records.append((float(t), "tracked_objects", msg))
+
+    for t in np.arange(0.0, args.duration, 1.0 / args.odometry_rate):
+        msg = Odometry()
+        _set_stamp(msg.header, t)
+        _set_pose(msg.pose.pose, origins[0] + velocities[0] * t, yaws[0])
+        msg.twist.twist.linear.x = float(np.linalg.norm(velocities[0]))
+        records.append((float(t), "odometry", msg))
+
+    if args.trajectory_rate > 0:
+        for t in np.arange(0.0, args.duration, 1.0 / args.trajectory_rate):
+            msg = Trajectory()
+            _set_stamp(msg.header, t)
+            for dt in np.arange(0.0, 8.0, 0.1):
+                point = planning_module.TrajectoryPoint()
+                point.time_from_start.sec, point.time_from_start.nanosec = int(dt), int(round((dt % 1) * 1e9)) % 10**9
+                _set_pose(point.pose, origins[0] + velocities[0] * (t + dt), yaws[0])
+                point.longitudinal_velocity_mps = float(np.linalg.norm(velocities[0]))
+                msg.points.append(point)
+            records.append((float(t), "trajectory", msg))
+
+    records.sort(key=lambda record: record[0])
+    return records
+
+
+class _PointMap:
+    """Map given by points, which is used by the node instead of `AWMLStaticMap` converted from lanelet."""
+
+    def __init__(self, points: NDArray) -> None:
+        self.points = points
+
+    def get_all_polyline(self, *, as_array: bool = True, full: bool = True) -> NDArray:
+        return self.points
+
+
+def load_map(spec: str) -> NDArray:
+    """Load map points in the shape of (M, 7) from `synthetic:<size>` or .npz file containing `polylines`."""
+    if spec.startswith("synthetic:"):
+        return generate_map(SceneConfig(map_size=float(spec.split(":", 1)[1])))[0]
+    with np.load(spec) as data:
+        return data["polylines"].astype(np.float32)
+
+
+def build_node(params_file: str | None, params: list[str], map_points: NDArray | None) -> Any:
+    """Build the node with parameters.
+
+    Args:
+    ----
+        params_file (str | None): Parameter file.
+        params (list[str]): Parameter overrides, `name:=value`.
+        map_points (NDArray | None): Map points, None if the node converts `lanelet_file`.
+
+    Returns:
+    -------
+        Any: `MTRNode` instance.
+
+    """
+    installed = ros_standin.install()
+    if installed:
+        print(f"Stand-ins are used for: {', '.join(installed)}")
+    import rclpy
+
+    args = ["--ros-args"]
+    if params_file is not None:
+        args += ["--params-file", params_file]
+    for param in params:
+        args += ["-p", param]
+    rclpy.init(args=args)
+
+    from src import mtr_node
+
+    if map_points is not None:
+        # NOTE: the node converts lanelet on startup, which is replaced by the given map points
+        mtr_node.convert_lanelet = lambda *args, **kwargs: _PointMap(map_points)
+    return mtr_node.MTRNode()
+
+
+def replay(node: Any, records: list[tuple[float, str, Any]]) -> dict:
+    """Replay messages through callbacks of the node in the order of simulated time.
+
+    Args:
+    ----
+        node (Any): `MTRNode` instance.
+        records (list[tuple[float, str, Any]]): Simulated times in [s], topics and messages.
+
+    Returns:
+    -------
+        dict: Costs and queueing delays of callbacks in [ms], the max sustainable tick rate in [Hz] and so on.
+
+    """
+    from rclpy.time import Time
+
+    events = [Event(t, 0, TOPICS[topic][2], getattr(node, TOPICS[topic][2]), (msg,)) for t, topic, msg in records]
+    start_time, end_time = records[0][0], records[-1][0]
+    timers = {"_callback": node._timer}
+    if getattr(node, "_inference_timer", None) is not None:
+        timers["_inference_callback"] = node._inference_timer
+    for name, timer in timers.items():
+        period = timer.timer_period_ns * 1e-9
+        events += [Event(t, 1, name, getattr(node, name), ()) for t in np.arange(start_time + period, end_time, period)]
+    events.sort(key=lambda event: (event.time, event.order))
+    next_times = [np.inf] * len(events)
+    last_index: dict[str, int] = {}
+    for i, event in enumerate(events):
+        if event.name in last_index:
+            next_times[last_index[event.name]] = event.time
+        last_index[event.name] = i
+
+    clock = node.get_clock()
+    clock._set_ros_time_is_active(True)
+    costs: dict[str, list[float]] = {}
+    delays: dict[str, list[float]] = {}
+    # the inference timer runs in its own callback group, and the others are mutually exclusive
+    lane_free = {"default": start_time, "inference": start_time}
+    tick_period = node._timer.timer_period_ns * 1e-9
+    num_missed = 0
+    dropped: dict[str, int] = {}
+
+    wall_start = time.perf_counter()
+    for event, next_time in zip(events, next_times):
+        lane = "inference" if event.name == "_inference_callback" else "default"
+        begin = max(event.time, lane_free[lane])
+        if begin > next_time:
+            # replaced by the next message or the next tick before it starts
+            dropped[event.name] = dropped.get(event.name, 0) + 1
+            num_missed += event.name == "_callback"
+            continue
+
+        clock.set_ros_time_override(Time(nanoseconds=int(event.time * 1e9)))
+        start = time.perf_counter()
+        event.callback(*event.args)
+        cost = time.perf_counter() - start
+
+        lane_free[lane] = begin + cost
+        delay = begin - event.time
+        if event.name == "_callback" and delay + cost > tick_period:
+            num_missed += 1
+        costs.setdefault(event.name, []).append(cost * 1e3)
+        delays.setdefault(event.name, []).append(delay * 1e3)
+    wall_elapsed = time.perf_counter() - wall_start
+
+    # the tick rate where the default callback group is fully busy with the arrival rates of messages
+    duration = end_time - start_time
+    message_busy = sum(
+        np.mean(values) * 1e-3 * (len(values) + dropped.get(name, 0)) / duration
+        for name, values in costs.items()
+        if name not in timers
+    )
+    max_tick_rate = max(1.0 - message_busy, 0.0) / (np.mean(costs["_callback"]) * 1e-3)
+    return {
+        "duration": duration,
+        "wall_time": wall_elapsed,
+        "realtime_factor": duration / wall_elapsed,
+        "num_ticks": len(costs["_callback"]) + dropped.get("_callback", 0),
+        "num_missed_ticks": num_missed,
+        "max_tick_rate": float(max_tick_rate),
+        "callbacks": {
+            name: {
+                "count": len(values),
+                "dropped": dropped.get(name, 0),
+                "cost": summarize_latency(values),
+                "delay": summarize_latency(delays[name]),
+            }
+            for name, values in costs.items()
+        },
+        "published": {
+            publisher.topic: publisher.num_published for publisher in getattr(node, "publishers", [])
+        },
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "synthetic":
+        ros_standin.install()
+        records = generate_stream(args)
+        write_stream(args.stream, records)
+        print(f"Wrote {len(records)} messages of {args.duration:.1f}s to {args.stream}")
+        return
+
+    map_points = load_map(args.map) if args.map is not None else None
+    node = build_node(args.params_file, args.param, map_points)
+    records = read_stream(args.stream)
+    if len(records) == 0:
+        sys.exit(f"No messages are found in {args.stream}")
+    try:
+        report = replay(node, records)
+    finally:
+        node.destroy_node()
+        import rclpy
+
+        rclpy.try_shutdown()
+
+    print(
+        f"Replayed {report['duration']:.1f}s in {report['wall_time']:.1f}s ({report['realtime_factor']:.2f}x real "
+        f"time), ticks: {report['num_ticks']} (missed: {report['num_missed_ticks']}), "
+        f"max sustainable tick rate: {report['max_tick_rate']:.2f}Hz",
+    )
+    for name, item in report["callbacks"].items():
+        cost, delay = item["cost"], item["delay"]
+        print(
+            f"    {name}: count={item['count']}, dropped={item['dropped']}, cost mean={cost['mean']:.2f}ms p99={cost['p99']:.2f}ms "
+            f"max={cost['max']:.2f}ms, queueing delay mean={delay['mean']:.2f}ms p99={delay['p99']:.2f}ms "
+            f"max={delay['max']:.2f}ms",
+        )
+    for topic, count in report["published"].items():
+        print(f"    published {topic}: {count}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Report throughput of multi-agent prediction, where all targets are predicted in a single batch.
+
+Each number of targets is compared with the sequential prediction, which runs the model for each target in order,
+for the target-centric polyline selection and the model inference respectively.
+
+Batching does not improve throughput on CPU. With `EagerBackend` on a single CPU core, the batched prediction
+measured 0.98x of the sequential one for 4 targets, 0.74x for 16 targets, and 0.87x-0.90x in other runs, because the
+latency of inference grows with the number of targets at least linearly and there are no idle cores to fill. The
+vectorized polyline selection is faster in a batch, but it is negligible against inference. A gain is only expected on
+devices which a single target does not saturate, e.g. GPUs, which has not been measured.
+
+Example:
+-------
+    $ python -m benchmarks.multi_agent config/mtr.yaml --checkpoint mtr_best.pth --num-targets 1 8 32
+
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import torch
+
+from autoware_mtr.dataclass.agent import AgentTrajectory
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, create_dummy_inputs
+from awml_pred.models import build_model
+from utils.polyline import TargetCentricPolyline
+
+from .common import measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Throughput report of multi-agent batched prediction.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--backend", type=str, default="EagerBackend", help="Name of the inference backend.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--num-targets", type=int, nargs="+", default=[1, 4, 16, 32], help="Numbers of targets.")
+    parser.add_argument("--num-agent", type=int, default=32, help="Number of agents in the scene.")
+    parser.add_argument("--num-map-polylines", type=int, default=4096, help="Number of polylines in the map.")
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations.")
+    return parser.parse_args()
+
+
+def create_targets(num_target: int, seed: int = 0) -> AgentTrajectory:
+    """Return random target states in the shape of (B, D)."""
+    rng = np.random.default_rng(seed)
+    waypoints = np.zeros((num_target, AgentTrajectory.num_dim))
+    waypoints[:, AgentTrajectory.XY_IDX] = rng.uniform(-100.0, 100.0, (num_target, 2))
+    waypoints[:, AgentTrajectory.YAW_IDX] = rng.uniform(-np.pi, np.pi, num_target)
+    waypoints[:, AgentTrajectory.IS_VALID_IDX] = 1
+    return AgentTrajectory(waypoints, np.zeros(num_target, dtype=np.int64))
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint, mmap=True)
+    backend = build_backend({"name": args.backend, "device": args.device}, model)
+
+    # polylines in map coords, (x, y, z, dx, dy, dz, type), which are selected and transformed for each target
+    rng = np.random.default_rng(0)
+    num_points = 20
+    batch_polylines = np.zeros((args.num_map_polylines, num_points, 7), dtype=np.float32)
+    batch_polylines[..., :2] = rng.uniform(-200.0, 200.0, (args.num_map_polylines, 1, 2))
+    batch_polylines[..., :2] += np.cumsum(rng.normal(0.0, 0.5, (args.num_map_polylines, num_points, 2)), axis=1)
+    batch_polylines_mask = np.ones(batch_polylines.shape[:2], dtype=np.bool_)
+    polyline_center = batch_polylines[:, num_points // 2, :2].copy()
+
+    transform = TargetCentricPolyline(num_points=num_points)
+    transform.warmup()
+
+    def select_polylines(targets: AgentTrajectory) -> None:
+        # NOTE: `_do_transform` updates inputs in place, which are copied by indexing in `__call__`
+        transform(None, targets, len(targets.waypoints), batch_polylines, batch_polylines_mask, polyline_center)
+
+    for num_target in args.num_targets:
+        targets = create_targets(num_target)
+        singles = [AgentTrajectory(targets.waypoints[b : b + 1], targets.label_ids[b : b + 1]) for b in range(num_target)]
+        batch_preprocess = measure_latency(lambda t=targets: select_polylines(t), num_iters=args.num_iters)["mean"]
+        seq_preprocess = measure_latency(
+            lambda s=singles: [select_polylines(single) for single in s],
+            num_iters=args.num_iters,
+        )["mean"]
+
+        inputs = create_dummy_inputs(
+            num_target=num_target,
+            num_agent=args.num_agent,
+            num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+            num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+            device=args.device,
+            seed=0,
+        )
+        single_inputs = [{key: value[b : b + 1] for key, value in inputs.items()} for b in range(num_target)]
+        with torch.no_grad():
+            batch_infer = measure_latency(lambda i=inputs: backend(**i), num_iters=args.num_iters)["mean"]
+            seq_infer = measure_latency(
+                lambda s=single_inputs: [backend(**single) for single in s],
+                num_iters=args.num_iters,
+            )["mean"]
+
+        batch_total, seq_total = batch_preprocess + batch_infer, seq_preprocess + seq_infer
+        print(
+            f"[targets={num_target}] batched: {batch_total:.2f}ms ({num_target / batch_total * 1e3:.1f} agents/s, "
+            f"polyline={batch_preprocess:.2f}ms, inference={batch_infer:.2f}ms), "
+            f"sequential: {seq_total:.2f}ms ({num_target / seq_total * 1e3:.1f} agents/s), "
+            f"speedup: {seq_total / batch_total:.2f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark `batch_nms` against the loop-based reference implementation.
+
+Example:
+-------
+    $ python -m benchmarks.nms --batch-size 1 16 256
+
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import torch
+
+from awml_pred.ops import batch_nms
+from awml_pred.typing import Tensor
+
+from .common import measure_latency
+
+
+def loop_batch_nms(
+    pred_trajs: Tensor,
+    pred_scores: Tensor,
+    dist_thresh: float,
+    num_ret_modes: int = 6,
+) -> tuple[Tensor, Tensor, Tensor]:
+    """Reference implementation, which gathers trajectories in every iteration.
+
+    Args:
+    ----
+        pred_trajs (Tensor): (batch_size, num_modes, num_timestamps, 7)
+        pred_scores (Tensor): (batch_size, num_modes)
+        dist_thresh (float): Distance threshold.
+        num_ret_modes (int, optional): The number of result modes. Defaults to 6.
+
+    Returns:
+    -------
+        tuple[Tensor, Tensor, Tensor]: Trajectories, scores and indices of selected modes.
+
+    """
+    batch_size, num_modes, num_timestamps, num_feat_dim = pred_trajs.shape
+
+    pred_scores = torch.nan_to_num(pred_scores)
+
+    sorted_idxs = pred_scores.argsort(dim=-1, descending=True)
+    bs_idxs_full = torch.arange(batch_size).type_as(sorted_idxs)[:, None].repeat(1, num_modes)
+    sorted_pred_scores = pred_scores[bs_idxs_full, sorted_idxs]
+    sorted_pred_trajs = pred_trajs[bs_idxs_full, sorted_idxs]
+    sorted_pred_goals = sorted_pred_trajs[:, :, -1, :]
+
+    dist = (sorted_pred_goals[:, :, None, 0:2] - sorted_pred_goals[:, None, :, 0:2]).norm(dim=-1)
+    point_cover_mask = dist < dist_thresh
+
+    point_val = sorted_pred_scores.clone()
+    point_val_selected = torch.zeros_like(point_val)
+
+    ret_idxs = sorted_idxs.new_zeros(batch_size, num_ret_modes).long()
+    ret_trajs = sorted_pred_trajs.new_zeros(batch_size, num_ret_modes, num_timestamps, num_feat_dim)
+    ret_scores = sorted_pred_trajs.new_zeros(batch_size, num_ret_modes)
+    bs_idxs = torch.arange(batch_size).type_as(ret_idxs)
+
+    for k in range(num_ret_modes):
+        cur_idx = point_val.argmax(dim=-1)
+        ret_idxs[:, k] = cur_idx
+
+        new_cover_mask = point_cover_mask[bs_idxs, cur_idx]
+        point_val = point_val * (~new_cover_mask).float()
+        point_val_selected[bs_idxs, cur_idx] = -1
+        point_val += point_val_selected
+
+        ret_trajs[:, k] = sorted_pred_trajs[bs_idxs, cur_idx]
+        ret_scores[:, k] = sorted_pred_scores[bs_idxs, cur_idx]
+
+    bs_idxs = torch.arange(batch_size).type_as(sorted_idxs)[:, None].repeat(1, num_ret_modes)
+    ret_idxs = sorted_idxs[bs_idxs, ret_idxs]
+    return ret_trajs, ret_scores, ret_idxs
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark batch NMS.")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16, 64, 256],
+        help="Numbers of target agents.",
+    )
+    parser.add_argument("--num-modes", type=int, default=64, help="Number of predicted modes.")
+    parser.add_argument("--num-ret-modes", type=int, default=6, help="Number of returned modes.")
+    parser.add_argument("--num-future", type=int, default=80, help="Number of future timestamps.")
+    parser.add_argument("--dist-thresh", type=float, default=2.5, help="Distance threshold.")
+    parser.add_argument("--num-iters", type=int, default=100, help="Number of measured iterations.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for batch_size in args.batch_size:
+        pred_trajs = torch.randn(batch_size, args.num_modes, args.num_future, 7, device=args.device).cumsum(dim=2)
+        pred_scores = torch.softmax(torch.randn(batch_size, args.num_modes, device=args.device), dim=-1)
+
+        def run_loop() -> tuple[Tensor, Tensor, Tensor]:
+            return loop_batch_nms(pred_trajs, pred_scores, args.dist_thresh, args.num_ret_modes)
+
+        def run_goal() -> tuple[Tensor, Tensor, Tensor]:
+            return batch_nms(pred_trajs, pred_scores, args.dist_thresh, args.num_ret_modes)
+
+        def run_traj() -> tuple[Tensor, Tensor, Tensor]:
+            return batch_nms(pred_trajs, pred_scores, args.dist_thresh, args.num_ret_modes, use_traj_dist=True)
+
+        is_same = all(torch.equal(lhs, rhs) for lhs, rhs in zip(run_loop(), run_goal()))
+        loop_latency = measure_latency(run_loop, num_iters=args.num_iters)
+        goal_latency = measure_latency(run_goal, num_iters=args.num_iters)
+        traj_latency = measure_latency(run_traj, num_iters=args.num_iters)
+        print(
+            f"[B={batch_size}] loop: {loop_latency['mean']:.3f}ms, "
+            f"goal: {goal_latency['mean']:.3f}ms ({loop_latency['mean'] / goal_latency['mean']:.1f}x), "
+            f"trajectory: {traj_latency['mean']:.3f}ms, same result={is_same}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark the reuse of polyline selections while targets drive across a synthetic map.
+
+Targets drive along parallel lanes of the road at the center of a synthetic grid map, and polylines are selected and
+transformed by `TargetCentricPolyline` on every tick, or reused within each radius. The latency of each tick, the
+ratio of reused selections, and the recall of reused selections against the selection on every tick are reported.
+
+Example:
+-------
+    $ python -m benchmarks.polyline_reuse --map-size 2000 --num-targets 1 8 --radii 1 3 5 10
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from utils.polyline import TargetCentricPolyline, compute_polyline_centers
+from utils.scenario import _TargetState
+
+from .synthetic import LANE_WIDTH, SceneConfig, generate_map
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the reuse of polyline selections.")
+    parser.add_argument("--map-size", type=float, default=2000.0, help="Side length of the synthetic map in [m].")
+    parser.add_argument("--num-targets", type=int, nargs="+", default=[1, 8], help="Numbers of targets.")
+    parser.add_argument("--radii", type=float, nargs="+", default=[1.0, 3.0, 5.0, 10.0], help="Reuse radii in [m].")
+    parser.add_argument("--speed", type=float, default=20.0, help="Speed of targets in [m/s].")
+    parser.add_argument("--num-ticks", type=int, default=300, help="Number of ticks at 10 Hz.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    points, _ = generate_map(SceneConfig(map_size=args.map_size, point_interval=0.5))
+    reference = TargetCentricPolyline()
+    reference.warmup()
+    batch_polylines, batch_polylines_mask = reference._generate_batch(points)
+    polyline_center = compute_polyline_centers(batch_polylines, batch_polylines_mask)[..., :2]
+    print(f"[map] {len(points)} points, {len(batch_polylines)} polylines")
+
+    for num_target in args.num_targets:
+        transforms = {"every tick": reference}
+        transforms.update({f"radius={radius}m": TargetCentricPolyline(reuse_radius=radius) for radius in args.radii})
+        latencies = {name: [] for name in transforms}
+        recalls = {name: [] for name in transforms}
+        half = args.map_size / 2
+        for tick in range(args.num_ticks):
+            # NOTE: targets drive on lanes of both directions, and are spread along the road
+            x = -half + (args.speed * tick * 0.1 + 50.0 * np.arange(num_target)) % args.map_size
+            y = np.where(np.arange(num_target) % 2 == 0, -0.5, 0.5) * LANE_WIDTH
+            yaw = np.where(np.arange(num_target) % 2 == 0, 0.0, np.pi)
+            targets = _TargetState(xyz=np.stack((x, y, np.zeros(num_target)), axis=-1), yaw=yaw)
+            expected = reference._select_indices(polyline_center, reference._center_positions(targets, num_target))
+
+            for name, transform in transforms.items():
+                start = time.perf_counter()
+                transform(None, targets, num_target, batch_polylines, batch_polylines_mask, polyline_center)
+                latencies[name].append((time.perf_counter() - start) * 1e3)
+                if transform.reuse_radius > 0.0:
+                    # NOTE: selections are compared by polylines, because the cache keeps polylines but not indices
+                    selected = np.stack([transform._selections[b].centers[:, :2] for b in range(num_target)])
+                    is_found = np.isclose(
+                        selected[:, :, None], polyline_center[expected][:, None], atol=1e-3
+                    ).all(axis=-1).any(axis=1)
+                    recalls[name].append(is_found.mean())
+
+        for name, transform in transforms.items():
+            message = (
+                f"[targets={num_target}, {name}] mean={np.mean(latencies[name]):.2f}ms, "
+                f"p99={np.percentile(latencies[name], 99):.2f}ms"
+            )
+            if transform.reuse_radius > 0.0:
+                total = transform.num_selected + transform.num_reused
+                message += (
+                    f", reused: {transform.num_reused / total:.1%}, "
+                    f"recall: mean={np.mean(recalls[name]):.4f}, min={np.min(recalls[name]):.4f}"
+                )
+            print(message)
+
+
+if __name__ == "__main__":
+    main()
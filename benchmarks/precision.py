@@ -0,0 +1,95 @@
+"""Report accuracy regression, latency and model memory of reduced precision inference against fp32.
+
+Accuracy is measured by minADE/minFDE of reduced precision predictions against the most likely trajectory of the
+fp32 model, so it represents the drift caused by the precision rather than the accuracy of the model itself.
+
+Example:
+-------
+    $ python -m benchmarks.precision config/mtr.yaml --checkpoint mtr_best.pth --inputs recorded/ --precision bf16
+
+"""
+
+from __future__ import annotations
+
+import argparse
+from copy import deepcopy
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, create_dummy_inputs, load_recorded_inputs
+from awml_pred.models import build_model
+
+from .common import compute_min_ade_fde, measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Accuracy and latency report of reduced precision inference.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--inputs", type=str, default=None, help="Recorded inputs, a .npz file or a directory.")
+    parser.add_argument("--num-synthetic", type=int, default=4, help="Number of synthetic inputs without --inputs.")
+    parser.add_argument("--precision", type=str, nargs="+", default=["bf16"], help="Precisions compared with fp32.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations per input.")
+    parser.add_argument("--max-fde", type=float, default=None, help="Exit with an error if minFDE drift exceeds it.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint)
+
+    if args.inputs is not None:
+        inputs = load_recorded_inputs(args.inputs)
+    else:
+        inputs = [
+            create_dummy_inputs(
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                seed=i,
+            )
+            for i in range(args.num_synthetic)
+        ]
+
+    reference = build_backend({"name": "EagerBackend", "device": args.device}, model)
+    references = []
+    for item in inputs:
+        pred_scores, pred_trajs = reference(**item)
+        best_idx = pred_scores.argmax(dim=-1)
+        references.append((pred_scores, pred_trajs[torch.arange(len(best_idx)), best_idx]))
+
+    float_latency = None
+    exceeded = False
+    for precision in ["fp32", *args.precision]:
+        backend_cfg = {"name": "EagerBackend", "device": args.device, "precision": precision}
+        backend = build_backend(backend_cfg, deepcopy(model))
+        num_bytes = sum(p.numel() * p.element_size() for p in backend.model.parameters())
+
+        latencies, min_ade, min_fde, score_diff = [], 0.0, 0.0, 0.0
+        for item, (ref_scores, ref_trajs) in zip(inputs, references):
+            pred_scores, pred_trajs = backend(**item)
+            metrics = compute_min_ade_fde(pred_trajs.to(ref_trajs.device), ref_trajs)
+            min_ade += metrics["minADE"] / len(inputs)
+            min_fde += metrics["minFDE"] / len(inputs)
+            score_diff = max(score_diff, (pred_scores.to(ref_scores.device) - ref_scores).abs().max().item())
+            latencies.append(measure_latency(lambda b=backend, i=item: b(**i), num_iters=args.num_iters)["mean"])
+        latency = sum(latencies) / len(latencies)
+        float_latency = float_latency or latency
+        print(
+            f"[{precision}] latency: {latency:.2f}ms ({float_latency / latency:.2f}x), "
+            f"weights: {num_bytes / 1024**2:.1f}MiB, minADE drift: {min_ade:.4f}m, minFDE drift: {min_fde:.4f}m, "
+            f"max score diff: {score_diff:.2e}",
+        )
+        exceeded |= args.max_fde is not None and min_fde > args.max_fde
+
+    if exceeded:
+        msg = f"minFDE drift exceeds {args.max_fde}m"
+        raise SystemExit(msg)
+
+
+if __name__ == "__main__":
+    main()
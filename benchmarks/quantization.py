@@ -0,0 +1,98 @@
+"""Report accuracy drift and speedup of INT8 quantization.
+
+Accuracy is measured by minADE/minFDE of quantized predictions against the most likely trajectory of the float
+model, so it represents the drift caused by quantization rather than the accuracy of the model itself.
+
+Example:
+-------
+    $ python -m benchmarks.quantization config/mtr.yaml --checkpoint mtr_best.pth --inputs recorded/ \
+        --calibration calib.pth
+
+"""
+
+from __future__ import annotations
+
+import argparse
+from copy import deepcopy
+
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import calibrate_model, create_dummy_inputs, load_recorded_inputs, quantize_model
+from awml_pred.models import build_model
+
+from .common import compute_min_ade_fde, measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Accuracy and latency report of INT8 quantization.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--inputs", type=str, default=None, help="Recorded inputs, a .npz file or a directory.")
+    parser.add_argument("--num-synthetic", type=int, default=4, help="Number of synthetic inputs without --inputs.")
+    parser.add_argument(
+        "--calibration",
+        type=str,
+        default=None,
+        help="Calibration file, calibrated on the evaluated inputs if omitted.",
+    )
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations per input.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint)
+    model.cpu().eval()
+
+    if args.inputs is not None:
+        inputs = load_recorded_inputs(args.inputs)
+    else:
+        inputs = [
+            create_dummy_inputs(
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                seed=i,
+            )
+            for i in range(args.num_synthetic)
+        ]
+
+    calibration = args.calibration
+    if calibration is None:
+        calibration = calibrate_model(deepcopy(model), inputs)
+
+    models = {
+        "float": model,
+        "dynamic": quantize_model(deepcopy(model), mode="dynamic"),
+        "static": quantize_model(deepcopy(model), mode="static", calibration=calibration),
+    }
+
+    with torch.no_grad():
+        references = []
+        for item in inputs:
+            pred_scores, pred_trajs = model(**item)
+            best_idx = pred_scores.argmax(dim=-1)
+            references.append(pred_trajs[torch.arange(len(best_idx)), best_idx])
+
+        float_latency = None
+        for name, target in models.items():
+            latencies, min_ade, min_fde = [], 0.0, 0.0
+            for item, reference in zip(inputs, references):
+                _, pred_trajs = target(**item)
+                metrics = compute_min_ade_fde(pred_trajs, reference)
+                min_ade += metrics["minADE"] / len(inputs)
+                min_fde += metrics["minFDE"] / len(inputs)
+                latencies.append(measure_latency(lambda t=target, i=item: t(**i), num_iters=args.num_iters)["mean"])
+            latency = sum(latencies) / len(latencies)
+            float_latency = float_latency or latency
+            print(
+                f"[{name}] latency: {latency:.2f}ms ({float_latency / latency:.2f}x), "
+                f"minADE drift: {min_ade:.4f}m, minFDE drift: {min_fde:.4f}m",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Replay model inputs recorded by the node, and report latency distributions and output drift.
+
+The node records inputs and outputs of each inference with `record_directory`, which are replayed through backends,
+precisions and numbers of threads. Drift is measured by minADE/minFDE against the most likely trajectory recorded by
+the node, so a slow real-world tick can be reproduced and compared offline.
+
+Example:
+-------
+    $ python -m benchmarks.replay config/mtr.yaml recorded/ --checkpoint mtr_best.pth \
+        --backend EagerBackend TorchScriptBackend --precision fp32 bf16 --num-threads 1 4
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os.path as osp
+from copy import deepcopy
+from glob import glob
+
+import numpy as np
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, load_recorded_inputs
+from awml_pred.models import build_model
+
+from .common import compute_min_ade_fde, measure_latency, summarize_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency and drift report of recorded model inputs.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("inputs", type=str, help="Recorded inputs, a .npz file or a directory.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--backend", type=str, nargs="+", default=["EagerBackend"], help="Names of backends.")
+    parser.add_argument("--onnx", type=str, default=None, help="ONNX model used by OnnxRuntimeBackend.")
+    parser.add_argument("--precision", type=str, nargs="+", default=["fp32"], help="Inference precisions.")
+    parser.add_argument("--num-threads", type=int, nargs="+", default=[None], help="Numbers of torch threads.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--num-iters", type=int, default=3, help="Number of measured iterations per input.")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of the slowest inputs to be shown.")
+    return parser.parse_args()
+
+
+def load_recorded_outputs(path: str) -> list[dict[str, np.ndarray]]:
+    """Load outputs and latencies recorded with inputs, in the same order as `load_recorded_inputs`.
+
+    Args:
+    ----
+        path (str): Path to a `.npz` file or a directory containing `.npz` files.
+
+    Returns:
+    -------
+        list[dict[str, np.ndarray]]: File names, outputs and latencies if they are recorded.
+
+    """
+    filepaths = sorted(glob(osp.join(path, "*.npz"))) if osp.isdir(path) else [path]
+    ret = []
+    for filepath in filepaths:
+        with np.load(filepath) as data:
+            item = {name: data[name] for name in ("pred_scores", "pred_trajs", "latency") if name in data}
+        item["filename"] = osp.basename(filepath)
+        ret.append(item)
+    return ret
+
+
+def main() -> None:
+    args = parse_args()
+    model = build_model(Config.from_file(args.config).model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint)
+
+    inputs = load_recorded_inputs(args.inputs, device=args.device)
+    outputs = load_recorded_outputs(args.inputs)
+    recorded = [item["latency"] * 1e3 for item in outputs if "latency" in item]
+    if len(recorded) > 0:
+        summary = summarize_latency(recorded)
+        print(
+            f"[recorded] {len(inputs)} inputs, mean={summary['mean']:.2f}ms, p50={summary['p50']:.2f}ms, "
+            f"p99={summary['p99']:.2f}ms, max={summary['max']:.2f}ms",
+        )
+
+    for name, precision, num_threads in itertools.product(args.backend, args.precision, args.num_threads):
+        if name == "OnnxRuntimeBackend" and precision != "fp32":
+            print(f"[{name}, {precision}] skipped, the exported model runs in fp32")
+            continue
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        backend_cfg = {"name": name, "device": args.device}
+        if precision != "fp32":
+            backend_cfg["precision"] = precision
+        if args.onnx is not None and name == "OnnxRuntimeBackend":
+            backend_cfg["onnx_path"] = args.onnx
+            backend_cfg["custom_imports"] = ["projects.MTR.deploys.ort_kernels"]
+        backend = build_backend(backend_cfg, deepcopy(model))
+
+        latencies, min_ade, min_fde, score_diff = [], [], [], 0.0
+        for item, output in zip(inputs, outputs):
+            latency = measure_latency(lambda i=item: backend(**i), num_iters=args.num_iters, num_warmup=1)
+            latencies.append(latency["mean"])
+            if "pred_trajs" not in output:
+                continue
+            pred_scores, pred_trajs = backend(**item)
+            ref_scores = torch.from_numpy(output["pred_scores"])
+            ref_trajs = torch.from_numpy(output["pred_trajs"])
+            best_idx = ref_scores.argmax(dim=-1)
+            metrics = compute_min_ade_fde(pred_trajs.float().cpu(), ref_trajs[torch.arange(len(best_idx)), best_idx])
+            min_ade.append(metrics["minADE"])
+            min_fde.append(metrics["minFDE"])
+            score_diff = max(score_diff, (pred_scores.float().cpu() - ref_scores).abs().max().item())
+
+        summary = summarize_latency(latencies)
+        message = (
+            f"[{name}, {precision}, threads={torch.get_num_threads()}] mean={summary['mean']:.2f}ms, "
+            f"p50={summary['p50']:.2f}ms, p90={summary['p90']:.2f}ms, p99={summary['p99']:.2f}ms, "
+            f"max={summary['max']:.2f}ms"
+        )
+        if len(min_ade) > 0:
+            message += (
+                f", minADE drift: {np.mean(min_ade):.4f}m (max {np.max(min_ade):.4f}m), "
+                f"minFDE drift: {np.mean(min_fde):.4f}m (max {np.max(min_fde):.4f}m), max score diff: {score_diff:.2e}"
+            )
+        print(message)
+
+        for i in np.argsort(latencies)[::-1][: args.top_k]:
+            num_target, num_agent = inputs[i]["obj_trajs"].shape[:2]
+            recorded_latency = f", recorded: {outputs[i]['latency'] * 1e3:.2f}ms" if "latency" in outputs[i] else ""
+            print(
+                f"    {outputs[i]['filename']}: {latencies[i]:.2f}ms{recorded_latency} "
+                f"(targets={num_target}, agents={num_agent})",
+            )
+
+
+if __name__ == "__main__":
+    main()
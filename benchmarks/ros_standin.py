@@ -0,0 +1,643 @@
+"""Lightweight stand-ins of ROS 2 packages used by the node, which let the node run without a ROS graph.
+
+Stand-ins are installed by `install()` only for packages which are not importable, so the real ROS 2 packages are
+used if they are available. Messages are plain Python objects, whose nested fields are created on the first access as
+ROS messages are default-constructed. `rclpy.node.Node` records subscriptions, timers and publishers instead of
+communicating, and its clock is overridden by `set_ros_time_override` as `rclpy.clock.ROSClock`.
+
+Note that `lanelet2` is replaced with a placeholder raising `ImportError` on use, so the map must be given without
+`convert_lanelet` if it is not installed.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import math
+import sys
+from enum import IntEnum
+from types import ModuleType
+from typing import Any, Callable, ClassVar
+
+import yaml
+
+__all__ = ("Message", "install", "message_from_dict", "message_to_dict")
+
+
+class Message:
+    """Stand-in of ROS messages.
+
+    Fields are set by keyword arguments. Missing fields are created on the first access with the type in
+    `_field_types`, or by the field name in `FIELD_TYPES`, and list fields in `_list_fields` are empty lists.
+    """
+
+    _defaults: ClassVar[dict[str, Any]] = {}
+    _field_types: ClassVar[dict[str, type[Message]]] = {}
+    _list_fields: ClassVar[dict[str, type[Message] | None]] = {}
+
+    def __init__(self, **kwargs: Any) -> None:
+        for name in self._list_fields:
+            setattr(self, name, [])
+        for name, value in self._defaults.items():
+            setattr(self, name, value.copy() if isinstance(value, list) else value)
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = self._field_types.get(name, FIELD_TYPES.get(name, Message))()
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _message(
+    name: str,
+    defaults: dict[str, Any] | None = None,
+    field_types: dict[str, type[Message]] | None = None,
+    list_fields: dict[str, type[Message] | None] | None = None,
+    **constants: int,
+) -> type[Message]:
+    namespace = {
+        "_defaults": defaults or {},
+        "_field_types": field_types or {},
+        "_list_fields": list_fields or {},
+        **constants,
+    }
+    return type(name, (Message,), namespace)
+
+
+# builtin_interfaces, std_msgs
+Time = _message("Time", {"sec": 0, "nanosec": 0})
+DurationMsg = _message("Duration", {"sec": 0, "nanosec": 0})
+Header = _message("Header", {"frame_id": ""}, {"stamp": Time})
+String = _message("String", {"data": ""})
+ColorRGBA = _message("ColorRGBA", {"r": 0.0, "g": 0.0, "b": 0.0, "a": 0.0})
+
+# geometry_msgs
+Point = _message("Point", {"x": 0.0, "y": 0.0, "z": 0.0})
+Vector3 = _message("Vector3", {"x": 0.0, "y": 0.0, "z": 0.0})
+Quaternion = _message("Quaternion", {"x": 0.0, "y": 0.0, "z": 0.0, "w": 1.0})
+Pose = _message("Pose", field_types={"position": Point, "orientation": Quaternion})
+PoseWithCovariance = _message("PoseWithCovariance", {"covariance": [0.0] * 36}, {"pose": Pose})
+Twist = _message("Twist", field_types={"linear": Vector3, "angular": Vector3})
+TwistWithCovariance = _message("TwistWithCovariance", {"covariance": [0.0] * 36}, {"twist": Twist})
+Accel = _message("Accel", field_types={"linear": Vector3, "angular": Vector3})
+AccelWithCovariance = _message("AccelWithCovariance", {"covariance": [0.0] * 36}, {"accel": Accel})
+Transform = _message("Transform", field_types={"translation": Vector3, "rotation": Quaternion})
+TransformStamped = _message("TransformStamped", {"child_frame_id": ""}, {"transform": Transform})
+
+# nav_msgs, unique_identifier_msgs
+Odometry = _message("Odometry", {"child_frame_id": ""}, {"pose": PoseWithCovariance, "twist": TwistWithCovariance})
+UUID = _message("UUID", list_fields={"uuid": None})
+
+# autoware_perception_msgs
+ObjectClassification = _message(
+    "ObjectClassification",
+    {"label": 0, "probability": 0.0},
+    UNKNOWN=0,
+    CAR=1,
+    TRUCK=2,
+    BUS=3,
+    TRAILER=4,
+    MOTORCYCLE=5,
+    BICYCLE=6,
+    PEDESTRIAN=7,
+)
+Shape = _message("Shape", {"type": 0}, {"dimensions": Vector3}, {"footprint": None}, BOUNDING_BOX=0, CYLINDER=1, POLYGON=2)
+TrackedObjectKinematics = _message(
+    "TrackedObjectKinematics",
+    {"orientation_availability": 0, "is_stationary": False},
+    {
+        "pose_with_covariance": PoseWithCovariance,
+        "twist_with_covariance": TwistWithCovariance,
+        "acceleration_with_covariance": AccelWithCovariance,
+    },
+)
+TrackedObject = _message(
+    "TrackedObject",
+    {"existence_probability": 0.0},
+    {"object_id": UUID, "kinematics": TrackedObjectKinematics, "shape": Shape},
+    {"classification": ObjectClassification},
+)
+TrackedObjects = _message("TrackedObjects", field_types={"header": Header}, list_fields={"objects": TrackedObject})
+PredictedPath = _message(
+    "PredictedPath",
+    {"confidence": 0.0},
+    {"time_step": DurationMsg},
+    {"path": Pose},
+)
+PredictedObjectKinematics = _message(
+    "PredictedObjectKinematics",
+    field_types={
+        "initial_pose_with_covariance": PoseWithCovariance,
+        "initial_twist_with_covariance": TwistWithCovariance,
+        "initial_acceleration_with_covariance": AccelWithCovariance,
+    },
+    list_fields={"predicted_paths": PredictedPath},
+)
+PredictedObject = _message(
+    "PredictedObject",
+    {"existence_probability": 0.0},
+    {"object_id": UUID, "kinematics": PredictedObjectKinematics, "shape": Shape},
+    {"classification": ObjectClassification},
+)
+PredictedObjects = _message("PredictedObjects", field_types={"header": Header}, list_fields={"objects": PredictedObject})
+
+# autoware_planning_msgs, autoware_new_planning_msgs
+TrajectoryPoint = _message(
+    "TrajectoryPoint",
+    {
+        "longitudinal_velocity_mps": 0.0,
+        "lateral_velocity_mps": 0.0,
+        "acceleration_mps2": 0.0,
+        "heading_rate_rps": 0.0,
+        "front_wheel_angle_rad": 0.0,
+        "rear_wheel_angle_rad": 0.0,
+    },
+    {"time_from_start": DurationMsg, "pose": Pose},
+)
+Trajectory = _message("Trajectory", field_types={"header": Header}, list_fields={"points": TrajectoryPoint})
+TrajectoryGeneratorInfo = _message("TrajectoryGeneratorInfo", field_types={"generator_id": UUID, "generator_name": String})
+NewTrajectory = _message(
+    "Trajectory",
+    {"score": 0.0},
+    {"header": Header, "generator_id": UUID},
+    {"points": TrajectoryPoint},
+)
+Trajectories = _message(
+    "Trajectories",
+    list_fields={"trajectories": NewTrajectory, "generator_info": TrajectoryGeneratorInfo},
+)
+
+# visualization_msgs
+Marker = _message(
+    "Marker",
+    {"ns": "", "id": 0, "type": 0, "action": 0, "text": ""},
+    {"header": Header, "pose": Pose, "scale": Vector3, "color": ColorRGBA, "lifetime": DurationMsg},
+    {"points": Point, "colors": ColorRGBA},
+    ARROW=0,
+    CUBE=1,
+    SPHERE=2,
+    CYLINDER=3,
+    LINE_STRIP=4,
+    LINE_LIST=5,
+    ADD=0,
+    DELETE=2,
+    DELETEALL=3,
+)
+MarkerArray = _message("MarkerArray", list_fields={"markers": Marker})
+
+# types of fields which are created on the first access regardless of the message type
+FIELD_TYPES: dict[str, type[Message]] = {
+    "header": Header,
+    "stamp": Time,
+    "position": Point,
+    "orientation": Quaternion,
+    "linear": Vector3,
+    "angular": Vector3,
+    "dimensions": Vector3,
+}
+
+
+# rclpy
+class Duration:
+    """Stand-in of `rclpy.duration.Duration`."""
+
+    def __init__(self, *, seconds: float = 0.0, nanoseconds: int = 0) -> None:
+        self.nanoseconds = int(seconds * 1e9) + int(nanoseconds)
+
+    def to_msg(self) -> Message:
+        return DurationMsg(sec=self.nanoseconds // 10**9, nanosec=self.nanoseconds % 10**9)
+
+
+class TimeStamp:
+    """Stand-in of `rclpy.time.Time`."""
+
+    def __init__(self, *, seconds: float = 0.0, nanoseconds: int = 0) -> None:
+        self.nanoseconds = int(seconds * 1e9) + int(nanoseconds)
+
+    def seconds_nanoseconds(self) -> tuple[int, int]:
+        return self.nanoseconds // 10**9, self.nanoseconds % 10**9
+
+    def to_msg(self) -> Message:
+        sec, nanosec = self.seconds_nanoseconds()
+        return Time(sec=sec, nanosec=nanosec)
+
+
+class Clock:
+    """Stand-in of `rclpy.clock.ROSClock`, whose time is always overridden."""
+
+    def __init__(self) -> None:
+        self._now = TimeStamp()
+
+    def _set_ros_time_is_active(self, enabled: bool) -> None:
+        pass
+
+    def set_ros_time_override(self, time: TimeStamp) -> None:
+        self._now = time
+
+    def now(self) -> TimeStamp:
+        return self._now
+
+
+class ParameterType(IntEnum):
+    NOT_SET = 0
+    BOOL = 1
+    INTEGER = 2
+    DOUBLE = 3
+    STRING = 4
+    BYTE_ARRAY = 5
+    BOOL_ARRAY = 6
+    INTEGER_ARRAY = 7
+    DOUBLE_ARRAY = 8
+    STRING_ARRAY = 9
+
+
+class ParameterValue:
+    """Stand-in of `rcl_interfaces.msg.ParameterValue`, whose typed values are the same raw value."""
+
+    def __init__(self, value: Any) -> None:
+        for name in ("bool", "integer", "double", "string", "bool_array", "integer_array", "double_array"):
+            setattr(self, f"{name}_value", value)
+        self.string_array_value = value
+        self.byte_array_value = value
+
+
+class Parameter:
+    """Stand-in of `rclpy.parameter.Parameter`."""
+
+    Type = ParameterType
+
+    def __init__(self, name: str, type_: ParameterType | None = None, value: Any = None) -> None:
+        self.name = name
+        self.type_ = type_
+        self.value = value
+
+    def get_parameter_value(self) -> ParameterValue:
+        return ParameterValue(self.value)
+
+
+class ParameterNotDeclaredError(Exception):
+    pass
+
+
+class Logger:
+    """Stand-in of the rclpy logger backed by `logging`."""
+
+    def __init__(self, name: str) -> None:
+        self._logger = logging.getLogger(name)
+
+    def debug(self, msg: str) -> None:
+        self._logger.debug(msg)
+
+    def info(self, msg: str) -> None:
+        self._logger.info(msg)
+
+    def warn(self, msg: str) -> None:
+        self._logger.warning(msg)
+
+    warning = warn
+
+    def error(self, msg: str) -> None:
+        self._logger.error(msg)
+
+
+class Subscription:
+    def __init__(self, msg_type: type, topic: str, callback: Callable[[Any], None]) -> None:
+        self.msg_type = msg_type
+        self.topic = topic
+        self.callback = callback
+
+
+class Publisher:
+    """Stand-in of the rclpy publisher, which keeps the number of messages and the last one."""
+
+    def __init__(self, msg_type: type, topic: str) -> None:
+        self.msg_type = msg_type
+        self.topic = topic
+        self.num_published = 0
+        self.last_msg = None
+
+    def publish(self, msg: Any) -> None:
+        self.num_published += 1
+        self.last_msg = msg
+
+
+class Timer:
+    def __init__(self, period: float, callback: Callable[[], None], callback_group: Any = None) -> None:
+        self.timer_period_ns = int(period * 1e9)
+        self.callback = callback
+        self.callback_group = callback_group
+
+    def cancel(self) -> None:
+        pass
+
+
+# parameters given by `rclpy.init(args=[..., "--params-file", path, "-p", "name:=value"])`
+_PARAMETER_OVERRIDES: dict[str, Any] = {}
+
+
+def _init(*, args: list[str] | None = None, **kwargs: Any) -> None:
+    args = list(args or [])
+    for flag, value in zip(args[:-1], args[1:]):
+        if flag == "--params-file":
+            with open(value) as f:
+                for params in yaml.safe_load(f).values():
+                    _PARAMETER_OVERRIDES.update(params.get("ros__parameters", {}))
+        elif flag in ("-p", "--param"):
+            name, raw = value.split(":=", 1)
+            _PARAMETER_OVERRIDES[name] = yaml.safe_load(raw)
+
+
+class Node:
+    """Stand-in of `rclpy.node.Node`, which records subscriptions, timers and publishers."""
+
+    def __init__(self, node_name: str, **kwargs: Any) -> None:
+        self._node_name = node_name
+        self._parameters: dict[str, Parameter] = {}
+        self._set_parameters_callbacks: list[Callable[[list[Parameter]], Any]] = []
+        self._clock = Clock()
+        self._logger = Logger(node_name)
+        self.subscriptions: list[Subscription] = []
+        self.publishers: list[Publisher] = []
+        self.timers: list[Timer] = []
+
+    def get_name(self) -> str:
+        return self._node_name
+
+    def get_logger(self) -> Logger:
+        return self._logger
+
+    def get_clock(self) -> Clock:
+        return self._clock
+
+    def declare_parameter(self, name: str, value: Any = None, descriptor: Any = None, **kwargs: Any) -> Parameter:
+        parameter = Parameter(name, value=_PARAMETER_OVERRIDES.get(name, value))
+        self._parameters[name] = parameter
+        return parameter
+
+    def get_parameter(self, name: str) -> Parameter:
+        if name not in self._parameters:
+            raise ParameterNotDeclaredError(name)
+        return self._parameters[name]
+
+    def set_parameters(self, parameters: list[Parameter]) -> list[Any]:
+        results = [callback(parameters) for callback in self._set_parameters_callbacks]
+        for parameter in parameters:
+            self._parameters[parameter.name] = parameter
+        return results
+
+    def add_on_set_parameters_callback(self, callback: Callable[[list[Parameter]], Any]) -> None:
+        self._set_parameters_callbacks.append(callback)
+
+    def create_subscription(self, msg_type: type, topic: str, callback: Callable, qos: Any, **kwargs: Any) -> Subscription:
+        subscription = Subscription(msg_type, topic, callback)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def create_publisher(self, msg_type: type, topic: str, qos: Any, **kwargs: Any) -> Publisher:
+        publisher = Publisher(msg_type, topic)
+        self.publishers.append(publisher)
+        return publisher
+
+    def create_timer(self, period: float, callback: Callable, callback_group: Any = None, **kwargs: Any) -> Timer:
+        timer = Timer(period, callback, callback_group)
+        self.timers.append(timer)
+        return timer
+
+    def destroy_node(self) -> None:
+        pass
+
+
+class _Anything:
+    """Placeholder accepting any arguments and attributes, which is used for QoS, executors and tf2."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> _Anything:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Anything()
+
+    def __call__(self, *args: Any, **kwargs: Any) -> _Anything:
+        return _Anything()
+
+
+class _Unavailable:
+    """Placeholder of a package which is not installed, raising `ImportError` on use."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, name: str) -> _Unavailable:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Unavailable(f"{self._name}.{name}")
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        msg = f"{self._name} is not available without the package"
+        raise ImportError(msg)
+
+
+def quaternion_from_euler(ai: float, aj: float, ak: float) -> tuple[float, float, float, float]:
+    """Stand-in of `tf_transformations.quaternion_from_euler` with the static xyz axes.
+
+    Returns:
+    -------
+        tuple[float, float, float, float]: Quaternion in the order of (x, y, z, w).
+
+    """
+    ci, si = math.cos(ai / 2), math.sin(ai / 2)
+    cj, sj = math.cos(aj / 2), math.sin(aj / 2)
+    ck, sk = math.cos(ak / 2), math.sin(ak / 2)
+    return (
+        si * cj * ck - ci * sj * sk,
+        ci * sj * ck + si * cj * sk,
+        ci * cj * sk - si * sj * ck,
+        ci * cj * ck + si * sj * sk,
+    )
+
+
+def _rclpy_modules() -> dict[str, dict[str, Any]]:
+    anything = {"__getattr__": _Anything().__getattr__}
+    return {
+        "rclpy": {"init": _init, "shutdown": lambda **_: None, "try_shutdown": lambda **_: None},
+        "rclpy.node": {"Node": Node},
+        "rclpy.duration": {"Duration": Duration},
+        "rclpy.time": {"Time": TimeStamp},
+        "rclpy.clock": {"Clock": Clock, "ROSClock": Clock},
+        "rclpy.parameter": {"Parameter": Parameter},
+        "rclpy.qos": anything,
+        "rclpy.callback_groups": anything,
+        "rclpy.executors": anything,
+        "rcl_interfaces": {},
+        "rcl_interfaces.msg": {
+            "ParameterDescriptor": _message("ParameterDescriptor"),
+            "SetParametersResult": _message("SetParametersResult", {"successful": True, "reason": ""}),
+            "ParameterValue": ParameterValue,
+        },
+        "tf2_ros": anything,
+        "tf2_ros.buffer": anything,
+        "tf2_ros.transform_listener": anything,
+        "tf_transformations": {"quaternion_from_euler": quaternion_from_euler},
+    }
+
+
+def _message_modules() -> dict[str, dict[str, Any]]:
+    return {
+        "builtin_interfaces.msg": {"Time": Time, "Duration": DurationMsg},
+        "std_msgs.msg": {"Header": Header, "String": String, "ColorRGBA": ColorRGBA},
+        "geometry_msgs.msg": {
+            "Point": Point,
+            "Vector3": Vector3,
+            "Quaternion": Quaternion,
+            "Pose": Pose,
+            "PoseWithCovariance": PoseWithCovariance,
+            "Twist": Twist,
+            "TwistWithCovariance": TwistWithCovariance,
+            "Accel": Accel,
+            "AccelWithCovariance": AccelWithCovariance,
+            "Transform": Transform,
+            "TransformStamped": TransformStamped,
+        },
+        "nav_msgs.msg": {"Odometry": Odometry},
+        "unique_identifier_msgs.msg": {"UUID": UUID},
+        "autoware_perception_msgs.msg": {
+            "ObjectClassification": ObjectClassification,
+            "Shape": Shape,
+            "TrackedObjectKinematics": TrackedObjectKinematics,
+            "TrackedObject": TrackedObject,
+            "TrackedObjects": TrackedObjects,
+            "PredictedPath": PredictedPath,
+            "PredictedObjectKinematics": PredictedObjectKinematics,
+            "PredictedObject": PredictedObject,
+            "PredictedObjects": PredictedObjects,
+        },
+        "autoware_planning_msgs.msg": {"Trajectory": Trajectory, "TrajectoryPoint": TrajectoryPoint},
+        "autoware_new_planning_msgs.msg": {
+            "Trajectory": NewTrajectory,
+            "TrajectoryPoint": TrajectoryPoint,
+            "Trajectories": Trajectories,
+            "TrajectoryGeneratorInfo": TrajectoryGeneratorInfo,
+        },
+        "visualization_msgs.msg": {"Marker": Marker, "MarkerArray": MarkerArray},
+    }
+
+
+# modules which are replaced with placeholders raising `ImportError` on use
+UNAVAILABLE_MODULES = (
+    "lanelet2",
+    "lanelet2.core",
+    "lanelet2.geometry",
+    "lanelet2.io",
+    "lanelet2.projection",
+    "lanelet2.routing",
+    "lanelet2.traffic_rules",
+    "autoware_lanelet2_extension_python",
+    "autoware_lanelet2_extension_python.projection",
+)
+
+
+def _is_available(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def install() -> list[str]:
+    """Install stand-ins of ROS 2 packages which are not importable.
+
+    Returns:
+    -------
+        list[str]: Names of top-level packages replaced with stand-ins.
+
+    """
+    installed = []
+
+    def add_module(name: str, attrs: dict[str, Any]) -> None:
+        package = name.split(".")[0]
+        if not getattr(sys.modules.get(package), "__standin__", False) and _is_available(package):
+            return
+        parts = name.split(".")
+        for i in range(len(parts)):
+            module_name = ".".join(parts[: i + 1])
+            if module_name not in sys.modules:
+                module = ModuleType(module_name)
+                module.__standin__ = True
+                module.__path__ = []
+                sys.modules[module_name] = module
+                if i > 0:
+                    setattr(sys.modules[".".join(parts[:i])], parts[i], module)
+        vars(sys.modules[name]).update(attrs)
+        if package not in installed:
+            installed.append(package)
+
+    for name, attrs in {**_rclpy_modules(), **_message_modules()}.items():
+        add_module(name, attrs)
+    for name in UNAVAILABLE_MODULES:
+        add_module(name, {"__getattr__": _Unavailable(name).__getattr__})
+    return installed
+
+
+def message_to_dict(msg: Any) -> Any:
+    """Convert a ROS message or its stand-in to a dict of plain values.
+
+    Args:
+    ----
+        msg (Any): Message.
+
+    Returns:
+    -------
+        Any: Converted dict.
+
+    """
+    if isinstance(msg, Message):
+        return {name: message_to_dict(value) for name, value in vars(msg).items()}
+    if isinstance(msg, (list, tuple)):
+        return [message_to_dict(value) for value in msg]
+    if hasattr(msg, "get_fields_and_field_types"):
+        from rosidl_runtime_py.convert import message_to_ordereddict
+
+        return message_to_ordereddict(msg)
+    if hasattr(msg, "tolist"):
+        return msg.tolist()
+    return msg
+
+
+def message_from_dict(msg_type: type, data: dict[str, Any]) -> Any:
+    """Construct a ROS message or its stand-in from a dict made by `message_to_dict`.
+
+    Args:
+    ----
+        msg_type (type): Message type.
+        data (dict[str, Any]): Field values.
+
+    Returns:
+    -------
+        Any: Constructed message.
+
+    """
+    msg = msg_type()
+    if not issubclass(msg_type, Message):
+        from rosidl_runtime_py.set_message import set_message_fields
+
+        set_message_fields(msg, data)
+        return msg
+
+    for name, value in data.items():
+        if isinstance(value, dict):
+            field_type = type(getattr(msg, name))
+            setattr(msg, name, message_from_dict(field_type, value))
+        elif isinstance(value, list) and msg_type._list_fields.get(name) is not None:
+            item_type = msg_type._list_fields[name]
+            setattr(msg, name, [message_from_dict(item_type, item) for item in value])
+        else:
+            setattr(msg, name, value)
+    return msg
@@ -0,0 +1,179 @@
+"""Report latency and accuracy drift of the shared scene encoding against the per-target encoding.
+
+A synthetic scene is encoded for the first B agents as targets, either in each target frame (per-target), or once in
+the frame of the first target with positions given in each target frame (shared). Accuracy is measured by
+minADE/minFDE of shared predictions against the most likely trajectory of per-target predictions.
+
+Example:
+-------
+    $ python -m benchmarks.shared_encoding config/mtr.yaml --checkpoint mtr_shared.pth --variant --num-targets 4 16
+
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import torch
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend
+from awml_pred.models import build_model
+
+from .common import compute_min_ade_fde, measure_latency
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency and accuracy report of the shared scene encoding.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--variant", action="store_true", help="Build the model with `shared_scene_encoding=True`.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--num-targets", type=int, nargs="+", default=[1, 4, 16], help="Numbers of targets.")
+    parser.add_argument("--num-agent", type=int, default=32, help="Number of agents in the scene.")
+    parser.add_argument("--num-polyline", type=int, default=768, help="Number of map polylines in the scene.")
+    parser.add_argument("--max-heading", type=float, default=np.pi, help="Max heading of agents from the first one.")
+    parser.add_argument("--num-iters", type=int, default=5, help="Number of measured iterations.")
+    return parser.parse_args()
+
+
+def _rotate(xy: np.ndarray, angle: float) -> np.ndarray:
+    cos, sin = np.cos(angle), np.sin(angle)
+    return np.stack((cos * xy[..., 0] - sin * xy[..., 1], sin * xy[..., 0] + cos * xy[..., 1]), axis=-1)
+
+
+def create_scene(
+    num_agent: int,
+    num_polyline: int,
+    max_heading: float,
+    num_timestamp: int = 11,
+    num_point: int = 20,
+    seed: int = 0,
+) -> dict[str, np.ndarray]:
+    """Return a synthetic scene in world coords, where agents move straight along their headings.
+
+    Returns:
+    -------
+        dict[str, np.ndarray]: Agent positions (N, T, 2), headings (N,), speeds (N,) and map polylines (K, P, 7).
+
+    """
+    rng = np.random.default_rng(seed)
+    heading = rng.uniform(-max_heading, max_heading, num_agent)
+    heading[0] = 0.0
+    speed = rng.uniform(0.0, 15.0, num_agent)
+    start = rng.uniform(-50.0, 50.0, (num_agent, 2))
+    steps = np.arange(num_timestamp) * 0.1
+    direction = np.stack((np.cos(heading), np.sin(heading)), axis=-1)
+    positions = start[:, None] + (speed[:, None, None] * steps[None, :, None]) * direction[:, None]
+
+    map_heading = rng.uniform(-np.pi, np.pi, (num_polyline, 1))
+    map_heading = map_heading + np.cumsum(rng.normal(0.0, 0.05, (num_polyline, num_point)), axis=1)
+    map_direction = np.stack((np.cos(map_heading), np.sin(map_heading)), axis=-1)
+    polylines = np.zeros((num_polyline, num_point, 7), dtype=np.float32)
+    polylines[..., :2] = rng.uniform(-100.0, 100.0, (num_polyline, 1, 2)) + np.cumsum(map_direction, axis=1)
+    polylines[..., 3:5] = map_direction
+    polylines[..., 6] = rng.integers(0, 3, (num_polyline, 1))
+    return {"positions": positions, "heading": heading, "speed": speed, "polylines": polylines}
+
+
+def to_frame(scene: dict[str, np.ndarray], target: int) -> dict[str, np.ndarray]:
+    """Transform the scene from world coords to the frame of the target agent.
+
+    Returns:
+    -------
+        dict[str, np.ndarray]: Embedded agents (N, T, 29), map polylines (K, P, 9) and their positions.
+
+    """
+    origin = scene["positions"][target, -1]
+    yaw = scene["heading"][target]
+    num_agent, num_timestamp, _ = scene["positions"].shape
+
+    positions = _rotate(scene["positions"] - origin, -yaw)
+    heading = scene["heading"] - yaw
+    velocity = scene["speed"][:, None] * np.stack((np.cos(heading), np.sin(heading)), axis=-1)
+
+    obj_trajs = np.zeros((num_agent, num_timestamp, 29), dtype=np.float32)
+    obj_trajs[..., 0:2] = positions
+    obj_trajs[..., 3:6] = (4.5, 2.0, 1.7)
+    obj_trajs[..., 6] = 1  # vehicle
+    obj_trajs[target, :, 9] = 1  # target flag
+    obj_trajs[0, :, 10] = 1  # ego flag
+    obj_trajs[:, np.arange(num_timestamp), 11 + np.arange(num_timestamp)] = 1
+    obj_trajs[..., 11 + num_timestamp] = np.arange(num_timestamp) * 0.1
+    obj_trajs[..., 23] = np.sin(heading)[:, None]
+    obj_trajs[..., 24] = np.cos(heading)[:, None]
+    obj_trajs[..., 25:27] = velocity[:, None]
+
+    polylines = scene["polylines"].copy()
+    polylines[..., :2] = _rotate(polylines[..., :2] - origin, -yaw)
+    polylines[..., 3:5] = _rotate(polylines[..., 3:5], -yaw)
+    prev_xy = np.roll(polylines[..., :2], shift=1, axis=-2)
+    prev_xy[:, 0] = prev_xy[:, 1]
+    polylines = np.concatenate((polylines, prev_xy), axis=-1)
+
+    last_pos = np.zeros((num_agent, 3), dtype=np.float32)
+    last_pos[:, :2] = positions[:, -1]
+    return {
+        "obj_trajs": obj_trajs,
+        "map_polylines": polylines,
+        "obj_trajs_last_pos": last_pos,
+        "map_polylines_center": polylines[..., :3].mean(axis=1),
+    }
+
+
+def create_inputs(scene: dict[str, np.ndarray], num_target: int, *, shared: bool) -> dict[str, torch.Tensor]:
+    """Return inputs of `MTR` for the first `num_target` agents.
+
+    If `shared=True`, scene inputs are given once in the frame of the first agent.
+    """
+    frames = [to_frame(scene, b) for b in range(num_target)]
+    # NOTE: the target flag of the first agent remains in shared inputs, which is cleared by the variant
+    frames_scene = frames[:1] if shared else frames
+
+    num_agent, num_timestamp, _ = frames[0]["obj_trajs"].shape
+    num_polyline, num_point, _ = frames[0]["map_polylines"].shape
+    rng = np.random.default_rng(0)
+    intention_points = rng.normal(0.0, 30.0, (1, 64, 2)).repeat(num_target, axis=0)
+    return {
+        "obj_trajs": torch.from_numpy(np.stack([f["obj_trajs"] for f in frames_scene])),
+        "obj_trajs_mask": torch.ones(len(frames_scene), num_agent, num_timestamp, dtype=torch.bool),
+        "map_polylines": torch.from_numpy(np.stack([f["map_polylines"] for f in frames_scene])),
+        "map_polylines_mask": torch.ones(len(frames_scene), num_polyline, num_point, dtype=torch.bool),
+        "map_polylines_center": torch.from_numpy(np.stack([f["map_polylines_center"] for f in frames])),
+        "obj_trajs_last_pos": torch.from_numpy(np.stack([f["obj_trajs_last_pos"] for f in frames])),
+        "track_index_to_predict": torch.arange(num_target, dtype=torch.int32),
+        "intention_points": torch.from_numpy(intention_points.astype(np.float32)),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = Config.from_file(args.config)
+    cfg.model.encoder.shared_scene_encoding = args.variant
+    model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        model, _ = load_checkpoint(model, args.checkpoint, mmap=True)
+    backend = build_backend({"name": "EagerBackend", "device": args.device}, model)
+
+    scene = create_scene(args.num_agent, args.num_polyline, args.max_heading)
+    for num_target in args.num_targets:
+        per_target = {k: v.to(args.device) for k, v in create_inputs(scene, num_target, shared=False).items()}
+        shared = {k: v.to(args.device) for k, v in create_inputs(scene, num_target, shared=True).items()}
+
+        ref_scores, ref_trajs = backend(**per_target)
+        pred_scores, pred_trajs = backend(**shared)
+        best_idx = ref_scores.argmax(dim=-1)
+        metrics = compute_min_ade_fde(pred_trajs, ref_trajs[torch.arange(num_target), best_idx])
+
+        per_target_latency = measure_latency(lambda i=per_target: backend(**i), num_iters=args.num_iters)["mean"]
+        shared_latency = measure_latency(lambda i=shared: backend(**i), num_iters=args.num_iters)["mean"]
+        print(
+            f"[targets={num_target}] per-target: {per_target_latency:.2f}ms, shared: {shared_latency:.2f}ms "
+            f"({per_target_latency / shared_latency:.2f}x), minADE drift: {metrics['minADE']:.4f}m, "
+            f"minFDE drift: {metrics['minFDE']:.4f}m",
+        )
+
+
+if __name__ == "__main__":
+    main()
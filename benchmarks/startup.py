@@ -0,0 +1,146 @@
+"""Report the startup time of the node, which is split into imports, model loading and warm-up.
+
+Imports are profiled by `python -X importtime` in a fresh interpreter, and the rest of stages are measured in order
+as the node does on startup.
+
+Example:
+-------
+    $ python -m benchmarks.startup config/mtr.yaml --checkpoint mtr_best.pth --backend TorchScriptBackend
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# modules imported by the node, which may be missing without ROS 2
+DEFAULT_MODULES = (
+    "torch",
+    "scipy.interpolate",
+    "scipy.signal",
+    "numba",
+    "awml_pred.models",
+    "awml_pred.deploy",
+    "projects.MTR.mtr",
+    "utils.polyline",
+    "utils.lanelet_converter",
+    "autoware_mtr.conversion.trajectory",
+    "src.mtr_node",
+)
+
+IMPORT_TIME_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Startup time report of the node.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("--checkpoint", type=str, default=None, help="Checkpoint file, random weights if omitted.")
+    parser.add_argument("--backend", type=str, default="EagerBackend", help="Name of the inference backend.")
+    parser.add_argument("--device", type=str, default="cpu", help="Device name.")
+    parser.add_argument("--modules", type=str, nargs="*", default=DEFAULT_MODULES, help="Modules to be profiled.")
+    parser.add_argument("--top-k", type=int, default=15, help="Number of the slowest modules to be shown.")
+    return parser.parse_args()
+
+
+def profile_imports(modules: list[str], top_k: int) -> None:
+    """Print import times of the modules in a fresh interpreter.
+
+    Args:
+    ----
+        modules (list[str]): Module names, which are imported in order.
+        top_k (int): Number of the slowest modules to be shown.
+
+    """
+    # NOTE: some modules exit on missing dependencies instead of raising ImportError
+    script = "\n".join(
+        f"try:\n    import {name}\nexcept (ImportError, SystemExit) as e:\n    print('{name}: skipped,', e)"
+        for name in modules
+    )
+    start = time.perf_counter()
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = time.perf_counter() - start
+    print(proc.stdout, end="")
+
+    records: list[tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        # top-level packages and the direct children
+        if len(indent) <= 3:
+            records.append((int(cumulative_us), int(self_us), name))
+
+    print(f"[import] total: {total:.3f}s")
+    for cumulative_us, self_us, name in sorted(records, reverse=True)[:top_k]:
+        print(f"    {name}: cumulative={cumulative_us / 1e6:.3f}s, self={self_us / 1e6:.3f}s")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    print(f"[{name}] {time.perf_counter() - start:.3f}s")
+
+
+def main() -> None:
+    args = parse_args()
+    profile_imports(args.modules, args.top_k)
+
+    with stage("import in-process"):
+        import numpy as np
+
+        from awml_pred.common import Config, load_checkpoint
+        from awml_pred.deploy import build_backend, create_dummy_inputs, fuse_for_inference
+        from awml_pred.models import build_model
+        from utils.polyline import TargetCentricPolyline, compute_polyline_centers, compute_polyline_centers_batch
+
+        from .synthetic import SceneConfig, generate_map
+
+    cfg = Config.from_file(args.config)
+    with stage("build model"):
+        model = build_model(cfg.model)
+    if args.checkpoint is not None:
+        with stage("load checkpoint"):
+            model, _ = load_checkpoint(model, args.checkpoint, mmap=True)
+    with stage("fuse"):
+        model = fuse_for_inference(model)
+    with stage("build backend"):
+        backend = build_backend({"name": args.backend, "device": args.device}, model)
+
+    inputs = create_dummy_inputs(
+        num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+        num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+        device=args.device,
+        seed=0,
+    )
+    with stage("warm-up backend"):
+        backend.warmup(inputs)
+    with stage("warm-up polyline"):
+        TargetCentricPolyline().warmup()
+    with stage("first inference"):
+        backend(**inputs)
+    with stage("first map batch"):
+        # NOTE: the node splits the whole map into batch polylines and their centers on the first prediction
+        transform = TargetCentricPolyline()
+        points, _ = generate_map(SceneConfig(map_size=1000.0))
+        batch_polylines, batch_polylines_mask = transform._generate_batch(points)
+        compute_polyline_centers(batch_polylines, batch_polylines_mask)
+    with stage("first polyline centers"):
+        polylines = np.zeros((1, 768, 20, 9), dtype=np.float32)
+        compute_polyline_centers_batch(polylines, np.ones(polylines.shape[:3], dtype=np.bool_))
+
+
+if __name__ == "__main__":
+    main()
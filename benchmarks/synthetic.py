@@ -0,0 +1,134 @@
+"""Procedural generator of scenarios on a lanelet-like grid map, which are predicted without ROS.
+
+The map is a grid of two-way roads, where each road consists of two lane centerlines, a dashed center line and two
+road edges, sampled in the same point format as `AWMLStaticMap.get_all_polyline(as_array=True, full=True)`.
+Agents drive along lanes at constant speeds, and the ego is the first agent. Ego hypotheses are the ego heading
+biased to the left and right, as the node adds with `add_left_bias_history` and `add_right_bias_history`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from awml_pred.datatype import MapType
+from utils.scenario import Scenario
+
+__all__ = ("SceneConfig", "generate_map", "generate_scenarios")
+
+LANE_WIDTH = 3.5
+
+
+@dataclass(frozen=True)
+class SceneConfig:
+    """Configuration of a synthetic scene.
+
+    Attributes
+    ----------
+        map_size (float): Side length of the square map in [m].
+        num_agent (int): Number of agents including the ego.
+        num_timestamp (int): Number of past timestamps.
+        num_hypothesis (int): Number of ego hypotheses including the ego itself.
+        road_interval (float): Interval of grid roads in [m].
+        point_interval (float): Interval of map points in [m].
+
+    """
+
+    map_size: float = 200.0
+    num_agent: int = 32
+    num_timestamp: int = 11
+    num_hypothesis: int = 1
+    road_interval: float = 50.0
+    point_interval: float = 0.5
+
+
+def _line(start: np.ndarray, end: np.ndarray, interval: float, type_id: int) -> np.ndarray:
+    length = np.linalg.norm(end - start)
+    num_point = max(int(length / interval), 1) + 1
+    points = np.zeros((num_point, 7), dtype=np.float32)
+    points[:, :2] = np.linspace(start, end, num_point)
+    points[:, 3:5] = (end - start) / max(length, 1e-6)
+    points[:, 6] = type_id
+    return points
+
+
+def generate_map(cfg: SceneConfig) -> tuple[np.ndarray, list[tuple[np.ndarray, np.ndarray]]]:
+    """Generate a grid map.
+
+    Args:
+    ----
+        cfg (SceneConfig): Scene configuration.
+
+    Returns:
+    -------
+        tuple[np.ndarray, list[tuple[np.ndarray, np.ndarray]]]: Map points in the shape of (M, 7), and start and end
+            positions of lane centerlines.
+
+    """
+    half = cfg.map_size / 2
+    offsets = np.arange(-half, half + 1e-6, cfg.road_interval)
+    polylines, lanes = [], []
+    for offset in offsets:
+        for axis in range(2):
+
+            def point(along: float, across: float, axis: int = axis, offset: float = offset) -> np.ndarray:
+                return np.array((along, offset + across) if axis == 0 else (offset + across, along))
+
+            # lanes of both directions
+            for sign in (1.0, -1.0):
+                start, end = point(-half * sign, -sign * LANE_WIDTH / 2), point(half * sign, -sign * LANE_WIDTH / 2)
+                lanes.append((start, end))
+                polylines.append(_line(start, end, cfg.point_interval, MapType.ROADWAY.value))
+            polylines.append(_line(point(-half, 0.0), point(half, 0.0), cfg.point_interval, MapType.DASHED.value))
+            for across in (-LANE_WIDTH, LANE_WIDTH):
+                polylines.append(_line(point(-half, across), point(half, across), cfg.point_interval, MapType.SOLID.value))
+    return np.concatenate(polylines, axis=0), lanes
+
+
+def generate_scenarios(cfg: SceneConfig, seed: int = 0) -> list[Scenario]:
+    """Generate scenarios of the ego and its hypotheses in a random traffic.
+
+    Args:
+    ----
+        cfg (SceneConfig): Scene configuration.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+    -------
+        list[Scenario]: Scenarios of each ego hypothesis, where the target is the ego.
+
+    """
+    rng = np.random.default_rng(seed)
+    polylines, lanes = generate_map(cfg)
+    timestamps = np.arange(cfg.num_timestamp, dtype=np.float32) * 0.1
+
+    agents = np.zeros((cfg.num_agent, cfg.num_timestamp, 10))
+    for n in range(cfg.num_agent):
+        start, end = lanes[rng.integers(len(lanes))]
+        direction = (end - start) / np.linalg.norm(end - start)
+        speed = rng.uniform(0.0, 15.0)
+        origin = start + direction * rng.uniform(0.2, 0.8) * np.linalg.norm(end - start)
+        agents[n, :, 0:2] = origin + (timestamps - timestamps[-1])[:, None] * speed * direction
+        agents[n, :, 3:6] = (4.5, 2.0, 1.7)
+        agents[n, :, 6] = np.arctan2(direction[1], direction[0])
+        agents[n, :, 7:9] = speed * direction
+        agents[n, :, 9] = 1
+
+    scenarios = []
+    for i in range(cfg.num_hypothesis):
+        # 0, +10deg, -10deg, +20deg, ...
+        bias = np.deg2rad(10.0) * ((i + 1) // 2) * (1 if i % 2 else -1)
+        hypothesis = agents.copy()
+        hypothesis[0, -1, 6] += bias
+        scenarios.append(
+            Scenario(
+                scenario_id=f"seed{seed}_hypothesis{i}",
+                agents=hypothesis,
+                label_ids=np.zeros(cfg.num_agent, dtype=np.int64),
+                timestamps=timestamps,
+                target_indices=np.zeros(1, dtype=np.int64),
+                polylines=polylines,
+            ),
+        )
+    return scenarios
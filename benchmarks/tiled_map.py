@@ -0,0 +1,105 @@
+"""Benchmark the tiled map store against the whole map in memory while the ego drives across a synthetic map.
+
+Polylines of a large grid map are built into tiles, and polylines around the ego are selected by
+`TargetCentricPolyline` from either the whole map or tiles loaded by `TiledMap`. The memory of map arrays, the latency
+of each tick including tile updates, and whether selected polylines are same as the whole map are reported.
+
+Example:
+-------
+    $ python -m benchmarks.tiled_map --map-size 4000 --tile-size 200 --radius 300 --max-tiles 64
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from utils.polyline import TargetCentricPolyline, compute_polyline_centers
+from utils.scenario import _TargetState
+from utils.tiled_map import TiledMap, build_tiles
+
+from .synthetic import SceneConfig, generate_map
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the tiled map store.")
+    parser.add_argument("--map-size", type=float, default=4000.0, help="Side length of the synthetic map in [m].")
+    parser.add_argument("--road-interval", type=float, default=100.0, help="Interval of grid roads in [m].")
+    parser.add_argument("--point-interval", type=float, default=1.0, help="Interval of map points in [m].")
+    parser.add_argument("--tile-size", type=float, default=200.0, help="Side length of each tile in [m].")
+    parser.add_argument("--radius", type=float, default=300.0, help="Radius where tiles are required in [m].")
+    parser.add_argument("--max-tiles", type=int, default=64, help="Max number of cached tiles.")
+    parser.add_argument("--prefetch-distance", type=float, default=100.0, help="Prefetch distance in [m].")
+    parser.add_argument("--speed", type=float, default=20.0, help="Ego speed in [m/s].")
+    parser.add_argument("--num-ticks", type=int, default=500, help="Number of ticks at 10 Hz.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    cfg = SceneConfig(map_size=args.map_size, road_interval=args.road_interval, point_interval=args.point_interval)
+    points, _ = generate_map(cfg)
+    transform = TargetCentricPolyline()
+
+    start = time.perf_counter()
+    batch_polylines, batch_polylines_mask = transform._generate_batch(points)
+    polyline_center = compute_polyline_centers(batch_polylines, batch_polylines_mask)[..., :2]
+    full_bytes = batch_polylines.nbytes + batch_polylines_mask.nbytes + polyline_center.nbytes
+    print(
+        f"[map] {len(points)} points, {len(batch_polylines)} polylines, {full_bytes / 2**20:.1f}MiB in memory, "
+        f"built in {time.perf_counter() - start:.2f}s",
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        tiles = build_tiles(points, tmpdir, tile_size=args.tile_size, transform=transform)
+        print(f"[tiles] {len(tiles)} tiles, built in {time.perf_counter() - start:.2f}s")
+        tiled_map = TiledMap(
+            tmpdir,
+            radius=args.radius,
+            max_tiles=args.max_tiles,
+            prefetch_distance=args.prefetch_distance,
+        )
+
+        # NOTE: the ego drives along a lane of the road at the center of the map
+        half = args.map_size / 2
+        full_latencies, tiled_latencies, max_bytes, num_same = [], [], 0, 0
+        for tick in range(args.num_ticks):
+            x = -half + (args.speed * tick * 0.1) % args.map_size
+            ego = _TargetState(xyz=np.array([(x, -1.75, 0.0)]), yaw=np.zeros(1))
+
+            start = time.perf_counter()
+            full_info, *_ = transform(None, ego, 1, batch_polylines, batch_polylines_mask, polyline_center)
+            full_latencies.append((time.perf_counter() - start) * 1e3)
+
+            start = time.perf_counter()
+            tile_polylines, tile_polylines_mask, tile_center = tiled_map.update(ego.xy, ego.xy[0], ego.yaw[0])
+            tiled_info, *_ = transform(None, ego, 1, tile_polylines, tile_polylines_mask, tile_center)
+            tiled_latencies.append((time.perf_counter() - start) * 1e3)
+
+            max_bytes = max(max_bytes, tiled_map.memory_bytes)
+            # NOTE: distances of selected polylines are compared, because polylines in the same distance are selected
+            # in the order of polylines, which is changed by tiles
+            full_distances, tiled_distances = (
+                np.sort(np.linalg.norm(info["polyline_centers"][0, :, :2] - transform.center_offset, axis=-1))
+                for info in (full_info, tiled_info)
+            )
+            is_same = full_distances.shape == tiled_distances.shape and np.allclose(full_distances, tiled_distances)
+            num_same += int(is_same)
+        tiled_map.close()
+
+    for name, latencies in (("full", full_latencies), ("tiled", tiled_latencies)):
+        print(f"[{name}] mean={np.mean(latencies):.2f}ms, p99={np.percentile(latencies, 99):.2f}ms")
+    print(
+        f"[tiled] max {max_bytes / 2**20:.1f}MiB in memory ({max_bytes / full_bytes:.1%} of the whole map), "
+        f"sync loads: {tiled_map.num_sync_loads}, prefetched: {tiled_map.num_prefetched}, "
+        f"evicted: {tiled_map.num_evicted}, same selection: {num_same}/{args.num_ticks}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -155,7 +155,149 @@ class TRTAttentionValueComputation(Function):
         return torch.zeros(total_query_num, nhead, hdim)
 
 
-@FUNCTION_REWRITER.register(func_name="mtr.ops.attention_weight_computation", backend="tensorrt")
+class AttentionWeightComputation(Function):
+    @staticmethod
+    @parse_args("v", "v", "v", "v", "v", "v")
+    def symbolic(
+        g: GraphCtx,
+        query_batch_cnt: JitValue,
+        key_batch_cnt: JitValue,
+        index_pair_batch: JitValue,
+        index_pair: JitValue,
+        query_features: JitValue,
+        key_features: JitValue,
+    ) -> Any:
+        """Load symbolic of this module.
+
+        Args:
+        ----
+            g (GraphCtx): `GraphCtx` instance.
+            query_batch_cnt (JitValue): A tensor.
+            key_batch_cnt (JitValue): A tensor.
+            index_pair_batch (JitValue): A tensor.
+            index_pair (JitValue): A tensor.
+            query_features (JitValue): A tensor.
+            key_features (JitValue): A tensor.
+
+        Returns:
+        -------
+            Any: Symbolic.
+
+        """
+        return g.op(
+            "awml_pred::AttentionWeightComputation",
+            query_batch_cnt,
+            key_batch_cnt,
+            index_pair_batch,
+            index_pair,
+            query_features,
+            key_features,
+            outputs=1,
+        )
+
+    @staticmethod
+    def forward(
+        _ctx: FunctionCtx,
+        query_batch_cnt: Tensor,
+        key_batch_cnt: Tensor,
+        index_pair_batch: Tensor,
+        index_pair: Tensor,
+        query_features: Tensor,
+        key_features: Tensor,
+    ) -> Tensor:
+        """Run forward operation.
+
+        Args:
+        ----
+            _ctx (FunctionCtx): `FunctionCtx` instance.
+            query_batch_cnt (Tensor): A tensor.
+            key_batch_cnt (Tensor): A tensor.
+            index_pair_batch (Tensor): A tensor.
+            index_pair (Tensor): A tensor.
+            query_features (Tensor): A tensor.
+            key_features (Tensor): A tensor.
+
+        Returns:
+        -------
+            Tensor: Forward result.
+
+        """
+        func = FUNCTION_REWRITER.get_origin("projects.MTR.mtr.ops.attention_weight_computation")
+        return func(query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, query_features, key_features)
+
+
+class AttentionValueComputation(Function):
+    @staticmethod
+    @parse_args("v", "v", "v", "v", "v", "v")
+    def symbolic(
+        g: GraphCtx,
+        query_batch_cnt: JitValue,
+        key_batch_cnt: JitValue,
+        index_pair_batch: JitValue,
+        index_pair: JitValue,
+        attn_weight: JitValue,
+        value_features: JitValue,
+    ) -> Any:
+        """Load the symbolic of this module.
+
+        Args:
+        ----
+            g (GraphCtx): `GraphCtx` instance.
+            query_batch_cnt (JitValue): A tensor.
+            key_batch_cnt (JitValue): A tensor.
+            index_pair_batch (JitValue): A tensor.
+            index_pair (JitValue): A tensor.
+            attn_weight (JitValue): A tensor.
+            value_features (JitValue): A tensor.
+
+        Returns:
+        -------
+            Any: Symbolic.
+
+        """
+        return g.op(
+            "awml_pred::AttentionValueComputation",
+            query_batch_cnt,
+            key_batch_cnt,
+            index_pair_batch,
+            index_pair,
+            attn_weight,
+            value_features,
+            outputs=1,
+        )
+
+    @staticmethod
+    def forward(
+        _ctx: FunctionCtx,
+        query_batch_cnt: Tensor,
+        key_batch_cnt: Tensor,
+        index_pair_batch: Tensor,
+        index_pair: Tensor,
+        attn_weight: Tensor,
+        value_features: Tensor,
+    ) -> Tensor:
+        """Run forward operation.
+
+        Args:
+        ----
+            _ctx (FunctionCtx): `FunctionCtx` instance.
+            query_batch_cnt (Tensor): A tensor.
+            key_batch_cnt (Tensor): A tensor.
+            index_pair_batch (Tensor): A tensor.
+            index_pair (Tensor): A tensor.
+            attn_weight (Tensor): A tensor.
+            value_features (Tensor): A tensor.
+
+        Returns:
+        -------
+            Tensor: Forward result.
+
+        """
+        func = FUNCTION_REWRITER.get_origin("projects.MTR.mtr.ops.attention_value_computation")
+        return func(query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, attn_weight, value_features)
+
+
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.attention_weight_computation", backend="tensorrt")
 def attention_weight_computation__tensorrt(
     query_batch_cnt: Tensor,
     key_batch_cnt: Tensor,
@@ -190,7 +332,7 @@ def attention_weight_computation__tensorrt(
     )
 
 
-@FUNCTION_REWRITER.register(func_name="mtr.ops.attention_value_computation", backend="tensorrt")
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.attention_value_computation", backend="tensorrt")
 def attention_value_computation__tensorrt(
     query_batch_cnt: Tensor,
     key_batch_cnt: Tensor,
@@ -223,3 +365,75 @@ def attention_value_computation__tensorrt(
         attn_weight,
         value_features,
     )
+
+
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.attention_weight_computation", backend="onnxruntime")
+def attention_weight_computation__onnxruntime(
+    query_batch_cnt: Tensor,
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    query_features: Tensor,
+    key_features: Tensor,
+) -> Tensor:
+    """Run attention weight computation with ONNX Runtime backend.
+
+    Args:
+    ----
+        query_batch_cnt (Tensor): A tensor.
+        key_batch_cnt (Tensor): A tensor.
+        index_pair_batch (Tensor): A tensor.
+        index_pair (Tensor): A tensor.
+        query_features (Tensor): A tensor.
+        key_features (Tensor): A tensor.
+
+    Returns:
+    -------
+        Tensor: Forward result.
+
+    """
+    # NOTE: index types may be promoted to int64 in the exported graph
+    return AttentionWeightComputation.apply(
+        query_batch_cnt.int(),
+        key_batch_cnt.int(),
+        index_pair_batch.int(),
+        index_pair.int(),
+        query_features,
+        key_features,
+    )
+
+
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.attention_value_computation", backend="onnxruntime")
+def attention_value_computation__onnxruntime(
+    query_batch_cnt: Tensor,
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    attn_weight: Tensor,
+    value_features: Tensor,
+) -> Tensor:
+    """Run attention value computation with ONNX Runtime backend.
+
+    Args:
+    ----
+        query_batch_cnt (Tensor): A tensor.
+        key_batch_cnt (Tensor): A tensor.
+        index_pair_batch (Tensor): A tensor.
+        index_pair (Tensor): A tensor.
+        attn_weight (Tensor): A tensor.
+        value_features (Tensor): A tensor.
+
+    Returns:
+    -------
+        Tensor: Forward result.
+
+    """
+    # NOTE: index types may be promoted to int64 in the exported graph
+    return AttentionValueComputation.apply(
+        query_batch_cnt.int(),
+        key_batch_cnt.int(),
+        index_pair_batch.int(),
+        index_pair.int(),
+        attn_weight,
+        value_features,
+    )
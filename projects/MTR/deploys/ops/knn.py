@@ -38,7 +38,7 @@ class KnnBatch(Function):
 
         """
         if not symbolic_helper._is_value(top_k):  # noqa: SLF001
-            top_k = g.op("Constant", value_t=torch.tensor(top_k, torch.long))
+            top_k = g.op("Constant", value_t=torch.tensor(top_k, dtype=torch.long))
         return g.op("awml_pred::KnnBatch", xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
 
     @staticmethod
@@ -66,8 +66,7 @@ class KnnBatch(Function):
             Tensor: Forward result.
 
         """
-        from awml_pred.ops import knn_batch
-
+        knn_batch = FUNCTION_REWRITER.get_origin("projects.MTR.mtr.ops.knn_batch")
         return knn_batch(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
 
 
@@ -163,7 +162,7 @@ class KnnBatchMlogK(Function):
 
         """
         if not symbolic_helper._is_value(top_k):  # noqa: SLF001
-            top_k = g.op("Constant", value_t=torch.tensor(top_k, torch.long))
+            top_k = g.op("Constant", value_t=torch.tensor(top_k, dtype=torch.long))
         return g.op("awml_pred::KnnBatchMlogK", xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
 
     @staticmethod
@@ -191,8 +190,7 @@ class KnnBatchMlogK(Function):
             Tensor: Forward result.
 
         """
-        from awml_pred.ops import knn_batch_mlogk
-
+        knn_batch_mlogk = FUNCTION_REWRITER.get_origin("projects.MTR.mtr.ops.knn_batch_mlogk")
         return knn_batch_mlogk(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
 
 
@@ -261,7 +259,7 @@ class TRTKnnBatchMlogK(Function):
         return torch.zeros(n, top_k, dtype=torch.int)
 
 
-@FUNCTION_REWRITER.register(func_name="mtr.ops.knn_batch", backend="tensorrt")
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.knn_batch", backend="tensorrt")
 def knn_batch__tensorrt(
     xyz: Tensor,
     query_xyz: Tensor,
@@ -287,7 +285,7 @@ def knn_batch__tensorrt(
     return TRTKnnBatch.apply(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
 
 
-@FUNCTION_REWRITER.register(func_name="mtr.ops.knn_batch_mlogk", backend="tensorrt")
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.knn_batch_mlogk", backend="tensorrt")
 def knn_batch_mlogk__tensorrt(
     xyz: Tensor,
     query_xyz: Tensor,
@@ -311,3 +309,57 @@ def knn_batch_mlogk__tensorrt(
 
     """
     return TRTKnnBatchMlogK.apply(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
+
+
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.knn_batch", backend="onnxruntime")
+def knn_batch__onnxruntime(
+    xyz: Tensor,
+    query_xyz: Tensor,
+    batch_idxs: Tensor,
+    query_batch_offsets: Tensor,
+    top_k: int,
+) -> Tensor:
+    """Run KNN batch computation with ONNX Runtime backend.
+
+    Args:
+    ----
+        xyz (Tensor): A tensor.
+        query_xyz (Tensor): A tensor.
+        batch_idxs (Tensor): A tensor.
+        query_batch_offsets (Tensor): A tensor.
+        top_k (int): The number of top-K.
+
+    Returns:
+    -------
+        Tensor: Forward result.
+
+    """
+    # NOTE: index types may be promoted to int64 in the exported graph
+    return KnnBatch.apply(xyz, query_xyz, batch_idxs.int(), query_batch_offsets.int(), top_k)
+
+
+@FUNCTION_REWRITER.register(func_name="projects.MTR.mtr.ops.knn_batch_mlogk", backend="onnxruntime")
+def knn_batch_mlogk__onnxruntime(
+    xyz: Tensor,
+    query_xyz: Tensor,
+    batch_idxs: Tensor,
+    query_batch_offsets: Tensor,
+    top_k: int,
+) -> Tensor:
+    """Run KNN batch MLogK computation with ONNX Runtime backend.
+
+    Args:
+    ----
+        xyz (Tensor): A tensor.
+        query_xyz (Tensor): A tensor.
+        batch_idxs (Tensor): A tensor.
+        query_batch_offsets (Tensor): A tensor.
+        top_k (int): The number of top-K.
+
+    Returns:
+    -------
+        Tensor: Forward result.
+
+    """
+    # NOTE: index types may be promoted to int64 in the exported graph
+    return KnnBatchMlogK.apply(xyz, query_xyz, batch_idxs.int(), query_batch_offsets.int(), top_k)
@@ -0,0 +1,87 @@
+"""Python kernels of the custom operations for ONNX Runtime.
+
+Importing this module registers the kernels to `onnxruntime-extensions`, which are executed on CPU with the pure
+PyTorch implementations. Nodes in `awml_pred` domain must be moved to `ai.onnx.contrib` domain to be resolved, which
+is done by `OnnxRuntimeBackend`.
+"""
+
+import numpy as np
+import torch
+from onnxruntime_extensions import PyCustomOpDef, onnx_op
+
+from ..mtr.ops import torch_ops
+
+__all__ = ()
+
+_KNN_INPUTS = [
+    PyCustomOpDef.dt_float,
+    PyCustomOpDef.dt_float,
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_int64,
+]
+
+_ATTENTION_INPUTS = [
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_int32,
+    PyCustomOpDef.dt_float,
+    PyCustomOpDef.dt_float,
+]
+
+
+@onnx_op(op_type="KnnBatch", inputs=_KNN_INPUTS, outputs=[PyCustomOpDef.dt_int32])
+def knn_batch(
+    xyz: np.ndarray,
+    query_xyz: np.ndarray,
+    batch_idxs: np.ndarray,
+    query_batch_offsets: np.ndarray,
+    top_k: np.ndarray,
+) -> np.ndarray:
+    args = map(torch.from_numpy, (xyz, query_xyz, batch_idxs, query_batch_offsets))
+    return torch_ops.knn_batch(*args, int(top_k)).numpy()
+
+
+@onnx_op(op_type="KnnBatchMlogK", inputs=_KNN_INPUTS, outputs=[PyCustomOpDef.dt_int32])
+def knn_batch_mlogk(
+    xyz: np.ndarray,
+    query_xyz: np.ndarray,
+    batch_idxs: np.ndarray,
+    query_batch_offsets: np.ndarray,
+    top_k: np.ndarray,
+) -> np.ndarray:
+    args = map(torch.from_numpy, (xyz, query_xyz, batch_idxs, query_batch_offsets))
+    return torch_ops.knn_batch_mlogk(*args, int(top_k)).numpy()
+
+
+@onnx_op(op_type="AttentionWeightComputation", inputs=_ATTENTION_INPUTS, outputs=[PyCustomOpDef.dt_float])
+def attention_weight_computation(
+    query_batch_cnt: np.ndarray,
+    key_batch_cnt: np.ndarray,
+    index_pair_batch: np.ndarray,
+    index_pair: np.ndarray,
+    query_features: np.ndarray,
+    key_features: np.ndarray,
+) -> np.ndarray:
+    args = map(
+        torch.from_numpy,
+        (query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, query_features, key_features),
+    )
+    return torch_ops.attention_weight_computation(*args).numpy()
+
+
+@onnx_op(op_type="AttentionValueComputation", inputs=_ATTENTION_INPUTS, outputs=[PyCustomOpDef.dt_float])
+def attention_value_computation(
+    query_batch_cnt: np.ndarray,
+    key_batch_cnt: np.ndarray,
+    index_pair_batch: np.ndarray,
+    index_pair: np.ndarray,
+    attn_weight: np.ndarray,
+    value_features: np.ndarray,
+) -> np.ndarray:
+    args = map(
+        torch.from_numpy,
+        (query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, attn_weight, value_features),
+    )
+    return torch_ops.attention_value_computation(*args).numpy()
@@ -31,6 +31,8 @@ class MTRDecoder(BaseDecoder):
         map_d_model: int | None = None,
         nms_threshold: float = 2.5,
         *,
+        map_collection_chunk_size: int = 16,
+        use_traj_nms: bool = False,
         use_place_holder: bool = False,
         decode_loss: dict | None = None,
     ) -> None:
@@ -47,6 +49,8 @@ class MTRDecoder(BaseDecoder):
         self.d_model = d_model
         self.map_d_model = d_model if map_d_model is None else map_d_model
         self.nms_threshold = nms_threshold
+        self.map_collection_chunk_size = map_collection_chunk_size
+        self.use_traj_nms = use_traj_nms
         self.use_place_holder = use_place_holder
 
         # cross-attn layers
@@ -373,29 +377,36 @@ class MTRDecoder(BaseDecoder):
     ) -> tuple[Tensor, Tensor]:
         """Apply dynamic map collection.
 
+        The distance between each polyline and the predicted waypoints is reduced over
+        chunks of `self.map_collection_chunk_size` waypoints with a running minimum, so the dense
+        (B, Q, K, T) distance tensor is never materialized.
+
         Args:
         ----
-            map_pos (Tensor): _description_
-            map_mask (Tensor): _description_
-            pred_waypoints (Tensor): _description_
-            base_region_offset (tuple[float, float]): _description_
-            num_query (int): _description_
-            num_waypoint_polylines (int, optional): _description_. Defaults to 128.
-            num_base_polylines (int, optional): _description_. Defaults to 256.
-            base_map_idxs (Tensor | None, optional): _description_. Defaults to None.
+            map_pos (Tensor): Polyline centers, in shape (B, K, 3).
+            map_mask (Tensor): Polyline valid mask, in shape (B, K).
+            pred_waypoints (Tensor): Predicted waypoints, in shape (B, Q, T, 2).
+            base_region_offset (tuple[float, float]): Offset of the base region center.
+            num_query (int): Number of queries.
+            num_waypoint_polylines (int, optional): Number of polylines collected around waypoints.
+                Defaults to 128.
+            num_base_polylines (int, optional): Number of polylines collected in the base region.
+                Defaults to 256.
+            base_map_idxs (Tensor | None, optional): Base region indices computed in the previous layer,
+                in shape (B, Q, Nb). Defaults to None.
 
         Returns:
         -------
-            tuple[Tensor, Tensor]: _description_
+            tuple[Tensor, Tensor]: Collected indices in shape (B, Q, Nb + Nw), where duplicates are
+                filled with -1, and base region indices in shape (B, Q, Nb).
 
         """
-        map_pos = map_pos.clone()
-        map_pos.masked_fill_(~map_mask[..., None], torch.nan)
-        num_polylines = map_pos.shape[1]
+        map_pos = map_pos[..., 0:2].masked_fill(~map_mask[..., None], torch.nan)
+        batch_size, num_polylines, _ = map_pos.shape
 
         if base_map_idxs is None:
             base_points = torch.tensor(base_region_offset).type_as(map_pos)
-            base_dist: Tensor = (map_pos[:, :, 0:2] - base_points[None, None, :]).norm(dim=-1)
+            base_dist: Tensor = (map_pos - base_points[None, None, :]).norm(dim=-1)
             base_topk_dist, base_map_idxs = base_dist.topk(
                 k=min(num_polylines, num_base_polylines),
                 dim=-1,
@@ -404,7 +415,6 @@ class MTRDecoder(BaseDecoder):
             # NOTE: not to use tensor[mask] = other
             # base_map_idxs[base_topk_dist > 10000000] = -1
             base_map_idxs.masked_fill_(base_topk_dist.isnan(), -1)
-            base_map_idxs = base_map_idxs[:, None, :].repeat(1, num_query, 1)
             if base_map_idxs.shape[-1] < num_base_polylines:
                 base_map_idxs = F.pad(
                     base_map_idxs,
@@ -412,9 +422,18 @@ class MTRDecoder(BaseDecoder):
                     mode="constant",
                     value=-1,
                 )
-
-        dynamic_dist: Tensor = (pred_waypoints[:, :, None, :, 0:2] - map_pos[:, None, :, None, 0:2]).norm(dim=-1)
-        dynamic_dist = dynamic_dist.min(dim=-1)[0]
+            base_map_idxs = base_map_idxs[:, None, :].expand(-1, num_query, -1)
+
+        # squared distances keep the order of topk, and NaN of invalid polylines is propagated by minimum
+        map_x = map_pos[:, None, :, None, 0]
+        map_y = map_pos[:, None, :, None, 1]
+        dynamic_dist = None
+        num_waypoints = pred_waypoints.shape[2]
+        for start in range(0, num_waypoints, self.map_collection_chunk_size):
+            waypoints_chunk = pred_waypoints[:, :, None, start : start + self.map_collection_chunk_size]
+            diff_y = waypoints_chunk[..., 1] - map_y
+            chunk_dist = (waypoints_chunk[..., 0] - map_x).square_().addcmul_(diff_y, diff_y).amin(dim=-1)
+            dynamic_dist = chunk_dist if dynamic_dist is None else torch.minimum(dynamic_dist, chunk_dist)
 
         dynamic_topk_dist, dynamic_map_idxs = dynamic_dist.topk(
             k=min(num_polylines, num_waypoint_polylines),
@@ -422,7 +441,7 @@ class MTRDecoder(BaseDecoder):
             largest=False,
         )
         dynamic_map_idxs.masked_fill_(dynamic_topk_dist.isnan(), -1)
-        if dynamic_map_idxs.shape[-1] > num_waypoint_polylines:
+        if dynamic_map_idxs.shape[-1] < num_waypoint_polylines:
             dynamic_map_idxs = F.pad(
                 dynamic_map_idxs,
                 pad=(0, num_waypoint_polylines - dynamic_map_idxs.shape[-1]),
@@ -430,16 +449,18 @@ class MTRDecoder(BaseDecoder):
                 value=-1,
             )
 
-        collected_idxs = torch.cat([base_map_idxs, dynamic_map_idxs], dim=-1)
+        # remove duplicate indices without sorting: both topk results are unique by themselves,
+        # so only dynamic indices which are already contained in the base region are dropped.
+        # The base region is shared by all queries, then its membership is looked up per batch.
+        base_member = torch.zeros(batch_size, num_polylines + 1, dtype=torch.bool, device=map_pos.device)
+        base_member.scatter_(1, base_map_idxs[:, 0] + 1, torch.ones_like(base_map_idxs[:, 0], dtype=torch.bool))
+        base_member = base_member[:, None, :].expand(-1, dynamic_map_idxs.shape[1], -1)
+        is_duplicate = base_member.gather(-1, dynamic_map_idxs + 1) & (dynamic_map_idxs >= 0)
+        dynamic_map_idxs = dynamic_map_idxs.masked_fill(is_duplicate, -1)
 
-        # remove duplicate indices
-        sorted_idxs: Tensor = collected_idxs.sort(dim=-1)[0]
-        duplicate_mask_slice = sorted_idxs[..., 1:] - sorted_idxs[..., :-1] != 0
-        duplicate_mask = torch.ones_like(collected_idxs, dtype=torch.bool)
-        duplicate_mask[..., 1:] = duplicate_mask_slice
-        sorted_idxs = torch.masked_fill(sorted_idxs, ~duplicate_mask, -1)
+        collected_idxs = torch.cat([base_map_idxs, dynamic_map_idxs], dim=-1)
 
-        return sorted_idxs.int(), base_map_idxs
+        return collected_idxs.int(), base_map_idxs
 
     def apply_transformer_decoder(
         self,
@@ -637,6 +658,7 @@ class MTRDecoder(BaseDecoder):
                 pred_scores=pred_scores,
                 dist_thresh=self.nms_threshold,
                 num_ret_modes=self.num_motion_modes,
+                use_traj_dist=self.use_traj_nms,
             )
         else:
             pred_trajs_final = pred_trajs
@@ -11,6 +11,12 @@ from ..ops import knn_batch_mlogk
 
 __all__ = ("MTREncoder",)
 
+# NOTE: feature layouts of agent and map inputs, see `get_embedded_inputs` of the node and `TargetCentricPolyline`
+AGENT_XYZ_IDXS = slice(0, 3)
+AGENT_TARGET_FLAG_IDX = 9
+MAP_XYZ_IDXS = slice(0, 3)
+MAP_PREV_XY_IDXS = slice(7, 9)
+
 
 @ENCODERS.register()
 class MTREncoder(nn.Module):
@@ -21,7 +27,22 @@ class MTREncoder(nn.Module):
         attention_layer: dict[str, Any],
         use_local_attn: bool = True,
         num_attn_neighbors: int = 16,
+        shared_scene_encoding: bool = False,
     ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            agent_polyline_encoder (dict[str, Any]): Config of the agent polyline encoder.
+            map_polyline_encoder (dict[str, Any]): Config of the map polyline encoder.
+            attention_layer (dict[str, Any]): Config of attention layers.
+            use_local_attn (bool, optional): Whether to use local attention. Defaults to True.
+            num_attn_neighbors (int, optional): Number of neighbors of local attention. Defaults to 16.
+            shared_scene_encoding (bool, optional): Whether to encode each polyline relative to its own anchor
+                without the target flag, so that polyline features can be shared by targets. The model must be
+                trained with the same value. Defaults to False.
+
+        """
         super().__init__()
         self.agent_polyline_encoder = LAYERS.build(agent_polyline_encoder)
         self.map_polyline_encoder = LAYERS.build(map_polyline_encoder)
@@ -32,6 +53,34 @@ class MTREncoder(nn.Module):
 
         self.use_local_attn = use_local_attn
         self.num_attn_neighbors = num_attn_neighbors
+        self.shared_scene_encoding = shared_scene_encoding
+
+    @staticmethod
+    def to_local_frame(obj_trajs: Tensor, map_polylines: Tensor) -> tuple[Tensor, Tensor]:
+        """Translate points of each polyline relative to its anchor, and clear the target flag of agents.
+
+        Agents are anchored at the last timestamp, and map polylines are anchored at the first point.
+        Resulting features do not depend on the translation of the target frame, and on the target itself.
+
+        Args:
+        ----
+            obj_trajs (Tensor): in shape (B, N, T, Da).
+            map_polylines (Tensor): in shape (B, K, P, Dp).
+
+        Returns:
+        -------
+            tuple[Tensor, Tensor]: Translated agents and map polylines in the same shape.
+
+        """
+        obj_trajs = obj_trajs.clone()
+        obj_trajs[..., AGENT_XYZ_IDXS] -= obj_trajs[:, :, -1:, AGENT_XYZ_IDXS].clone()
+        obj_trajs[..., AGENT_TARGET_FLAG_IDX] = 0
+
+        map_polylines = map_polylines.clone()
+        map_anchor = map_polylines[:, :, :1, MAP_XYZ_IDXS].clone()
+        map_polylines[..., MAP_XYZ_IDXS] -= map_anchor
+        map_polylines[..., MAP_PREV_XY_IDXS] -= map_anchor[..., :2]
+        return obj_trajs, map_polylines
 
     def apply_global_attn(self, x: Tensor, x_mask: Tensor, x_pos: Tensor) -> Tensor:
         """Apply global attention.
@@ -130,14 +179,21 @@ class MTREncoder(nn.Module):
     ) -> tuple[Tensor, Tensor, Tensor, Tensor, Tensor, Tensor]:
         """Forward operation.
 
+        Scene inputs, `obj_trajs`, `map_polylines` and their masks, can be given in the shape of (1, ...) for B
+        targets. Then polyline features are computed once in the frame of scene inputs and shared by targets,
+        while positions, `map_polylines_center` and `obj_trajs_last_pos`, are given in each target frame.
+        This is exact for translation with `shared_scene_encoding=True`, but heading features stay in the shared
+        frame, so it is valid only when targets are not much rotated from the shared frame.
+
         Args:
         ----
-            obj_trajs (Tensor)
-            obj_trajs_mask (Tensor)
-            map_polylines (Tensor)
-            map_polylines_mask (Tensor)
-            obj_trajs_last_pos (Tensor)
-            track_index_to_predict (Tensor)
+            obj_trajs (Tensor): in shape (B, N, T, Da) or (1, N, T, Da).
+            obj_trajs_mask (Tensor): in shape (B, N, T) or (1, N, T).
+            map_polylines (Tensor): in shape (B, K, P, Dp) or (1, K, P, Dp).
+            map_polylines_mask (Tensor): in shape (B, K, P) or (1, K, P).
+            map_polylines_center (Tensor): in shape (B, K, 3).
+            obj_trajs_last_pos (Tensor): in shape (B, N, 3).
+            track_index_to_predict (Tensor): in shape (B,).
 
         Returns:
         -------
@@ -151,7 +207,10 @@ class MTREncoder(nn.Module):
                 - center_objects_feature (Tensor)
 
         """
-        num_center_objects, num_objects, _, _ = obj_trajs.shape
+        num_center_objects, num_objects, _ = obj_trajs_last_pos.shape
+
+        if self.shared_scene_encoding:
+            obj_trajs, map_polylines = self.to_local_frame(obj_trajs, map_polylines)
 
         # apply polyline encoder
         obj_trajs_in = torch.cat((obj_trajs, obj_trajs_mask[..., None].type_as(obj_trajs)), dim=-1)
@@ -162,6 +221,14 @@ class MTREncoder(nn.Module):
         obj_valid_mask = obj_trajs_mask.sum(dim=-1) > 0  # (num_center_objects, num_objects)
         map_valid_mask = map_polylines_mask.sum(dim=-1) > 0  # (num_center_objects, num_polylines)
 
+        # broadcast shared scene features to targets
+        if obj_polylines_feature.shape[0] != num_center_objects:
+            obj_polylines_feature = obj_polylines_feature.expand(num_center_objects, -1, -1)
+            obj_valid_mask = obj_valid_mask.repeat(num_center_objects, 1)
+        if map_polylines_feature.shape[0] != num_center_objects:
+            map_polylines_feature = map_polylines_feature.expand(num_center_objects, -1, -1)
+            map_valid_mask = map_valid_mask.repeat(num_center_objects, 1)
+
         global_token_feature = torch.cat((obj_polylines_feature, map_polylines_feature), dim=1)
         global_token_mask = torch.cat((obj_valid_mask, map_valid_mask), dim=1)
         global_token_pos = torch.cat((obj_trajs_last_pos, map_polylines_center), dim=1)
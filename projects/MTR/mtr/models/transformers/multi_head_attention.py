@@ -14,6 +14,7 @@ import warnings
 import torch
 from torch import nn
 from torch.nn import functional as F
+from torch.nn.modules.linear import NonDynamicallyQuantizableLinear
 from torch.nn.init import constant_, xavier_normal_, xavier_uniform_
 from torch.nn.parameter import Parameter
 
@@ -103,7 +104,8 @@ class MultiheadAttention(nn.Module):
             self.in_proj_bias = Parameter(torch.empty(3 * embed_dim, **factory_kwargs))
         else:
             self.register_parameter("in_proj_bias", None)
-        self.out_proj = nn.Linear(self.vdim, self.vdim, bias=bias, **factory_kwargs)
+        # NOTE: weights of out_proj are accessed in multi_head_attention_forward, which must not be quantized
+        self.out_proj = NonDynamicallyQuantizableLinear(self.vdim, self.vdim, bias=bias, **factory_kwargs)
 
         if add_bias_kv:
             self.bias_k = Parameter(torch.empty((1, 1, embed_dim), **factory_kwargs))
@@ -73,6 +73,8 @@ class MultiheadAttentionLocal(nn.Module):
 
         self.in_proj_bias = Parameter(torch.empty(3 * embed_dim))
         self.out_proj = Linear(self.vdim, self.vdim, bias=True)
+        # q/k/v projections as separate modules, which are created by `split_in_proj()`
+        self.in_proj: nn.ModuleList | None = None
 
         self.without_weight = without_weight
         if self.without_weight:
@@ -88,7 +90,24 @@ class MultiheadAttentionLocal(nn.Module):
             constant_(self.in_proj_bias, 0.0)
             constant_(self.out_proj.bias, 0.0)
 
+    def split_in_proj(self) -> None:
+        """Split the packed input projection into q/k/v `Linear` modules.
+
+        This is used for inference to apply module-wise transformations such as quantization.
+        """
+        if self.without_weight or self.in_proj is not None:
+            return
+        in_proj = []
+        for weight, bias in zip(self.in_proj_weight.chunk(3), self.in_proj_bias.chunk(3)):
+            layer = Linear(self.embed_dim, self.embed_dim, bias=True).to(weight)
+            layer.weight.data.copy_(weight.detach())
+            layer.bias.data.copy_(bias.detach())
+            in_proj.append(layer)
+        self.in_proj = nn.ModuleList(in_proj)
+
     def _proj_qkv(self, t: Tensor, start: int, end: int) -> Tensor:
+        if self.in_proj is not None:
+            return self.in_proj[start // self.embed_dim](t)
         _w = self.in_proj_weight[start:end, :]
         _b = self.in_proj_bias[start:end]
         t = F.linear(t, _w, _b)
@@ -139,38 +158,40 @@ class MultiheadAttentionLocal(nn.Module):
             q = query * scaling
             k, v = key, value
 
-        q = q.contiguous().view(total_query_len, self.num_heads, self.head_dim)
-        k = k.contiguous().view(-1, self.num_heads, self.head_dim)
-        v = v.contiguous().view(-1, self.num_heads, v_head_dim)
-
-        # compute attention weight.
-        attn_output_weights = attention_weight_computation(
-            query_batch_cnt,
-            key_batch_cnt,
-            index_pair_batch,
-            index_pair,
-            q,
-            k,
-        )
-
-        attn_mask = index_pair == -1
-        # NOTE: float("-inf") make nan TRT output
-        attn_output_weights = attn_output_weights.masked_fill_(attn_mask[..., None], -1000.0)
-        attn_output_weights = F.softmax(attn_output_weights, dim=1)
-        attn_output_weights = F.dropout(attn_output_weights, p=self.dropout, training=self.training)
-
-        attn_output = attention_value_computation(
-            query_batch_cnt,
-            key_batch_cnt,
-            index_pair_batch,
-            index_pair,
-            attn_output_weights,
-            v,
-        )
+        # NOTE: custom ops only support fp32, and the softmax with -1000.0 mask fill must not run in half precision
+        q = q.float().contiguous().view(total_query_len, self.num_heads, self.head_dim)
+        k = k.float().contiguous().view(-1, self.num_heads, self.head_dim)
+        v = v.float().contiguous().view(-1, self.num_heads, v_head_dim)
+
+        with torch.autocast(device_type=q.device.type, enabled=False):
+            # compute attention weight.
+            attn_output_weights = attention_weight_computation(
+                query_batch_cnt,
+                key_batch_cnt,
+                index_pair_batch,
+                index_pair,
+                q,
+                k,
+            )
+
+            attn_mask = index_pair == -1
+            # NOTE: float("-inf") make nan TRT output
+            attn_output_weights = attn_output_weights.masked_fill_(attn_mask[..., None], -1000.0)
+            attn_output_weights = F.softmax(attn_output_weights, dim=1)
+            attn_output_weights = F.dropout(attn_output_weights, p=self.dropout, training=self.training)
+
+            attn_output = attention_value_computation(
+                query_batch_cnt,
+                key_batch_cnt,
+                index_pair_batch,
+                index_pair,
+                attn_output_weights,
+                v,
+            )
 
         attn_output = attn_output.view(total_query_len, vdim)
 
         if self.out_proj is not None:
-            attn_output = F.linear(attn_output, self.out_proj.weight, self.out_proj.bias)
+            attn_output = self.out_proj(attn_output)
 
         return attn_output, attn_output_weights.sum(dim=-1) / self.num_heads
@@ -2,11 +2,78 @@ import os.path as osp
 
 import torch
 
-torch.ops.load_library(osp.join(osp.dirname(__file__), "cuda_ops.so"))
+from awml_pred.typing import Tensor
+
+from . import torch_ops
+
+__all__ = (
+    "HAS_CUDA_OPS",
+    "attention_weight_computation",
+    "attention_value_computation",
+    "knn_batch",
+    "knn_batch_mlogk",
+)
+
+try:
+    torch.ops.load_library(osp.join(osp.dirname(__file__), "cuda_ops.so"))
+    HAS_CUDA_OPS = True
+except OSError:
+    HAS_CUDA_OPS = False
+
+
+def _use_cuda_ops(tensor: Tensor) -> bool:
+    return HAS_CUDA_OPS and tensor.is_cuda
+
 
 # attention
-attention_weight_computation = torch.ops.awml_pred.attention_weight_computation
-attention_value_computation = torch.ops.awml_pred.attention_value_computation
+def attention_weight_computation(
+    query_batch_cnt: Tensor,
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    query_features: Tensor,
+    key_features: Tensor,
+) -> Tensor:
+    if _use_cuda_ops(query_features):
+        func = torch.ops.awml_pred.attention_weight_computation
+    else:
+        func = torch_ops.attention_weight_computation
+    return func(query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, query_features, key_features)
+
+
+def attention_value_computation(
+    query_batch_cnt: Tensor,
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    attn_weight: Tensor,
+    value_features: Tensor,
+) -> Tensor:
+    if _use_cuda_ops(value_features):
+        func = torch.ops.awml_pred.attention_value_computation
+    else:
+        func = torch_ops.attention_value_computation
+    return func(query_batch_cnt, key_batch_cnt, index_pair_batch, index_pair, attn_weight, value_features)
+
+
 # knn
-knn_batch = torch.ops.awml_pred.knn_batch
-knn_batch_mlogk = torch.ops.awml_pred.knn_batch_mlogk
+def knn_batch(
+    xyz: Tensor,
+    query_xyz: Tensor,
+    batch_idxs: Tensor,
+    query_batch_offsets: Tensor,
+    top_k: int,
+) -> Tensor:
+    func = torch.ops.awml_pred.knn_batch if _use_cuda_ops(xyz) else torch_ops.knn_batch
+    return func(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
+
+
+def knn_batch_mlogk(
+    xyz: Tensor,
+    query_xyz: Tensor,
+    batch_idxs: Tensor,
+    query_batch_offsets: Tensor,
+    top_k: int,
+) -> Tensor:
+    func = torch.ops.awml_pred.knn_batch_mlogk if _use_cuda_ops(xyz) else torch_ops.knn_batch_mlogk
+    return func(xyz, query_xyz, batch_idxs, query_batch_offsets, top_k)
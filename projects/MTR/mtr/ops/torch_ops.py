@@ -0,0 +1,200 @@
+"""Pure PyTorch implementations of the custom CUDA operations.
+
+These are used for tensors which are not on CUDA, e.g. CPU inference, or when `cuda_ops.so` is not built.
+"""
+
+from typing import Iterator
+
+import torch
+
+from awml_pred.typing import Tensor
+
+__all__ = ("knn_batch", "knn_batch_mlogk", "attention_weight_computation", "attention_value_computation")
+
+
+def knn_batch(
+    xyz: Tensor,
+    query_xyz: Tensor,
+    batch_idxs: Tensor,
+    query_batch_offsets: Tensor,
+    top_k: int,
+    chunk_size: int = 256,
+) -> Tensor:
+    """Return the indices of K nearest neighbors in the same batch.
+
+    Args:
+    ----
+        xyz (Tensor): Points, in shape (N, 3).
+        query_xyz (Tensor): Candidate points, in shape (M, 3).
+        batch_idxs (Tensor): Batch indices of `xyz`, in shape (N,). Points with negative index are ignored.
+        query_batch_offsets (Tensor): Batch offsets of `query_xyz`, in shape (B + 1,).
+        top_k (int): The number of top-K.
+        chunk_size (int, optional): Number of points processed at once. Defaults to 256.
+
+    Returns:
+    -------
+        Tensor: Indices relative to the start of each batch, in shape (N, top_k).
+            Missing neighbors are filled with -1.
+
+    """
+    num_query = query_xyz.shape[0]
+    batch_idxs = batch_idxs.long()
+    query_batch_offsets = query_batch_offsets.long()
+    query_batch_idxs = torch.bucketize(
+        torch.arange(num_query, device=xyz.device),
+        query_batch_offsets[1:],
+        right=True,
+    )
+    num_k = min(top_k, num_query)
+
+    ret_idxs = []
+    for start in range(0, xyz.shape[0], chunk_size):
+        xyz_chunk = xyz[start : start + chunk_size]
+        batch_chunk = batch_idxs[start : start + chunk_size]
+        dist = (xyz_chunk[:, None, :] - query_xyz[None, :, :]).square().sum(dim=-1)
+        invalid = (batch_chunk[:, None] != query_batch_idxs[None, :]) | (batch_chunk[:, None] < 0)
+        dist = dist.masked_fill(invalid, torch.inf)
+        topk_dist, topk_idxs = dist.topk(k=num_k, dim=-1, largest=False)
+        topk_idxs = topk_idxs - query_batch_offsets[batch_chunk.clamp(min=0)][:, None]
+        ret_idxs.append(topk_idxs.masked_fill(topk_dist.isinf(), -1))
+
+    ret_idxs = torch.cat(ret_idxs, dim=0) if ret_idxs else xyz.new_zeros((0, num_k), dtype=torch.long)
+    if num_k < top_k:
+        ret_idxs = torch.nn.functional.pad(ret_idxs, (0, top_k - num_k), value=-1)
+    return ret_idxs.int()
+
+
+knn_batch_mlogk = knn_batch
+
+
+def _get_key_indices(key_batch_cnt: Tensor, index_pair_batch: Tensor, index_pair: Tensor) -> tuple[Tensor, Tensor]:
+    """Return absolute key indices and their valid mask.
+
+    Args:
+    ----
+        key_batch_cnt (Tensor): Number of keys in each batch, in shape (B,).
+        index_pair_batch (Tensor): Batch index of each query, in shape (N,).
+        index_pair (Tensor): Key indices relative to the start of each batch, in shape (N, L).
+
+    Returns:
+    -------
+        tuple[Tensor, Tensor]: Absolute key indices clamped to be valid, and valid mask, in shape (N, L).
+
+    """
+    key_batch_cnt = key_batch_cnt.long()
+    index_pair_batch = index_pair_batch.long()
+    key_start = key_batch_cnt.cumsum(dim=0) - key_batch_cnt
+    key_idxs = key_start[index_pair_batch.clamp(min=0)][:, None] + index_pair.long()
+    valid = (index_pair != -1) & (index_pair_batch[:, None] >= 0)
+    return key_idxs.masked_fill(~valid, 0), valid
+
+
+def _iter_batches(
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+) -> Iterator[tuple[Tensor, int, int]]:
+    """Yield queries and the range of keys for each non-empty batch.
+
+    Args:
+    ----
+        key_batch_cnt (Tensor): Number of keys in each batch, in shape (B,).
+        index_pair_batch (Tensor): Batch index of each query, in shape (N,).
+
+    Yields:
+    ------
+        tuple[Tensor, int, int]: Indices of queries, start and end of keys.
+
+    """
+    key_start = 0
+    for batch_idx, num_key in enumerate(key_batch_cnt.tolist()):
+        query_idxs = torch.nonzero(index_pair_batch == batch_idx)[:, 0]
+        if num_key > 0 and len(query_idxs) > 0:
+            yield query_idxs, key_start, key_start + num_key
+        key_start += num_key
+
+
+def attention_weight_computation(
+    query_batch_cnt: Tensor,  # noqa: ARG001
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    query_features: Tensor,
+    key_features: Tensor,
+) -> Tensor:
+    """Compute attention weights for the indexed query-key pairs.
+
+    Scores against all keys in the same batch are computed by matrix multiplication and then gathered, which is
+    faster than gathering key features for each pair unless tracing, where the batch sizes must not be constant.
+
+    Args:
+    ----
+        query_batch_cnt (Tensor): Number of queries in each batch, in shape (B,).
+        key_batch_cnt (Tensor): Number of keys in each batch, in shape (B,).
+        index_pair_batch (Tensor): Batch index of each query, in shape (N,).
+        index_pair (Tensor): Key indices of each query, in shape (N, L).
+        query_features (Tensor): Query features, in shape (N, H, D).
+        key_features (Tensor): Key features, in shape (M, H, D).
+
+    Returns:
+    -------
+        Tensor: Attention weights, in shape (N, L, H). Weights of invalid pairs are 0.
+
+    """
+    key_idxs, valid = _get_key_indices(key_batch_cnt, index_pair_batch, index_pair)
+    if torch.jit.is_tracing():
+        weight = torch.einsum("nhd,nlhd->nlh", query_features, key_features[key_idxs])
+        return weight * valid[..., None]
+
+    num_head = query_features.shape[1]
+    weight = query_features.new_zeros(*index_pair.shape, num_head)
+    for query_idxs, key_start, key_end in _iter_batches(key_batch_cnt, index_pair_batch):
+        # (H, Nb, D) x (H, D, Mb) -> (H, Nb, Mb)
+        score = torch.bmm(
+            query_features[query_idxs].transpose(0, 1),
+            key_features[key_start:key_end].permute(1, 2, 0),
+        )
+        idxs = (key_idxs[query_idxs] - key_start).clamp(0, key_end - key_start - 1)
+        weight[query_idxs] = score.gather(2, idxs[None].expand(num_head, -1, -1)).permute(1, 2, 0)
+    return weight * valid[..., None]
+
+
+def attention_value_computation(
+    query_batch_cnt: Tensor,  # noqa: ARG001
+    key_batch_cnt: Tensor,
+    index_pair_batch: Tensor,
+    index_pair: Tensor,
+    attn_weight: Tensor,
+    value_features: Tensor,
+) -> Tensor:
+    """Compute the weighted sum of values for the indexed query-key pairs.
+
+    Weights are scattered into dense matrices of each batch and multiplied with values, unless tracing.
+
+    Args:
+    ----
+        query_batch_cnt (Tensor): Number of queries in each batch, in shape (B,).
+        key_batch_cnt (Tensor): Number of keys in each batch, in shape (B,).
+        index_pair_batch (Tensor): Batch index of each query, in shape (N,).
+        index_pair (Tensor): Key indices of each query, in shape (N, L).
+        attn_weight (Tensor): Attention weights, in shape (N, L, H).
+        value_features (Tensor): Value features, in shape (M, H, D).
+
+    Returns:
+    -------
+        Tensor: Attention output, in shape (N, H, D).
+
+    """
+    key_idxs, valid = _get_key_indices(key_batch_cnt, index_pair_batch, index_pair)
+    attn_weight = attn_weight * valid[..., None]
+    if torch.jit.is_tracing():
+        return torch.einsum("nlh,nlhd->nhd", attn_weight, value_features[key_idxs])
+
+    num_query, _, num_head = attn_weight.shape
+    output = value_features.new_zeros(num_query, num_head, value_features.shape[-1])
+    for query_idxs, key_start, key_end in _iter_batches(key_batch_cnt, index_pair_batch):
+        idxs = (key_idxs[query_idxs] - key_start).clamp(0, key_end - key_start - 1)
+        # (H, Nb, Mb) x (H, Mb, D) -> (H, Nb, D)
+        dense_weight = attn_weight.new_zeros(num_head, len(query_idxs), key_end - key_start)
+        dense_weight.scatter_add_(2, idxs[None].expand(num_head, -1, -1), attn_weight[query_idxs].permute(2, 0, 1))
+        output[query_idxs] = torch.bmm(dense_weight, value_features[key_start:key_end].transpose(0, 1)).transpose(0, 1)
+    return output
@@ -2,9 +2,11 @@ import hashlib
 import torch
 import numpy as np
 from collections import deque
+from contextlib import nullcontext
 from copy import deepcopy
 import numpy as np
 import math
+import threading
 import time
 
 from scipy.interpolate import interp1d
@@ -15,6 +17,7 @@ from rclpy.duration import Duration
 
 import rclpy.parameter
 from rclpy.time import Time
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
 from rclpy.executors import MultiThreadedExecutor
 from rclpy.node import Node
 from rclpy.qos import QoSHistoryPolicy
@@ -33,6 +36,7 @@ from std_msgs.msg import String
 from numpy.typing import NDArray
 from rcl_interfaces.msg import ParameterDescriptor
 from utils.polyline import TargetCentricPolyline
+from utils.tiled_map import TiledMap
 
 from autoware_perception_msgs.msg import PredictedObjects
 from autoware_planning_msgs.msg import Trajectory, TrajectoryPoint
@@ -45,9 +49,11 @@ from geometry_msgs.msg import Point
 from autoware_perception_msgs.msg import TrackedObject
 from autoware_perception_msgs.msg import TrackedObjects
 
-from awml_pred.common import Config, load_checkpoint
+from awml_pred.common import BACKENDS, Config, load_checkpoint
+from awml_pred.datatype import MapType
+from awml_pred.deploy import InputRecorder, build_backend, create_dummy_inputs, fuse_for_inference, quantize_model
 from awml_pred.models import build_model
-from utils.lanelet_converter import convert_lanelet
+from utils.lanelet_converter import AdaptiveResampling, convert_lanelet
 from utils.constant import MAP_TYPE_COLORS
 from utils.load import LoadIntentionPoint
 from autoware_mtr.conversion.ego import from_odometry, from_trajectory_point
@@ -59,15 +65,27 @@ from autoware_mtr.datatype import AgentLabel
 from autoware_mtr.geometry import rotate_along_z
 from autoware_mtr.dataclass.history import AgentHistory
 from autoware_mtr.dataclass.agent import AgentState, AgentTrajectory
+from autoware_mtr.profiling import PROFILE_MODES, TickProfiler
+from autoware_mtr.reuse import PredictionReuse
 from autoware_mtr.conversion.predicted_object import to_predicted_objects
 from typing import List
 from visualization_msgs.msg import Marker
 from visualization_msgs.msg import MarkerArray
 
 
+# names of inference backends, which can be specified by `inference_backend` parameter
+BACKEND_NAMES = {
+    "eager": "EagerBackend",
+    "torch_compile": "TorchCompileBackend",
+    "torchscript": "TorchScriptBackend",
+    "onnxruntime": "OnnxRuntimeBackend",
+}
+
+
 class MTRNode(Node):
     def __init__(self) -> None:
         super().__init__("mtr_python_node")
+        startup_start = time.perf_counter()
 
         # subscribers
         qos_profile_2 = QoSProfile(
@@ -176,10 +194,197 @@ class MTRNode(Node):
         self.future_state_propagation_sec = (self.declare_parameter(
             "future_state_propagation_sec", descriptor=descriptor).get_parameter_value().double_value)
 
+        self._prediction_reuse_enabled = (self.declare_parameter(
+            "prediction_reuse", False, ParameterDescriptor(
+                description='Reuse the last prediction while the scene does not change',
+                type=Parameter.Type.BOOL.value
+            )).get_parameter_value().bool_value)
+
+        self._prediction_reuse = PredictionReuse(
+            position_threshold=self.declare_parameter(
+                "reuse_position_threshold", descriptor=descriptor).get_parameter_value().double_value,
+            yaw_threshold=self.declare_parameter(
+                "reuse_yaw_threshold", descriptor=descriptor).get_parameter_value().double_value,
+            velocity_threshold=self.declare_parameter(
+                "reuse_velocity_threshold", descriptor=descriptor).get_parameter_value().double_value,
+            agent_threshold=self.declare_parameter(
+                "reuse_agent_threshold", descriptor=descriptor).get_parameter_value().double_value,
+            max_age=self.declare_parameter(
+                "reuse_max_age", descriptor=descriptor).get_parameter_value().double_value,
+        )
+
+        inference_backend = (self.declare_parameter(
+            "inference_backend", "eager", ParameterDescriptor(
+                description='Inference backend (eager, torch_compile, torchscript or onnxruntime)',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        inference_device = (self.declare_parameter(
+            "inference_device", "cuda", ParameterDescriptor(
+                description='Device to run inference on',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        agent_bucket_sizes = (self.declare_parameter(
+            "agent_bucket_sizes", descriptor=descriptor).get_parameter_value().integer_array_value)
+
+        polyline_bucket_sizes = (self.declare_parameter(
+            "polyline_bucket_sizes", descriptor=descriptor).get_parameter_value().integer_array_value)
+
+        target_bucket_sizes = (self.declare_parameter(
+            "target_bucket_sizes", descriptor=descriptor).get_parameter_value().integer_array_value)
+
+        onnx_path = (self.declare_parameter(
+            "onnx_path", "", ParameterDescriptor(
+                description='Path to the exported ONNX model, which is used by the onnxruntime backend',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        quantization = (self.declare_parameter(
+            "quantization", "", ParameterDescriptor(
+                description='INT8 quantization mode on CPU (dynamic or static), empty to disable',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        quantization_calibration = (self.declare_parameter(
+            "quantization_calibration", "", ParameterDescriptor(
+                description='Calibration file for static quantization',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        inference_precision = (self.declare_parameter(
+            "inference_precision", "fp32", ParameterDescriptor(
+                description='Inference precision (fp32, bf16 or fp16), bf16 and fp16 run under autocast',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        self._inference_period = (self.declare_parameter(
+            "inference_period", 0.1, ParameterDescriptor(
+                description='Period of inference in [s], predictions are extrapolated at 10 Hz if it is longer',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        self._adaptive_inference_period = (self.declare_parameter(
+            "adaptive_inference_period", False, ParameterDescriptor(
+                description='Extend the period of inference to twice the inference latency',
+                type=Parameter.Type.BOOL.value
+            )).get_parameter_value().bool_value)
+
+        self._predict_tracked_objects = (self.declare_parameter(
+            "predict_tracked_objects", False, ParameterDescriptor(
+                description='Predict tracked objects of target labels in a batch in addition to the ego',
+                type=Parameter.Type.BOOL.value
+            )).get_parameter_value().bool_value)
+
+        self._max_num_targets = (self.declare_parameter(
+            "max_num_targets", 0, ParameterDescriptor(
+                description='Max number of tracked objects predicted from the closest to the ego, 0 for all, which are capped at the largest target bucket size for backends with static shapes',
+                type=Parameter.Type.INTEGER.value
+            )).get_parameter_value().integer_value)
+
+        record_directory = (self.declare_parameter(
+            "record_directory", "", ParameterDescriptor(
+                description='Directory to record model inputs and outputs of each inference, empty to disable',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        record_max_files = (self.declare_parameter(
+            "record_max_files", 100, ParameterDescriptor(
+                description='Max number of recorded files, the oldest file is removed first',
+                type=Parameter.Type.INTEGER.value
+            )).get_parameter_value().integer_value)
+
+        profile_directory = (self.declare_parameter(
+            "profile_directory", "/tmp/mtr_profile", ParameterDescriptor(
+                description='Directory to write profiles of the window started by profile_ticks',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        self._profile_modes = list(self.declare_parameter(
+            "profile_modes", list(PROFILE_MODES), ParameterDescriptor(
+                description='Profilers enabled in the window (torch, cprofile and tracemalloc)',
+                type=Parameter.Type.STRING_ARRAY.value
+            )).get_parameter_value().string_array_value)
+
+        profile_ticks = (self.declare_parameter(
+            "profile_ticks", 0, ParameterDescriptor(
+                description='Start a profiling window of inference ticks when set, 0 to stop the current window',
+                type=Parameter.Type.INTEGER.value
+            )).get_parameter_value().integer_value)
+
+        map_tile_directory = (self.declare_parameter(
+            "map_tile_directory", "", ParameterDescriptor(
+                description='Directory of map tiles built by utils.tiled_map, empty to load the whole lanelet map',
+                type=Parameter.Type.STRING.value
+            )).get_parameter_value().string_value)
+
+        map_tile_radius = (self.declare_parameter(
+            "map_tile_radius", 300.0, ParameterDescriptor(
+                description='Radius around targets where map tiles are loaded [m]',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        map_max_tiles = (self.declare_parameter(
+            "map_max_tiles", 64, ParameterDescriptor(
+                description='Max number of map tiles in memory, the least recently used tile is evicted first',
+                type=Parameter.Type.INTEGER.value
+            )).get_parameter_value().integer_value)
+
+        map_prefetch_distance = (self.declare_parameter(
+            "map_prefetch_distance", 100.0, ParameterDescriptor(
+                description='Distance ahead of the ego where map tiles are prefetched in background [m]',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        map_simplify_tolerance = (self.declare_parameter(
+            "map_simplify_tolerance", 0.0, ParameterDescriptor(
+                description='Douglas-Peucker tolerance of map polylines [m], 0 for the fixed interval',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        map_max_interval = (self.declare_parameter(
+            "map_max_interval", 5.0, ParameterDescriptor(
+                description='Max interval of points of simplified map polylines [m]',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        map_simplify_types = list(self.declare_parameter(
+            "map_simplify_types", ["ROADWAY", "DASHED", "SOLID"], ParameterDescriptor(
+                description='Names of MapType simplified, the other types are resampled with the fixed interval',
+                type=Parameter.Type.STRING_ARRAY.value
+            )).get_parameter_value().string_array_value)
+
+        polyline_reuse_radius = (self.declare_parameter(
+            "polyline_reuse_radius", 0.0, ParameterDescriptor(
+                description='Radius where the selection of polylines is reused while targets move [m], 0 to disable',
+                type=Parameter.Type.DOUBLE.value
+            )).get_parameter_value().double_value)
+
+        num_warmup_iters = (self.declare_parameter(
+            "num_warmup_iters", 1, ParameterDescriptor(
+                description='Number of warm-up iterations for each bucket shape on startup, or for a single shape without buckets',
+                type=Parameter.Type.INTEGER.value
+            )).get_parameter_value().integer_value)
+
         self._num_timestamps = num_timestamp
         self._history = AgentHistory(max_length=num_timestamp)
         self._future_propagated_history = AgentHistory(max_length=num_timestamp)
-        self._awml_static_map: AWMLStaticMap = convert_lanelet(lanelet_file)
+        self._awml_static_map: AWMLStaticMap | None = None
+        self._tiled_map: TiledMap | None = None
+        if map_tile_directory:
+            self._tiled_map = TiledMap(
+                map_tile_directory,
+                radius=map_tile_radius,
+                max_tiles=map_max_tiles,
+                prefetch_distance=map_prefetch_distance,
+            )
+            self.get_logger().info(f"Loading map tiles from {map_tile_directory}")
+        else:
+            resampling = None
+            if map_simplify_tolerance > 0.0:
+                config = AdaptiveResampling(tolerance=map_simplify_tolerance, max_interval=map_max_interval)
+                resampling = {MapType.from_str(name): config for name in map_simplify_types}
+            self._awml_static_map = convert_lanelet(lanelet_file, resampling=resampling)
         self.current_ego, self.current_ego_info = None, None
 
         intention_point_loader: LoadIntentionPoint = LoadIntentionPoint(
@@ -194,8 +399,10 @@ class MTRNode(Node):
         self._preprocess_polyline = TargetCentricPolyline(
             num_polylines=num_polylines,
             num_points=num_points,
-            break_distance=break_distance,
+            # NOTE: simplified polylines are separated by segments, because their intervals exceed the break distance
+            break_distance=break_distance if map_simplify_tolerance <= 0.0 else None,
             center_offset=center_offset,
+            reuse_radius=polyline_reuse_radius,
         )
         self._batch_polylines = None
         self._batch_polylines_mask = None
@@ -203,9 +410,13 @@ class MTRNode(Node):
         self._prev_trajectory: Trajectory | None = None
         self._last_ego: AgentState | None = None
         self._label_ids = [AgentLabel.from_str(label).value for label in labels]
+        # intention points are stacked in the order of labels
+        self._label_indices = {label_id: i for i, label_id in enumerate(self._label_ids)}
+        self._tracked_object_ids: List[str] = []
 
         cfg = Config.from_file(model_config_path)
-        is_distributed = True
+        self._device = torch.device(inference_device)
+        is_distributed = self._device.type == "cuda"
 
         # Ego info
         self._ego_uuid = hashlib.shake_256("EGO".encode()).hexdigest(8)
@@ -213,12 +424,82 @@ class MTRNode(Node):
 
         # Load Model
         self.model = build_model(cfg.model)
-        self.model, _ = load_checkpoint(self.model, checkpoint_path, is_distributed=is_distributed)
-        self.model.cuda()
-        self.model.eval()
+        self.model, _ = load_checkpoint(self.model, checkpoint_path, is_distributed=is_distributed, mmap=True)
+        self.model = fuse_for_inference(self.model)
+        backend_name = BACKEND_NAMES.get(inference_backend, inference_backend)
+        if backend_name == "OnnxRuntimeBackend" and inference_precision != "fp32":
+            raise ValueError(f"onnxruntime backend runs the exported model in fp32, but got {inference_precision}")
+        if quantization:
+            if self._device.type != "cpu":
+                raise ValueError(f"quantization is only supported on CPU, but got {inference_device}")
+            if inference_precision != "fp32":
+                raise ValueError(f"quantization can not be combined with {inference_precision}")
+            self.model = quantize_model(
+                self.model, mode=quantization, calibration=quantization_calibration or None)
+        backend_cfg = {"name": backend_name, "device": self._device}
+        # inputs are padded to bucket sizes only for backends which build a graph for each shape
+        if BACKENDS.get(backend_name).requires_static_shapes:
+            backend_cfg["shape_bucket"] = {
+                "agent_sizes": list(agent_bucket_sizes),
+                "polyline_sizes": list(polyline_bucket_sizes),
+                "target_sizes": list(target_bucket_sizes),
+            }
+        if onnx_path:
+            backend_cfg["onnx_path"] = onnx_path
+            backend_cfg["custom_imports"] = ["projects.MTR.deploys.ort_kernels"]
+        if inference_precision != "fp32":
+            backend_cfg["precision"] = inference_precision
+        self._backend = build_backend(backend_cfg, self.model)
+        self.model = self._backend.model
+
+        # warm-up for every bucket shape so that compilation does not happen on the first callback, or once without buckets
+        if num_warmup_iters > 0:
+            start = time.perf_counter()
+            dummy_inputs = create_dummy_inputs(
+                num_timestamp=num_timestamp,
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_polyline=num_polylines,
+                num_point=num_points,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                num_intention=self._intention_points["intention_points"].shape[1],
+                device=self._device,
+            )
+            self._backend.warmup(dummy_inputs, num_iters=num_warmup_iters)
+            self.get_logger().info(
+                f"Warm-up of {inference_backend} backend: {time.perf_counter() - start:.3f} [s]")
+
+            start = time.perf_counter()
+            self._preprocess_polyline.warmup()
+            self.get_logger().info(f"Warm-up of polyline preprocess: {time.perf_counter() - start:.3f} [s]")
 
         self.count = 0
 
+        # profiling windows are started at runtime by setting profile_ticks
+        self._profiler = TickProfiler(
+            profile_directory,
+            on_finish=lambda files: self.get_logger().info(f"Profiles are written: {', '.join(files)}"),
+            on_error=lambda message: self.get_logger().warning(message))
+        if profile_ticks > 0:
+            self._profiler.start(profile_ticks, self._profile_modes)
+
+        # inputs are recorded to be replayed by benchmarks.replay
+        self._recorder = InputRecorder(record_directory, max_files=record_max_files) if record_directory else None
+        if self._recorder is not None:
+            self.get_logger().info(f"Recording model inputs to {record_directory}")
+
+        # decoupled inference, which runs in its own callback group not to block the 10 Hz publishing
+        self._lock = threading.Lock()
+        self._inference_timer = None
+        if self._inference_period > 0.1 or self._adaptive_inference_period:
+            self._last_inference_time = 0.0
+            self._inference_latency = 0.0
+            self._inference_timer = self.create_timer(
+                0.1, self._inference_callback, callback_group=MutuallyExclusiveCallbackGroup())
+            if self._inference_period >= self._prediction_reuse.max_age:
+                self.get_logger().warn(
+                    f"inference_period {self._inference_period} [s] is not shorter than reuse_max_age "
+                    f"{self._prediction_reuse.max_age} [s], predictions expire before the next inference")
+
         self._tf_buffer = Buffer()
         self._tf_listener = TransformListener(self._tf_buffer, self)
         self._min_prediction_time = 7.0
@@ -237,6 +518,7 @@ class MTRNode(Node):
 
         # Add a callback for parameter changes
         self.add_on_set_parameters_callback(self._parameter_callback)
+        self.get_logger().info(f"Startup: {time.perf_counter() - startup_start:.3f} [s]")
 
     def _pub_debug_polylines(self, polylines: NDArray, polylines_mask: NDArray, header: Header, ego_state: AgentState | None = None, polyline_centers: NDArray | None = None):
         marker_array = MarkerArray()
@@ -316,30 +598,53 @@ class MTRNode(Node):
                 self.future_state_propagation_sec = param.value
             if param.name == "publish_debug_polyline_map":
                 self._publish_debug_polyline_map = param.value
+            if param.name == "predict_tracked_objects":
+                self._predict_tracked_objects = param.value
+            if param.name == "max_num_targets":
+                self._max_num_targets = param.value
+            if param.name == "prediction_reuse":
+                self._prediction_reuse_enabled = param.value
+                self._prediction_reuse.clear()
+            if param.name == "profile_directory":
+                self._profiler.directory = param.value
+            if param.name == "profile_modes":
+                unknown = set(param.value) - set(PROFILE_MODES)
+                if unknown:
+                    return SetParametersResult(
+                        successful=False, reason=f"unknown profile_modes {sorted(unknown)}, expected in {PROFILE_MODES}")
+                self._profile_modes = list(param.value)
+        # the window is started after other profile parameters are applied
+        for param in params:
+            if param.name == "profile_ticks":
+                self._profiler.start(param.value, self._profile_modes)
+                self.get_logger().info(f"Profiling window of {param.value} ticks is requested")
         # Return success
         return SetParametersResult(successful=True)
 
-    def _create_pre_processed_input(self, current_ego: AgentState, history: AgentHistory):
-        past_embed, polyline_info, ego_last_xyz, trajectory_mask = self._preprocess(
-            current_ego, history)
+    def _create_pre_processed_input(self, targets: List[AgentState], history: AgentHistory, ego_uuid: str):
+        with self._profiler.preprocess():
+            past_embed, polyline_info, ego_last_xyz, trajectory_mask = self._preprocess(
+                targets, history, ego_uuid)
         num_target, num_agent, num_time, num_feat = past_embed.shape
         pre_processed_input = {}
-        pre_processed_input["obj_trajs"] = torch.Tensor(past_embed).cuda()
-        pre_processed_input["obj_trajs_mask"] = trajectory_mask.cuda()
-        pre_processed_input["map_polylines"] = torch.Tensor(polyline_info["polylines"]).cuda()
+        pre_processed_input["obj_trajs"] = torch.Tensor(past_embed).to(self._device)
+        pre_processed_input["obj_trajs_mask"] = trajectory_mask.to(self._device)
+        pre_processed_input["map_polylines"] = torch.Tensor(polyline_info["polylines"]).to(self._device)
         pre_processed_input["map_polylines_mask"] = torch.Tensor(
-            polyline_info["polylines_mask"]).cuda()
+            polyline_info["polylines_mask"]).to(self._device)
         pre_processed_input["map_polylines_center"] = torch.Tensor(
-            polyline_info["polyline_centers"]).cuda()
+            polyline_info["polyline_centers"]).to(self._device)
         pre_processed_input["obj_trajs_last_pos"] = torch.Tensor(
-            ego_last_xyz.reshape((num_target, num_agent, 3))).cuda()
+            ego_last_xyz.reshape((num_target, num_agent, 3))).to(self._device)
+        label_indices = [self._label_indices.get(target.label_id, 0) for target in targets]
         pre_processed_input["intention_points"] = torch.Tensor(
-            self._intention_points["intention_points"]).cuda()
-        pre_processed_input["track_index_to_predict"] = torch.arange(
-            0, num_target, dtype=torch.int32).cuda()
+            self._intention_points["intention_points"][label_indices]).to(self._device)
+        # each target is the closest agent of its own, see `_preprocess`
+        pre_processed_input["track_index_to_predict"] = torch.zeros(
+            num_target, dtype=torch.int32).to(self._device)
         return pre_processed_input
 
-    def _do_predictions(self, true_ego_state: AgentState, ego_states: List[AgentState], infos: List[OriginalInfo], histories: List[AgentHistory], requires_concatenation: List[bool], uuids: List[RosUUID]):
+    def _do_predictions(self, true_ego_state: AgentState, ego_states: List[AgentState], infos: List[OriginalInfo], histories: List[AgentHistory], requires_concatenation: List[bool], uuids: List[RosUUID], run_inference: bool = True):
         header = Header()
         header.stamp = self.get_clock().now().to_msg()
         header.frame_id = "map"
@@ -353,13 +658,40 @@ class MTRNode(Node):
         out_trajectories.generator_info = [TrajectoryGeneratorInfo(
             generator_id=self._generator_uuid, generator_name=generator_name)]
 
+        now = self.get_clock().now().nanoseconds * 1e-9
+        # predictions are cached for the reuse and the extrapolation in the decoupled mode
+        cache_predictions = self._prediction_reuse_enabled or self._inference_timer is not None
         for ego_state, info, history, concatenate, uuid in zip(ego_states, infos, histories, requires_concatenation, uuids):
-            pre_processed_input = self._create_pre_processed_input(ego_state, history)
-            # inference
             current_target_trajectory, _ = history.target_as_trajectory(
                 uuid, latest=True)
-            with torch.no_grad():
-                pred_scores, pred_trajs = self.model(**pre_processed_input)
+
+            # reuse the last prediction if the scene has not changed since the last inference
+            reused = None
+            if not run_inference:
+                reused = self._prediction_reuse.extrapolate(uuid, now, current_target_trajectory)
+                if reused is None:
+                    # no prediction to be extrapolated until the next inference
+                    continue
+            elif cache_predictions:
+                agents, agent_ids = history.as_trajectory(latest=True)
+                if self._prediction_reuse_enabled:
+                    reused = self._prediction_reuse.lookup(uuid, now, current_target_trajectory, agents, agent_ids)
+
+            pre_processed_input = None
+            if reused is not None:
+                pred_scores, pred_trajs = reused
+            else:
+                # the target is the ego of its own hypothesis
+                pre_processed_input = self._create_pre_processed_input([ego_state], history, uuid)
+                # inference
+                start = time.perf_counter()
+                pred_scores, pred_trajs = self._backend(**pre_processed_input)
+                if self._recorder is not None:
+                    self._recorder.record(
+                        pre_processed_input, (pred_scores, pred_trajs), time.perf_counter() - start)
+                if cache_predictions:
+                    self._prediction_reuse.update(
+                        uuid, now, current_target_trajectory, agents, agent_ids, pred_scores, pred_trajs)
 
             # post-process
             pred_scores, pred_trajs = self._postprocess(
@@ -390,7 +722,7 @@ class MTRNode(Node):
             for predicted_object in pred_objs.objects:
                 out_objects.objects.append(predicted_object)
 
-            if (self._publish_debug_polyline_map):
+            if self._publish_debug_polyline_map and pre_processed_input is not None:
                 if np.linalg.norm(ego_state.xy - true_ego_state.xy) > 1e-3:
                     continue
                 header_map = Header()
@@ -398,8 +730,98 @@ class MTRNode(Node):
                 header_map.frame_id = "base_link"
                 self._pub_debug_polylines(pre_processed_input["map_polylines"].cpu().detach().numpy(),
                                           pre_processed_input["map_polylines_mask"].cpu().detach().numpy(), header_map, None, pre_processed_input["map_polylines_center"].cpu().detach().numpy())
+
+        if self._predict_tracked_objects:
+            tracked_objs = self._predict_tracked_object_batch(
+                header, true_ego_state, histories[0], now, run_inference, cache_predictions)
+            out_objects.objects.extend(tracked_objs.objects)
         return out_trajectories, out_objects
 
+    def _select_targets(self, ego_state: AgentState, history: AgentHistory) -> List[str]:
+        """Select tracked objects to be predicted, which are sorted from the closest to the ego.
+
+        Args:
+            ego_state (AgentState): Current ego state.
+            history (AgentHistory): Agent history including the ego.
+
+        Returns:
+            List[str]: Uuids of targets, at most `max_num_targets` if it is positive, and at most the largest
+                target bucket size for backends with static shapes so that the number of compiled shapes is bounded.
+        """
+        target_ids = [
+            uuid for uuid in self._tracked_object_ids
+            if uuid in history.histories and history.histories[uuid][-1].label_id in self._label_indices
+        ]
+        target_ids.sort(key=lambda uuid: np.linalg.norm(history.histories[uuid][-1].xy - ego_state.xy))
+        if self._max_num_targets > 0:
+            target_ids = target_ids[:self._max_num_targets]
+        max_num_target = self._backend.shape_bucket.max_num_target if self._backend.shape_bucket else None
+        if max_num_target is not None:
+            target_ids = target_ids[:max_num_target]
+        return target_ids
+
+    def _predict_tracked_object_batch(self, header: Header, ego_state: AgentState, history: AgentHistory, now: float, run_inference: bool, cache_predictions: bool) -> PredictedObjects:
+        """Predict tracked objects in a single batch, where each target is centered on itself.
+
+        Args:
+            header (Header): Header of output messages.
+            ego_state (AgentState): Current ego state.
+            history (AgentHistory): Agent history including the ego.
+            now (float): Current time in [s].
+            run_inference (bool): Whether to run the model. Otherwise, the latest predictions are extrapolated.
+            cache_predictions (bool): Whether to cache predictions for the extrapolation.
+
+        Returns:
+            PredictedObjects: Predicted objects of targets.
+        """
+        target_ids = self._select_targets(ego_state, history)
+        if len(target_ids) == 0:
+            return PredictedObjects(header=header)
+        current_targets = [history.target_as_trajectory(uuid, latest=True)[0] for uuid in target_ids]
+
+        if run_inference:
+            start = time.perf_counter()
+            pre_processed_input = self._create_pre_processed_input(
+                [history.histories[uuid][-1] for uuid in target_ids], history, self._ego_uuid)
+            inference_start = time.perf_counter()
+            pred_scores, pred_trajs = self._backend(**pre_processed_input)
+            if self._recorder is not None:
+                self._recorder.record(
+                    pre_processed_input, (pred_scores, pred_trajs), time.perf_counter() - inference_start)
+            elapsed = time.perf_counter() - start
+            self.get_logger().debug(
+                f"Predicted {len(target_ids)} agents: {elapsed * 1e3:.1f} [ms], {len(target_ids) / elapsed:.1f} [agents/s]")
+            if cache_predictions:
+                agents, agent_ids = history.as_trajectory(latest=True)
+                for b, (uuid, current_target) in enumerate(zip(target_ids, current_targets)):
+                    self._prediction_reuse.update(
+                        uuid, now, current_target, agents, agent_ids, pred_scores[b:b + 1], pred_trajs[b:b + 1])
+        else:
+            extrapolated = [
+                (uuid, current_target, self._prediction_reuse.extrapolate(uuid, now, current_target))
+                for uuid, current_target in zip(target_ids, current_targets)
+            ]
+            extrapolated = [item for item in extrapolated if item[2] is not None]
+            if len(extrapolated) == 0:
+                return PredictedObjects(header=header)
+            target_ids = [uuid for uuid, _, _ in extrapolated]
+            current_targets = [current_target for _, current_target, _ in extrapolated]
+            pred_scores = torch.cat([reused[0] for _, _, reused in extrapolated])
+            pred_trajs = torch.cat([reused[1] for _, _, reused in extrapolated])
+
+        current_targets = AgentTrajectory(
+            np.concatenate([target.waypoints for target in current_targets]),
+            np.concatenate([target.label_ids for target in current_targets]),
+        )
+        pred_scores, pred_trajs = self._postprocess(pred_scores, pred_trajs, current_targets)
+        return to_predicted_objects(
+            header=header,
+            infos=[history.infos[uuid] for uuid in target_ids],
+            pred_scores=pred_scores,
+            pred_trajs=pred_trajs,
+            score_threshold=self._score_threshold,
+        )
+
     def _generate_steering_bias(self, base_agent_state: AgentState, base_agent_info: OriginalInfo, base_agent_history: AgentHistory, yaw_bias: float, bias_left: bool = True, bias_right: bool = True):
         def normalize_angle(angle: float) -> float:
             """Normalize angle to range [-π, π]."""
@@ -464,7 +886,9 @@ class MTRNode(Node):
     def _tracked_objects_callback(self, msg: TrackedObjects) -> None:
         timestamp = timestamp2us(msg.header)
         states, infos = from_tracked_objects(msg)
-        self._history.update(states, infos)
+        with self._lock:
+            self._history.update(states, infos)
+            self._tracked_object_ids = [state.uuid for state in states]
 
     def _odometry_callback(self, msg: Odometry) -> None:
         timestamp = timestamp2us(msg.header)
@@ -483,46 +907,81 @@ class MTRNode(Node):
         # remove invalid ancient agent history
         if self.current_ego is None or self.current_ego_info is None:
             return
-        self._history.update_state(self.current_ego, self.current_ego_info)
+        with self._lock:
+            self._history.update_state(self.current_ego, self.current_ego_info)
         if self.count < self._num_timestamps:
             self.count = self.count + 1
             return
 
-        true_ego_state = deepcopy(self.current_ego)
-        ego_states = [deepcopy(self.current_ego)]
-        infos = [deepcopy(self.current_ego_info)]
-        histories = [deepcopy(self._history)]
-        requires_concatenation = [False]
-        uuids = [deepcopy(self._ego_uuid)]
-
-        propagation_required = self.propagate_future_states or self.add_left_bias_history or self.add_right_bias_history
-
-        if propagation_required and self._prev_trajectory is not None and len(self._prev_trajectory.points) > 2:
-            history_from_traj, future_ego_state, future_ego_info = self.get_ego_history_from_trajectory(
-                self._prev_trajectory, self.future_state_propagation_sec)
-
-            if history_from_traj is not None and self.propagate_future_states:
-                ego_states.append(future_ego_state)
-                infos.append(future_ego_info)
-                histories.append(history_from_traj)
-                requires_concatenation.append(True)
-                uuids.append(self._ego_uuid_future)
-
-            if self.add_left_bias_history or self.add_right_bias_history:
-                biased_states, biased_infos, biased_histories, bias_uuids = self._generate_steering_bias(
-                    future_ego_state, future_ego_info, history_from_traj, math.pi/18, bias_left=self.add_left_bias_history, bias_right=self.add_right_bias_history)
-                for biased_state, biased_info, biased_history, bias_uuid in zip(biased_states, biased_infos, biased_histories, bias_uuids):
-                    ego_states.append(biased_state)
-                    infos.append(biased_info)
-                    histories.append(biased_history)
+        # in the decoupled mode, inference runs on its own timer and this publishes the latest predictions
+        run_inference = self._inference_timer is None
+        # only ticks running inference are profiled
+        with self._profiler.tick() if run_inference else nullcontext():
+            self._predict(run_inference=run_inference)
+
+    def _inference_callback(self) -> None:
+        if self.count < self._num_timestamps:
+            return
+
+        period = self._inference_period
+        if self._adaptive_inference_period:
+            period = max(period, 2.0 * self._inference_latency)
+        now = time.perf_counter()
+        if now - self._last_inference_time < period:
+            return
+        self._last_inference_time = now
+
+        with self._profiler.tick():
+            self._predict(run_inference=True, publish=False)
+        latency = time.perf_counter() - now
+        self._inference_latency = latency if self._inference_latency == 0.0 else (
+            0.9 * self._inference_latency + 0.1 * latency)
+
+    def _predict(self, run_inference: bool = True, publish: bool = True) -> None:
+        """Run prediction for the ego and its variants, and publish the results.
+
+        Args:
+            run_inference (bool, optional): Whether to run the model. Otherwise, the latest predictions are
+                extrapolated to the current time. Defaults to True.
+            publish (bool, optional): Whether to publish the results. Defaults to True.
+        """
+        with self._lock:
+            true_ego_state = deepcopy(self.current_ego)
+            ego_states = [deepcopy(self.current_ego)]
+            infos = [deepcopy(self.current_ego_info)]
+            histories = [deepcopy(self._history)]
+            requires_concatenation = [False]
+            uuids = [deepcopy(self._ego_uuid)]
+
+            propagation_required = self.propagate_future_states or self.add_left_bias_history or self.add_right_bias_history
+
+            if propagation_required and self._prev_trajectory is not None and len(self._prev_trajectory.points) > 2:
+                history_from_traj, future_ego_state, future_ego_info = self.get_ego_history_from_trajectory(
+                    self._prev_trajectory, self.future_state_propagation_sec)
+
+                if history_from_traj is not None and self.propagate_future_states:
+                    ego_states.append(future_ego_state)
+                    infos.append(future_ego_info)
+                    histories.append(history_from_traj)
                     requires_concatenation.append(True)
-                    uuids.append(bias_uuid)
+                    uuids.append(self._ego_uuid_future)
+
+                if self.add_left_bias_history or self.add_right_bias_history:
+                    biased_states, biased_infos, biased_histories, bias_uuids = self._generate_steering_bias(
+                        future_ego_state, future_ego_info, history_from_traj, math.pi/18, bias_left=self.add_left_bias_history, bias_right=self.add_right_bias_history)
+                    for biased_state, biased_info, biased_history, bias_uuid in zip(biased_states, biased_infos, biased_histories, bias_uuids):
+                        ego_states.append(biased_state)
+                        infos.append(biased_info)
+                        histories.append(biased_history)
+                        requires_concatenation.append(True)
+                        uuids.append(bias_uuid)
 
         ego_multiple_trajs, pred_objs = self._do_predictions(
-            true_ego_state=true_ego_state, ego_states=ego_states, infos=infos, histories=histories, requires_concatenation=requires_concatenation, uuids=uuids)
+            true_ego_state=true_ego_state, ego_states=ego_states, infos=infos, histories=histories, requires_concatenation=requires_concatenation, uuids=uuids, run_inference=run_inference)
 
-        self._ego_trajectories_publisher.publish(ego_multiple_trajs)
-        self._publisher.publish(pred_objs)
+        if publish:
+            self._ego_trajectories_publisher.publish(ego_multiple_trajs)
+            self._publisher.publish(pred_objs)
 
     def _postprocess(
         self,
@@ -565,7 +1024,7 @@ class MTRNode(Node):
 
         return pred_scores, pred_trajs
 
-    def get_embedded_inputs(self, agent_histories: List[deque[AgentState]], target_ids: List[int]):
+    def get_embedded_inputs(self, agent_histories: List[deque[AgentState]], target_ids: List[int], ego_indices: List[int | None]):
 
         num_agent, num_target, num_time = int(len(agent_histories) / len(
             target_ids)), len(
@@ -587,13 +1046,15 @@ class MTRNode(Node):
         time_embed[:, :, :T, -1] = timestamps
 
         type_onehot = np.zeros((B, N, T, num_type + 2), dtype=np.float32)
-        type_onehot[np.arange(B), 0, :, num_type] = 1  # Only ego is target, so index is 0
-        type_onehot[:, 0, :, num_type + 1] = 1             # scenario.ego_index replaced by 0
+        type_onehot[np.arange(B), 0, :, num_type] = 1  # each target is the closest agent of its own
+        for b, ego_idx in enumerate(ego_indices):
+            if ego_idx is not None:
+                type_onehot[b, ego_idx, :, num_type + 1] = 1
 
         trajectory_mask = torch.ones(
             [B, N, T], dtype=torch.bool)
         for b in range(len(target_ids)):
-            for n in range(len(agent_histories)):
+            for n in range(N):
                 history = agent_histories[b * N + n]
                 for t, state in enumerate(history):
                     past_xyz[b, n, t, 0] = state.xyz[0]
@@ -614,7 +1075,7 @@ class MTRNode(Node):
                     trajectory_mask[b, n, t] = state.is_valid
 
         for b in range(len(target_ids)):
-            for n in range(len(agent_histories)):
+            for n in range(N):
                 history = agent_histories[b * N + n]
                 for t, state in enumerate(history):
                     if t < T-1:
@@ -674,29 +1135,48 @@ class MTRNode(Node):
 
     def _preprocess(
         self,
-        current_ego: AgentState,
-        history: AgentHistory
+        targets: List[AgentState],
+        history: AgentHistory,
+        ego_uuid: str,
     ):
-        """Run preprocess.
+        """Run preprocess for targets in a batch.
 
         Args:
-            history (AgentHistory): Ego history.
-            current_ego (AgentState): Current ego state.
-            lane_segments (list[LaneSegments]): Lane segments.
+            targets (List[AgentState]): Current target states, e.g. the ego.
+            history (AgentHistory): Agent history.
+            ego_uuid (str): Uuid of the ego in `history`, which is flagged in each row.
 
         Returns:
 
         """
+        num_target = len(targets)
+        if num_target == 1:
+            target_state = targets[0]
+        else:
+            target_state = AgentTrajectory(
+                np.array([(*t.xyz, *t.size, t.yaw, *t.vxy, t.is_valid) for t in targets]),
+                np.array([t.label_id for t in targets]),
+            )
+        if self._tiled_map is not None:
+            # tiles are prefetched ahead of the ego, which is not one of targets in the tracked object batch
+            ego_state = history.histories[ego_uuid][-1] if ego_uuid in history.histories else targets[0]
+            self._batch_polylines, self._batch_polylines_mask, self._polyline_center = self._tiled_map.update(
+                np.array([t.xy for t in targets]), ego_state.xy, ego_state.yaw)
         polyline_info, self._batch_polylines, self._batch_polylines_mask, self._polyline_center = self._preprocess_polyline(
-            static_map=self._awml_static_map, target_state=current_ego, num_target=1, batch_polylines=self._batch_polylines, batch_polylines_mask=self._batch_polylines_mask, polyline_center=self._polyline_center)
-
-        sorted_histories = order_from_closest_to_furthest(
-            current_ego, history.histories.values())
-        sorted_histories = self.recalculate_history_velocities(sorted_histories)
-        relative_histories = get_relative_histories(
-            [current_ego], sorted_histories)
-        embedded_inputs, last_xyz, trajectory_mask = self.get_embedded_inputs(relative_histories, [
-            0])
+            static_map=self._awml_static_map, target_state=target_state, num_target=num_target, batch_polylines=self._batch_polylines, batch_polylines_mask=self._batch_polylines_mask, polyline_center=self._polyline_center,
+            target_keys=[target.uuid for target in targets])
+
+        histories = self.recalculate_history_velocities(history.histories.values())
+        ego_history = histories[list(history.histories).index(ego_uuid)] if ego_uuid in history.histories else None
+        # agents are sorted for each target so that the target itself comes first, in the order of (B, N)
+        relative_histories = []
+        ego_indices = []
+        for target in targets:
+            sorted_histories = order_from_closest_to_furthest(target, histories)
+            relative_histories += get_relative_histories([target], sorted_histories)
+            ego_indices.append(next((n for n, h in enumerate(sorted_histories) if h is ego_history), None))
+        embedded_inputs, last_xyz, trajectory_mask = self.get_embedded_inputs(
+            relative_histories, list(range(num_target)), ego_indices)
         return embedded_inputs, polyline_info, last_xyz, trajectory_mask
 
     def interpolate_trajectory(self, original_traj: Trajectory, start_time: float) -> Trajectory:
@@ -872,6 +1352,14 @@ class MTRNode(Node):
     def get_time_float(self, duration: Duration) -> float:
         return duration.sec + float(duration.nanosec) * 1e-9
 
+    def destroy_node(self) -> None:
+        # pending records are written before shutdown
+        if self._recorder is not None:
+            self._recorder.close()
+        if self._tiled_map is not None:
+            self._tiled_map.close()
+        super().destroy_node()
+
 
 def main(args=None) -> None:
     rclpy.init(args=args)
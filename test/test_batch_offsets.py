@@ -0,0 +1,60 @@
+import pytest
+import torch
+
+from awml_pred.models.utils import get_batch_offsets
+
+
+def _get_batch_offsets_reference(batch_idxs: torch.Tensor, batch_size: int) -> torch.Tensor:
+    batch_offsets = torch.zeros(batch_size + 1, device=batch_idxs.device).int()
+    for i in range(batch_size):
+        batch_offsets[i + 1] = batch_offsets[i] + (batch_idxs == i).sum()
+    return batch_offsets
+
+
+@pytest.mark.parametrize(
+    ("batch_idxs", "batch_size"),
+    [
+        (torch.tensor([0, 0, 1, 1, 1, 3]), 4),
+        (torch.tensor([2, 0, 1, 0, 2]), 3),
+        (torch.tensor([], dtype=torch.long), 3),
+        (torch.tensor([-2, -1, 0, 1, 4, 5]), 3),
+        (torch.tensor([5, 6]), 2),
+        (torch.randint(-1, 9, (1000,), generator=torch.Generator().manual_seed(0)), 8),
+    ],
+)
+def test_get_batch_offsets(batch_idxs: torch.Tensor, batch_size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    expected = _get_batch_offsets_reference(batch_idxs, batch_size)
+
+    actual = get_batch_offsets(batch_idxs, batch_size)
+    assert actual.dtype == torch.int
+    assert actual.device == batch_idxs.device
+    assert torch.equal(actual, expected)
+
+    # the branch used during ONNX export
+    monkeypatch.setattr(torch.onnx, "is_in_onnx_export", lambda: True)
+    assert torch.equal(get_batch_offsets(batch_idxs, batch_size), expected)
+
+
+def test_get_batch_offsets_onnx(tmp_path) -> None:
+    onnxruntime = pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+
+    class BatchOffsets(torch.nn.Module):
+        def forward(self, batch_idxs: torch.Tensor) -> torch.Tensor:
+            return get_batch_offsets(batch_idxs, 4)
+
+    filepath = str(tmp_path / "batch_offsets.onnx")
+    torch.onnx.export(
+        BatchOffsets(),
+        (torch.tensor([0, 1, 1, 3]),),
+        filepath,
+        input_names=["batch_idxs"],
+        output_names=["batch_offsets"],
+        dynamic_axes={"batch_idxs": {0: "num_elements"}},
+        opset_version=17,
+        dynamo=False,
+    )
+    session = onnxruntime.InferenceSession(filepath, providers=["CPUExecutionProvider"])
+    for batch_idxs in (torch.tensor([0, 0, 2, 3, 3, 3]), torch.tensor([-1, 1, 4, 2])):
+        (actual,) = session.run(None, {"batch_idxs": batch_idxs.numpy()})
+        assert torch.equal(torch.from_numpy(actual), _get_batch_offsets_reference(batch_idxs, 4))
@@ -0,0 +1,54 @@
+import os.path as osp
+
+import pytest
+import torch
+
+from awml_pred.common import Config
+from awml_pred.deploy import ShapeBucket, build_backend, create_dummy_inputs, fuse_for_inference
+from awml_pred.deploy.backends.bucket import TARGET_KEYS
+from awml_pred.models import build_model
+
+ROOT_DIR = osp.dirname(osp.dirname(osp.abspath(__file__)))
+CONFIG_PATH = osp.join(ROOT_DIR, "config", "mtr.yaml")
+
+
+def _create_inputs(cfg: Config, num_target: int, seed: int = 0) -> dict[str, torch.Tensor]:
+    return create_dummy_inputs(
+        num_target=num_target,
+        num_agent=6,
+        num_polyline=700,
+        num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+        num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+        seed=seed,
+    )
+
+
+def test_pad_targets() -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    inputs = _create_inputs(cfg, num_target=3)
+    padded = ShapeBucket(target_sizes=[1, 4, 8]).pad(inputs)
+    for key in TARGET_KEYS:
+        assert len(padded[key]) == 4
+        torch.testing.assert_close(padded[key][:3], inputs[key])
+        torch.testing.assert_close(padded[key][3], inputs[key][2])
+
+
+def test_expand_targets() -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    bucket = ShapeBucket(agent_sizes=[8, 16], target_sizes=[1, 4])
+    shapes = {tuple(sample["obj_trajs"].shape[:2]) for sample in bucket.expand(_create_inputs(cfg, num_target=1))}
+    assert shapes == {(1, 8), (1, 16), (4, 8), (4, 16)}
+    assert bucket.max_num_target == 4
+
+
+@pytest.mark.parametrize("num_target", [1, 2, 3])
+def test_backend_drops_padded_targets(num_target: int) -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    torch.manual_seed(0)
+    model = fuse_for_inference(build_model(cfg.model)).eval()
+    inputs = _create_inputs(cfg, num_target=num_target, seed=num_target)
+    expected = build_backend({"name": "EagerBackend"}, model)(**inputs)
+    actual = build_backend({"name": "EagerBackend", "shape_bucket": {"target_sizes": [4]}}, model)(**inputs)
+    for expected_item, actual_item in zip(expected, actual):
+        assert len(actual_item) == num_target
+        torch.testing.assert_close(actual_item, expected_item, atol=1e-4, rtol=1e-4)
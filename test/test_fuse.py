@@ -0,0 +1,83 @@
+import os
+import os.path as osp
+from copy import deepcopy
+
+import pytest
+import torch
+from torch import nn
+
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import create_dummy_inputs, fuse_for_inference
+from awml_pred.models import build_model
+
+ROOT_DIR = osp.dirname(osp.dirname(osp.abspath(__file__)))
+CONFIG_PATH = osp.join(ROOT_DIR, "config", "mtr.yaml")
+# trained checkpoint, whose BatchNorm layers have running statistics
+CHECKPOINT_PATH = os.environ.get("MTR_CHECKPOINT", osp.join(ROOT_DIR, "data", "mtr_best.pth"))
+
+
+def _assert_fused_equal(model: nn.Module, cfg: Config, atol: float = 1e-4) -> None:
+    model.eval()
+    fused = fuse_for_inference(deepcopy(model))
+    assert any(isinstance(module, nn.BatchNorm1d) for module in model.modules())
+    assert not any(isinstance(module, nn.BatchNorm1d) for module in fused.modules())
+
+    with torch.no_grad():
+        for seed in range(3):
+            inputs = create_dummy_inputs(
+                num_target=2,
+                num_agent=8,
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                seed=seed,
+            )
+            for expected, actual in zip(model(**inputs), fused(**inputs)):
+                torch.testing.assert_close(actual, expected, atol=atol, rtol=1e-4)
+
+
+def test_fuse_for_inference_random_statistics() -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    model = build_model(cfg.model)
+    generator = torch.Generator().manual_seed(0)
+    for module in model.modules():
+        if isinstance(module, nn.BatchNorm1d):
+            num_features = module.num_features
+            module.running_mean.copy_(torch.randn(num_features, generator=generator) * 0.1)
+            module.running_var.copy_(torch.rand(num_features, generator=generator) + 0.5)
+            module.weight.data.copy_(torch.rand(num_features, generator=generator) + 0.5)
+            module.bias.data.copy_(torch.randn(num_features, generator=generator) * 0.1)
+    _assert_fused_equal(model, cfg)
+
+
+def test_fuse_for_inference_accumulated_statistics() -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    torch.manual_seed(0)
+    model = build_model(cfg.model).eval()
+    batch_norms = [module for module in model.modules() if isinstance(module, nn.BatchNorm1d)]
+
+    # running statistics are accumulated on activations of the randomly initialized model, as training does
+    for module in batch_norms:
+        module.train()
+        module.momentum = None
+    with torch.no_grad():
+        for seed in range(4):
+            inputs = create_dummy_inputs(
+                num_target=4,
+                num_agent=16,
+                num_agent_dim=cfg.model.encoder.agent_polyline_encoder.in_channels - 1,
+                num_point_dim=cfg.model.encoder.map_polyline_encoder.in_channels,
+                seed=100 + seed,
+            )
+            model(**inputs)
+
+    for module in batch_norms:
+        assert module.running_mean.abs().max() > 1e-2
+        assert (module.running_var - 1).abs().max() > 1e-2
+    _assert_fused_equal(model, cfg)
+
+
+@pytest.mark.skipif(not osp.exists(CHECKPOINT_PATH), reason=f"No checkpoint at {CHECKPOINT_PATH}.")
+def test_fuse_for_inference_checkpoint() -> None:
+    cfg = Config.from_file(CONFIG_PATH)
+    model, _ = load_checkpoint(build_model(cfg.model), CHECKPOINT_PATH)
+    _assert_fused_equal(model, cfg)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from benchmarks.synthetic import SceneConfig, generate_map
+from utils.polyline import TargetCentricPolyline, compute_polyline_centers
+from utils.scenario import _TargetState
+
+
+def _targets(x: np.ndarray, yaw: float) -> _TargetState:
+    return _TargetState(xyz=np.stack((x, np.zeros_like(x), np.zeros_like(x)), axis=-1), yaw=np.full(len(x), yaw))
+
+
+def test_reuse_selection_for_each_target_key() -> None:
+    points, _ = generate_map(SceneConfig(map_size=400.0))
+    reference = TargetCentricPolyline()
+    transform = TargetCentricPolyline(reuse_radius=3.0)
+    batch_polylines, batch_polylines_mask = reference._generate_batch(points)
+    polyline_center = compute_polyline_centers(batch_polylines, batch_polylines_mask)[..., :2]
+
+    # callers of different targets alternate, as the ego and tracked objects in the node
+    for tick in range(4):
+        callers = (
+            (["EGO"], _targets(np.array([-100.0 + 0.5 * tick]), 0.0)),
+            (["a", "b"], _targets(np.array([0.0, 50.0]) - 0.5 * tick, np.pi)),
+        )
+        for keys, targets in callers:
+            args = (targets, len(keys), batch_polylines, batch_polylines_mask, polyline_center)
+            expected, *_ = reference(None, *args)
+            actual, *_ = transform(None, *args, target_keys=keys)
+            assert actual["polylines"].shape == expected["polylines"].shape
+            if tick == 0:
+                np.testing.assert_allclose(actual["polylines"], expected["polylines"], atol=1e-3)
+                np.testing.assert_allclose(actual["polyline_centers"], expected["polyline_centers"], atol=1e-3)
+
+    assert transform.num_selected == 3
+    assert transform.num_reused == 9
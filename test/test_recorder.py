@@ -0,0 +1,51 @@
+import os
+import os.path as osp
+
+import numpy as np
+import pytest
+import torch
+
+from awml_pred.deploy.recorder import InputRecorder
+from awml_pred.deploy.utils import INPUT_NAMES
+
+
+def _record(recorder: InputRecorder) -> None:
+    inputs = {name: torch.zeros(1, 2) for name in INPUT_NAMES}
+    assert recorder.record(inputs, (torch.zeros(1, 6), torch.zeros(1, 6, 80, 7)))
+
+
+def test_keep_foreign_files(tmp_path: str) -> None:
+    foreign = ("weights.npz", "20240101_000000.npz", "20240101_000000_000000_copy.npz")
+    for name in foreign:
+        np.savez(osp.join(tmp_path, name), x=np.zeros(1))
+    np.savez(osp.join(tmp_path, "20240101_000000_000000.npz"), x=np.zeros(1))
+
+    recorder = InputRecorder(str(tmp_path), max_files=2, max_pending=8)
+    for _ in range(3):
+        _record(recorder)
+    recorder.close()
+
+    recorded = sorted(name for name in os.listdir(tmp_path) if name not in foreign)
+    assert len(recorded) == 2
+    assert "20240101_000000_000000.npz" not in recorded
+    assert all(osp.exists(osp.join(tmp_path, name)) for name in foreign)
+
+
+def test_survive_write_error(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    savez_compressed = np.savez_compressed
+    calls = []
+
+    def fail_first(filepath: str, **arrays: np.ndarray) -> None:
+        calls.append(filepath)
+        if len(calls) == 1:
+            raise OSError("No space left on device")
+        savez_compressed(filepath, **arrays)
+
+    monkeypatch.setattr(np, "savez_compressed", fail_first)
+    recorder = InputRecorder(str(tmp_path), max_pending=8)
+    for _ in range(2):
+        _record(recorder)
+    recorder.close()
+
+    assert len(calls) == 2
+    assert os.listdir(tmp_path) == [osp.basename(calls[1])]
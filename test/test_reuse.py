@@ -0,0 +1,36 @@
+import pytest
+import torch
+
+pytest.importorskip("autoware_perception_msgs")
+
+from autoware_mtr.reuse import shift_trajectories  # noqa: E402
+
+
+def _linear_trajectories(num_future: int = 10, time_step: float = 0.1) -> torch.Tensor:
+    # the t-th waypoint is at `(t + 1) * time_step` with a constant velocity of 2m/s along x
+    timestamps = (torch.arange(num_future, dtype=torch.float32) + 1) * time_step
+    pred_trajs = torch.zeros(2, 3, num_future, 7)
+    pred_trajs[..., 0] = 2.0 * timestamps
+    pred_trajs[..., 5] = 2.0
+    return pred_trajs
+
+
+@pytest.mark.parametrize("elapsed", [0.1, 0.15, 0.42])
+def test_shift_trajectories(elapsed: float) -> None:
+    num_future, time_step = 10, 0.1
+    pred_trajs = _linear_trajectories(num_future, time_step)
+    shifted = shift_trajectories(pred_trajs, elapsed, time_step)
+    assert shifted.shape == pred_trajs.shape
+
+    # interpolated within the horizon, and the last waypoint is held beyond it
+    timestamps = ((torch.arange(num_future) + 1) * time_step + elapsed).clamp(max=num_future * time_step)
+    torch.testing.assert_close(shifted[..., 0], (2.0 * timestamps).expand_as(shifted[..., 0]))
+    torch.testing.assert_close(shifted[..., 5], pred_trajs[..., 5])
+    assert shifted[..., 0].max() <= pred_trajs[..., -1, 0].max()
+
+
+def test_shift_trajectories_beyond_horizon() -> None:
+    pred_trajs = _linear_trajectories()
+    shifted = shift_trajectories(pred_trajs, 5.0)
+    torch.testing.assert_close(shifted, pred_trajs[..., -1:, :].expand_as(pred_trajs))
+    assert shift_trajectories(pred_trajs, 0.0) is pred_trajs
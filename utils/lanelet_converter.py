@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import itertools
 import logging
+import multiprocessing as mp
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable
 
 import numpy as np
-from scipy.interpolate import interp1d
 
 try:
     import lanelet2
@@ -21,8 +25,35 @@ from autoware_mtr.dataclass.static_map import AWMLStaticMap, BoundarySegment, Cr
 from awml_pred.datatype import MapType
 from .constant import MAP_TYPE_MAPPING, T4_LANE, T4_ROADEDGE, T4_ROADLINE
 
+if TYPE_CHECKING:
+    from awml_pred.typing import NDArray
+
 # cspell: ignore MGRS
 
+# interval of resampled waypoints in [m]
+WAYPOINT_INTERVAL = 0.5
+
+# map and routing graph loaded by each worker process of `convert_lanelet`
+_worker_lanelets: list[lanelet2.core.Lanelet] = []
+
+
+@dataclass(frozen=True)
+class AdaptiveResampling:
+    """Resampling of polylines by Douglas-Peucker simplification, followed by subdivision with the max interval.
+
+    Straight parts of polylines are represented by a few points, while curved parts keep points of the original
+    polyline to be within the tolerance.
+
+    Attributes
+    ----------
+        tolerance (float): Max distance from the original polyline to the simplified one in [m].
+        max_interval (float): Max interval of resampled waypoints in [m].
+
+    """
+
+    tolerance: float = 0.1
+    max_interval: float = 5.0
+
 
 def _load_osm(filename: str) -> lanelet2.core.LaneletMap:
     """Load lanelet map from osm file.
@@ -177,22 +208,38 @@ def _get_boundary_type(linestring: lanelet2.core.LineString3d) -> BoundaryType:
         return MapType.UNKNOWN
 
 
-def _get_boundary_segment(linestring: lanelet2.core.LineString3d) -> BoundarySegment:
+def _get_boundary_segment(
+    linestring: lanelet2.core.LineString3d,
+    cache: dict[tuple[int, bool], BoundarySegment] | None = None,
+    resampling: dict[MapType, AdaptiveResampling] | None = None,
+) -> BoundarySegment:
     """Return the `BoundarySegment` from linestring.
 
     Args:
     ----
         linestring (lanelet2.core.LineString3d): LineString instance.
+        cache (dict[tuple[int, bool], BoundarySegment] | None, optional): Converted segments keyed by linestring id
+            and whether it is inverted. A linestring shared by adjacent lanelets is converted only once if it is
+            specified. Defaults to None.
+        resampling (dict[MapType, AdaptiveResampling] | None, optional): Adaptive resampling for each type.
+            Defaults to None.
 
     Returns:
     -------
         BoundarySegment: BoundarySegment instance.
 
     """
+    key = (linestring.id, linestring.inverted())
+    if cache is not None and key in cache:
+        return cache[key]
+
     boundary_type = _get_boundary_type(linestring)
-    waypoints = _interpolate_lane(np.array([(line.x, line.y, line.z) for line in linestring]))
+    waypoints = _resample(_get_waypoints(linestring), boundary_type, resampling)
     polyline = Polyline(polyline_type=boundary_type, waypoints=waypoints)
-    return BoundarySegment(linestring.id, polyline)
+    segment = BoundarySegment(linestring.id, polyline)
+    if cache is not None:
+        cache[key] = segment
+    return segment
 
 
 def _get_speed_limit_mph(lanelet: lanelet2.core.Lanelet) -> float | None:
@@ -270,81 +317,180 @@ def _get_left_and_right_neighbor_ids(
     return left_neighbor_id, right_neighbor_id
 
 
-def _interpolate_lane(waypoints: NDArray):
-    # Compute cumulative distances (arc length)
+def _get_waypoints(points: Iterable[lanelet2.core.Point3d]) -> NDArray:
+    """Return the coordinates of points as an array, which are extracted without intermediate tuples.
+
+    Args:
+    ----
+        points (Iterable[lanelet2.core.Point3d]): Linestring or polygon.
+
+    Returns:
+    -------
+        NDArray: Coordinates in shape (N, 3).
+
+    """
+    coords = itertools.chain.from_iterable((point.x, point.y, point.z) for point in points)
+    return np.fromiter(coords, dtype=np.float64).reshape(-1, 3)
+
+
+def _interpolate_lane(waypoints: NDArray, interval: float = WAYPOINT_INTERVAL) -> NDArray:
+    """Resample waypoints with the fixed interval along the cumulative arc length.
+
+    Args:
+    ----
+        waypoints (NDArray): Waypoints in shape (N, 3).
+        interval (float, optional): Interval of resampled waypoints in [m]. Defaults to `WAYPOINT_INTERVAL`.
+
+    Returns:
+    -------
+        NDArray: Resampled waypoints in shape (M, 3), which contain the first and last input waypoints.
+
+    """
+    diff = np.diff(waypoints, axis=0)
     distances = np.zeros(len(waypoints))
-    for i in range(1, len(waypoints)):
-        distances[i] = distances[i - 1] + np.linalg.norm(waypoints[i] - waypoints[i - 1])
-
-    # Generate new arc lengths with fixed spacing (0.5 meters)
-    new_distances = np.arange(0, distances[-1], 0.5)
-    new_distances = np.append(new_distances, distances[-1])  # Ensure last point is included
-
-    # Interpolate x, y, z separately
-    interp_x = interp1d(distances, waypoints[:, 0], kind="linear")
-    interp_y = interp1d(distances, waypoints[:, 1], kind="linear")
-    interp_z = interp1d(distances, waypoints[:, 2], kind="linear")
-
-    # Compute new waypoints
-    new_waypoints = np.vstack((interp_x(new_distances), interp_y(
-        new_distances), interp_z(new_distances))).T
-
-    # Ensure the first and last points remain unchanged
-    # Ensure the first waypoint is exactly the same without duplication
-    if not np.allclose(new_waypoints[0], waypoints[0]):
-        new_waypoints = np.vstack((waypoints[0], new_waypoints))
-
-    # Ensure the last waypoint is exactly the same without duplication
-    if not np.allclose(new_waypoints[-1], waypoints[-1]):
-        new_waypoints = np.vstack((new_waypoints, waypoints[-1]))
+    np.cumsum(np.sqrt((diff * diff).sum(axis=1)), out=distances[1:])
+
+    # NOTE: the last distance is appended, because it is not contained in the range.
+    # `np.interp` returns the first and last waypoints as they are at the both ends of distances.
+    new_distances = np.append(np.arange(0, distances[-1], interval), distances[-1])
+    new_waypoints = np.empty((len(new_distances), 3))
+    for i in range(3):
+        new_waypoints[:, i] = np.interp(new_distances, distances, waypoints[:, i])
     return new_waypoints
 
 
-def convert_lanelet(filename: str) -> AWMLStaticMap:
-    """Convert lanelet (.osm) to map info.
+def _douglas_peucker(waypoints: NDArray, tolerance: float) -> NDArray:
+    """Return the mask of waypoints kept by Douglas-Peucker simplification.
 
-    Note:
+    Args:
     ----
-        Currently, following subtypes are skipped:
-            walkway
+        waypoints (NDArray): Waypoints in shape (N, 3).
+        tolerance (float): Max distance from the original polyline to the simplified one in [m].
+
+    Returns:
+    -------
+        NDArray: Mask in shape (N,), where the first and last waypoints are always kept.
+
+    """
+    keep = np.zeros(len(waypoints), dtype=np.bool_)
+    keep[[0, -1]] = True
+    stack = [(0, len(waypoints) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = waypoints[end] - waypoints[start]
+        relative = waypoints[start + 1 : end] - waypoints[start]
+        ratio = np.clip(relative @ segment / max(segment @ segment, 1e-12), 0.0, 1.0)
+        distances = np.linalg.norm(relative - ratio[:, None] * segment, axis=1)
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            middle = start + 1 + index
+            keep[middle] = True
+            stack += [(start, middle), (middle, end)]
+    return keep
+
+
+def _simplify_lane(waypoints: NDArray, tolerance: float, max_interval: float) -> NDArray:
+    """Simplify waypoints by Douglas-Peucker, and subdivide segments longer than the max interval equally.
 
     Args:
     ----
-        filename (str): Path to osm file.
+        waypoints (NDArray): Waypoints in shape (N, 3).
+        tolerance (float): Max distance from the original polyline to the simplified one in [m].
+        max_interval (float): Max interval of resampled waypoints in [m].
 
     Returns:
     -------
-        AWMLStaticMap: Static map data.
+        NDArray: Resampled waypoints in shape (M, 3), which contain the first and last input waypoints.
 
     """
-    lanelet_map = _load_osm(filename)
+    # NOTE: duplicated waypoints are removed, because their directions become zeros as the first waypoint
+    lengths = np.linalg.norm(np.diff(waypoints, axis=0), axis=1)
+    waypoints = waypoints[np.append(True, lengths > 1e-6)]
+    if len(waypoints) < 2:
+        return waypoints
+
+    key_points = waypoints[_douglas_peucker(waypoints, tolerance)]
+    segments = np.diff(key_points, axis=0)
+    num_divisions = np.maximum(np.ceil(np.linalg.norm(segments, axis=1) / max_interval).astype(np.int64), 1)
+    segment_idxs = np.repeat(np.arange(len(segments)), num_divisions)
+    # index of each new waypoint in its segment, divided by the number of divisions of the segment
+    ratios = np.arange(num_divisions.sum()) - np.repeat(np.cumsum(num_divisions) - num_divisions, num_divisions)
+    ratios = ratios / num_divisions[segment_idxs]
+    new_waypoints = key_points[segment_idxs] + segments[segment_idxs] * ratios[:, None]
+    return np.vstack((new_waypoints, key_points[-1]))
+
+
+def _resample(
+    waypoints: NDArray,
+    polyline_type: MapType,
+    resampling: dict[MapType, AdaptiveResampling] | None = None,
+) -> NDArray:
+    """Resample waypoints adaptively if the type is configured, otherwise with the fixed interval.
 
-    traffic_rules = create_traffic_rules(Locations.Germany, Participants.Vehicle)
-    routing_graph = RoutingGraph(lanelet_map, traffic_rules)
+    Args:
+    ----
+        waypoints (NDArray): Waypoints in shape (N, 3).
+        polyline_type (MapType): Type of the polyline.
+        resampling (dict[MapType, AdaptiveResampling] | None, optional): Adaptive resampling for each type.
+            Defaults to None.
+
+    Returns:
+    -------
+        NDArray: Resampled waypoints in shape (M, 3).
+
+    """
+    config = resampling.get(polyline_type) if resampling is not None else None
+    if config is None:
+        return _interpolate_lane(waypoints)
+    return _simplify_lane(waypoints, config.tolerance, config.max_interval)
+
+
+def _convert_lanelets(
+    lanelets: Iterable[lanelet2.core.Lanelet],
+    boundary_cache: dict[tuple[int, bool], BoundarySegment],
+    routing_graph: RoutingGraph | None = None,
+    resampling: dict[MapType, AdaptiveResampling] | None = None,
+) -> tuple[dict[int, LaneSegment], dict[int, CrosswalkSegment]]:
+    """Convert lanelets to lane and crosswalk segments.
+
+    Args:
+    ----
+        lanelets (Iterable[lanelet2.core.Lanelet]): Lanelets to be converted.
+        boundary_cache (dict[tuple[int, bool], BoundarySegment]): Converted boundaries keyed by linestring id and
+            whether it is inverted, which is updated with the boundaries of lanes.
+        routing_graph (RoutingGraph | None, optional): RoutingGraph instance. If None, neighbor ids of lanes are left
+            empty. Defaults to None.
+        resampling (dict[MapType, AdaptiveResampling] | None, optional): Adaptive resampling for each type.
+            Defaults to None.
+
+    Returns:
+    -------
+        tuple[dict[int, LaneSegment], dict[int, CrosswalkSegment]]: Lane and crosswalk segments keyed by lanelet id.
 
+    """
     lane_segments: dict[int, LaneSegment] = {}
     crosswalk_segments: dict[int, CrosswalkSegment] = {}
-    taken_boundary_ids: list[int] = []
-    for lanelet in lanelet_map.laneletLayer:
+    for lanelet in lanelets:
         lanelet_subtype = _get_lanelet_subtype(lanelet)
 
         # NOTE: skip walkway because it contains stop_line as boundary
         if lanelet_subtype in T4_LANE:
             # lane
             lane_type = MAP_TYPE_MAPPING[lanelet_subtype]
-            lane_waypoints = _interpolate_lane(
-                np.array([(line.x, line.y, line.z) for line in lanelet.centerline]))
+            lane_waypoints = _resample(_get_waypoints(lanelet.centerline), lane_type, resampling)
             lane_polyline = Polyline(polyline_type=lane_type, waypoints=lane_waypoints)
             is_intersection = _is_intersection(lanelet)
-            left_neighbor_ids, right_neighbor_ids = _get_left_and_right_neighbor_ids(
-                lanelet, routing_graph)
+            left_neighbor_ids, right_neighbor_ids = (
+                _get_left_and_right_neighbor_ids(lanelet, routing_graph) if routing_graph is not None else ([], [])
+            )
             speed_limit_mph = _get_speed_limit_mph(lanelet)
 
             # road line or road edge
             left_linestring, right_linestring = _get_left_and_right_linestring(lanelet)
-            left_boundary = _get_boundary_segment(left_linestring)
-            right_boundary = _get_boundary_segment(right_linestring)
-            taken_boundary_ids.extend((left_linestring.id, right_linestring.id))
+            left_boundary = _get_boundary_segment(left_linestring, boundary_cache, resampling)
+            right_boundary = _get_boundary_segment(right_linestring, boundary_cache, resampling)
 
             lane_segments[lanelet.id] = LaneSegment(
                 id=lanelet.id,
@@ -357,19 +503,99 @@ def convert_lanelet(filename: str) -> AWMLStaticMap:
                 speed_limit_mph=speed_limit_mph,
             )
         elif lanelet_subtype == "crosswalk":
-            waypoints = _interpolate_lane(
-                np.array([(poly.x, poly.y, poly.z) for poly in lanelet.polygon3d()]))
-            polygon = Polyline(polyline_type=MAP_TYPE_MAPPING[lanelet_subtype], waypoints=waypoints)
+            crosswalk_type = MAP_TYPE_MAPPING[lanelet_subtype]
+            waypoints = _resample(_get_waypoints(lanelet.polygon3d()), crosswalk_type, resampling)
+            polygon = Polyline(polyline_type=crosswalk_type, waypoints=waypoints)
             crosswalk_segments[lanelet.id] = CrosswalkSegment(lanelet.id, polygon)
         else:
             logging.warning(f"[Lanelet]: {lanelet_subtype} is unsupported and skipped.")
             continue
+    return lane_segments, crosswalk_segments
+
+
+def _init_worker(filename: str) -> None:
+    global _worker_lanelets
+    _worker_lanelets = list(_load_osm(filename).laneletLayer)
+
+
+def _convert_chunk(
+    start: int,
+    stop: int,
+    resampling: dict[MapType, AdaptiveResampling] | None,
+) -> tuple[dict[int, LaneSegment], dict[int, CrosswalkSegment], dict[tuple[int, bool], BoundarySegment]]:
+    boundary_cache: dict[tuple[int, bool], BoundarySegment] = {}
+    lane_segments, crosswalk_segments = _convert_lanelets(
+        _worker_lanelets[start:stop], boundary_cache, resampling=resampling)
+    return lane_segments, crosswalk_segments, boundary_cache
+
+
+def convert_lanelet(
+    filename: str,
+    num_workers: int = 0,
+    chunk_size: int = 64,
+    resampling: dict[MapType, AdaptiveResampling] | None = None,
+) -> AWMLStaticMap:
+    """Convert lanelet (.osm) to map info.
+
+    Note:
+    ----
+        Currently, following subtypes are skipped:
+            walkway
+
+    Args:
+    ----
+        filename (str): Path to osm file.
+        num_workers (int, optional): Number of worker processes converting chunks of lanelets, which load the map by
+            themselves. Neighbors of lanes are looked up in this process. If 0, lanelets are converted in this process.
+            Defaults to 0.
+        chunk_size (int, optional): Number of lanelets in each chunk. Defaults to 64.
+        resampling (dict[MapType, AdaptiveResampling] | None, optional): Adaptive resampling for each type, and the
+            other types are resampled with `WAYPOINT_INTERVAL`. Polylines resampled with the interval longer than
+            `break_distance` must be separated by `TargetCentricPolyline(break_distance=None)`. Defaults to None.
+
+    Returns:
+    -------
+        AWMLStaticMap: Static map data.
+
+    """
+    lanelet_map = _load_osm(filename)
+
+    traffic_rules = create_traffic_rules(Locations.Germany, Participants.Vehicle)
+    boundary_cache: dict[tuple[int, bool], BoundarySegment] = {}
+    if num_workers > 0:
+        num_lanelets = len(lanelet_map.laneletLayer)
+        chunks = [(i, min(i + chunk_size, num_lanelets)) for i in range(0, num_lanelets, chunk_size)]
+        lane_segments: dict[int, LaneSegment] = {}
+        crosswalk_segments: dict[int, CrosswalkSegment] = {}
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(filename,),
+        ) as executor:
+            starts, stops = zip(*chunks)
+            results = executor.map(_convert_chunk, starts, stops, itertools.repeat(resampling))
+            routing_graph = RoutingGraph(lanelet_map, traffic_rules)
+            # NOTE: chunks are merged in order, so that segments are in the same order as the serial conversion
+            for chunk_lanes, chunk_crosswalks, chunk_boundaries in results:
+                lane_segments.update(chunk_lanes)
+                crosswalk_segments.update(chunk_crosswalks)
+                for key, segment in chunk_boundaries.items():
+                    boundary_cache.setdefault(key, segment)
+        for lane_id, lane in lane_segments.items():
+            lane.left_neighbor_ids, lane.right_neighbor_ids = _get_left_and_right_neighbor_ids(
+                lanelet_map.laneletLayer[lane_id], routing_graph)
+    else:
+        routing_graph = RoutingGraph(lanelet_map, traffic_rules)
+        lane_segments, crosswalk_segments = _convert_lanelets(
+            lanelet_map.laneletLayer, boundary_cache, routing_graph, resampling)
 
+    taken_boundary_ids = {linestring_id for linestring_id, _ in boundary_cache}
     boundary_segments: dict[int, BoundarySegment] = {}
     for linestring in lanelet_map.lineStringLayer:
         type_name: str = _get_linestring_type(linestring)
         if (type_name in T4_ROADEDGE or type_name in T4_ROADLINE) and linestring.id not in taken_boundary_ids:
-            boundary_segments[linestring.id] = _get_boundary_segment(linestring)
+            boundary_segments[linestring.id] = _get_boundary_segment(linestring, resampling=resampling)
 
     # generate uuid from map filepath
     map_id = uuid(filename, digit=16)
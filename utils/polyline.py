@@ -1,24 +1,34 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable, NamedTuple, Sequence
 
 import numpy as np
 
 from awml_pred.common import TRANSFORMS
 from autoware_mtr.geometry import rotate_along_z
-from autoware_mtr.dataclass.agent import AgentState
-import time
 from numba import njit, prange
 
 
 if TYPE_CHECKING:
+    from autoware_mtr.dataclass.agent import AgentState, AgentTrajectory
     from autoware_mtr.dataclass.static_map import AWMLStaticMap
-    from awml_pred.typing import NDArrayBool, NDArrayF32, NDArrayI64
+    from awml_pred.typing import NDArrayBool, NDArrayF32, NDArrayF64, NDArrayI64
 
 __all__ = ("TargetCentricPolyline",)
 
 
-@njit(parallel=True)
+class _Selection(NamedTuple):
+    """Polylines selected for a target in map coords, which are reused while the target stays."""
+
+    center_pos: NDArrayF32
+    polylines: NDArrayF32
+    polylines_mask: NDArrayBool
+    centers: NDArrayF64
+
+
+# NOTE: compiled code is cached on disk, otherwise JIT compilation takes several seconds on every startup
+@njit(parallel=True, cache=True)
 def compute_polyline_centers_batch(polylines, masks):
     batch_size, num_polylines, num_points, dim = polylines.shape
     centers = np.empty((batch_size, num_polylines, 3), dtype=np.float32)
@@ -33,7 +43,7 @@ def compute_polyline_centers_batch(polylines, masks):
                 if len(valid_points) > 0:
                     centers[b, i] = valid_points[0, :3]
                 else:
-                    centers[b, i] = np.array([np.nan, np.nan], dtype=np.float32)
+                    centers[b, i] = np.nan
                 continue
 
             diffs = valid_points[1:] - valid_points[:-1]  # (N-1, 3)
@@ -58,6 +68,43 @@ def compute_polyline_centers_batch(polylines, masks):
     return centers
 
 
+def compute_polyline_centers(polylines: NDArrayF32, masks: NDArrayBool) -> NDArrayF32:
+    """Compute centers of arc length of polylines at once, while considering only valid points.
+
+    Args:
+    ----
+        polylines (NDArrayF32): Polylines in shape (..., P, D) where D >= 3.
+        masks (NDArrayBool): Masks of valid points in shape (..., P).
+
+    Returns:
+    -------
+        NDArrayF32: Centers `(x, y, z)` in shape (..., 3), in the same dtype as polylines. The first valid point is
+            returned for polylines with less than 2 valid points, and NaN for polylines without valid points.
+
+    """
+    # NOTE: valid points are moved to the front in the original order, then padded points have zero lengths
+    order = np.argsort(~masks, axis=-1, kind="stable")
+    points = np.take_along_axis(polylines[..., :3], order[..., None], axis=-2)
+    num_valid = masks.sum(axis=-1)
+
+    segment_lengths = np.linalg.norm(np.diff(points, axis=-2), axis=-1)
+    segment_lengths[np.arange(1, points.shape[-2]) >= num_valid[..., None]] = 0
+    cumulative_length = np.zeros(masks.shape, dtype=segment_lengths.dtype)
+    np.cumsum(segment_lengths, axis=-1, out=cumulative_length[..., 1:])
+
+    mid_length = cumulative_length[..., -1:] / 2
+    idx = np.maximum((cumulative_length < mid_length).sum(axis=-1, keepdims=True) - 1, 0)
+    idx = np.minimum(idx, points.shape[-2] - 2)
+    start, end = (np.take_along_axis(cumulative_length, i, axis=-1) for i in (idx, idx + 1))
+    den = end - start
+    t = np.where(np.abs(den) > 1e-6, (mid_length - start) / np.where(den == 0, 1, den), 0)
+    p0, p1 = (np.take_along_axis(points, i[..., None], axis=-2)[..., 0, :] for i in (idx, idx + 1))
+    centers = (1 - t) * p0 + t * p1
+
+    centers = np.where((num_valid == 1)[..., None], points[..., 0, :], centers)
+    return np.where((num_valid == 0)[..., None], np.nan, centers).astype(polylines.dtype, copy=False)
+
+
 @TRANSFORMS.register()
 class TargetCentricPolyline:
     """Transform polylines from map coords to target centric coords.
@@ -80,8 +127,10 @@ class TargetCentricPolyline:
         self,
         num_polylines: int = 768,
         num_points: int = 20,
-        break_distance: float = 1.0,
+        break_distance: float | None = 1.0,
         center_offset: tuple[float, float] = (30.0, 0.0),
+        reuse_radius: float = 0.0,
+        max_reused_targets: int = 64,
     ) -> None:
         """Construct instance.
 
@@ -89,30 +138,50 @@ class TargetCentricPolyline:
         ----
             num_polylines (int, optional): Max number of polylines can be contained. Defaults to 768.
             num_points (int, optional): Max number of points, which each polyline can contain. Defaults to 20.
-            break_distance (float, optional): The distance threshold to separate polyline into two polylines.
-                Defaults to 1.0.
+            break_distance (float | None, optional): The distance threshold to separate polyline into two polylines.
+                If None, polylines are separated at the first point of each segment, whose direction is zeros.
+                This is required for maps resampled with intervals longer than the threshold. Defaults to 1.0.
             center_offset (tuple[float, float], optional): The offset position. Defaults to (30.0, 0.0).
+            reuse_radius (float, optional): Radius in [m] where the last selection of polylines is reused while the
+                offset position of each target stays, and only the transform into target centric coords is applied.
+                0 to select polylines on every call. Defaults to 0.0.
+            max_reused_targets (int, optional): Max number of targets whose selections are kept for the reuse, the
+                least recently used one is discarded first. Defaults to 64.
 
         """
         self.num_polylines = num_polylines
         self.num_points = num_points
         self.break_distance = break_distance
         self.center_offset = center_offset
+        self.reuse_radius = reuse_radius
+        self.max_reused_targets = max_reused_targets
+
+        # last selection of each target in map coords, which is reused while the target stays within `reuse_radius`
+        self._selected_map: NDArrayF32 | None = None
+        self._selections: OrderedDict[Hashable, _Selection] = OrderedDict()
+        self.num_selected = 0
+        self.num_reused = 0
+
+    def warmup(self) -> None:
+        """Compile numba functions before the first call, which loads the compiled code from the cache if exists."""
+        polylines = np.zeros((1, 1, self.num_points, 3), dtype=np.float32)
+        polylines_mask = np.ones((1, 1, self.num_points), dtype=np.bool_)
+        compute_polyline_centers_batch(polylines, polylines_mask)
 
     def _do_transform(
         self,
         polylines: NDArrayF32,
         polylines_mask: NDArrayBool,
-        current_target: AgentState,
+        current_target: AgentState | AgentTrajectory,
         num_target: int,
     ) -> tuple[NDArrayF32, NDArrayBool]:
         """Transform polylines from map coords to target centric coords.
 
         Args:
         ----
-            polylines (NDArrayF32): in shape (K, P, Dp).
-            polylines_mask (NDArrayBool): in shape (K, P).
-            current_target (Trajectory): in shape (B, Da).
+            polylines (NDArrayF32): in shape (B, K, P, Dp).
+            polylines_mask (NDArrayBool): in shape (B, K, P).
+            current_target (AgentState | AgentTrajectory): Single target state, or target states in shape (B, Da).
 
         Returns:
         -------
@@ -122,7 +191,7 @@ class TargetCentricPolyline:
 
         """
 
-        polylines[..., :3] -= current_target.xyz
+        polylines[..., :3] -= np.reshape(current_target.xyz, (num_target, 1, 1, 3))
         polylines[..., :2] = rotate_along_z(
             points=polylines[..., 0:2].reshape(num_target, -1, 2),
             angle=-current_target.yaw,
@@ -140,94 +209,181 @@ class TargetCentricPolyline:
         return polylines, polylines_mask
 
     @staticmethod
-    def _load_polyline_center(polyline, mask):
-        """
-        Finds the center of arc length for a polyline while considering only valid points.
+    def _load_polyline_center(polyline: NDArrayF32, mask: NDArrayBool) -> NDArrayF32:
+        """Find the center of arc length for a polyline while considering only valid points.
 
         Args:
-            polyline (np.ndarray): A (20, 7) array representing a polyline.
-            mask (np.ndarray): A (20,) boolean array indicating valid points.
+        ----
+            polyline (NDArrayF32): Polyline in shape (P, D).
+            mask (NDArrayBool): Mask of valid points in shape (P,).
 
         Returns:
-            np.ndarray: The interpolated (x, y) coordinate of the arc-length center.
+        -------
+            NDArrayF32: Center `(x, y, z)` in shape (3,), the first valid point if it has less than 2 valid points,
+                or NaN if no points are valid.
+
         """
-        # Extract valid points
-        valid_points = polyline[mask, :3]  # Shape (N_valid, 3) where N_valid ≤ 20
+        return compute_polyline_centers(polyline[None], mask[None])[0]
+
+    def _generate_batch(self, polylines: NDArrayF32) -> tuple[NDArrayF32, NDArrayBool]:
+        """Generate batch polylines from points shape with (N, Dp) to (K, P, Dp).
 
-        if len(valid_points) < 2:
-            # If less than 2 valid points, return the first valid point or NaN if none
-            return valid_points[0] if len(valid_points) > 0 else np.array([np.nan, np.nan])
+        Points are separated into segments by `break_distance`, and each segment is split into chunks of `num_points`
+        points. Then, all points are scattered into chunks at once.
 
-        # Compute segment distances
-        segment_lengths = np.linalg.norm(np.diff(valid_points, axis=0), axis=1)
+        Args:
+        ----
+            polylines (NDArrayF32): Points, in shape (N, D).
+
+        Returns:
+        -------
+            tuple[NDArrayF32, NDArrayBool]: Separated polylines and its mask.
+                `ret_polylines`: Batch polylines, in shape (K, P, Dp).
+                `ret_polylines_mask`: Mask of polylines, in shape (K, P).
 
-        # Compute cumulative arc length
-        cumulative_length = np.insert(np.cumsum(segment_lengths), 0, 0)
+        """
+        num_points, point_dim = polylines.shape
+        if self.break_distance is None:
+            # NOTE: directions `(dx, dy, dz)` of the first points of segments are zeros
+            is_start = np.all(polylines[:, 3:6] == 0, axis=-1)
+        else:
+            distances = np.linalg.norm(np.diff(polylines[:, 0:2], axis=0), axis=-1)
+            is_start = np.concatenate(([False], distances > self.break_distance))
+        is_start[0] = True
+
+        # index of each point in its segment, which is counted from the last start
+        indices = np.arange(num_points)
+        segment_starts = np.maximum.accumulate(np.where(is_start, indices, 0))
+        positions = indices - segment_starts
+
+        # a new chunk begins at the start of each segment and every `num_points` points in the segment
+        chunk_idxs = np.cumsum(positions % self.num_points == 0) - 1
+        ret_polylines = np.zeros((chunk_idxs[-1] + 1, self.num_points, point_dim), dtype=np.float32)
+        ret_polylines_mask = np.zeros((chunk_idxs[-1] + 1, self.num_points), dtype=np.bool_)
+        ret_polylines[chunk_idxs, positions % self.num_points] = polylines
+        ret_polylines_mask[chunk_idxs, positions % self.num_points] = True
 
-        # Find the total length and midpoint
-        total_length = cumulative_length[-1]
-        mid_length = total_length / 2
+        return ret_polylines, ret_polylines_mask
 
-        # Find the segment where the midpoint length falls
-        idx = np.searchsorted(cumulative_length, mid_length) - 1
+    def _center_positions(self, target_state: AgentState | AgentTrajectory, num_target: int) -> NDArrayF32:
+        """Return positions offset by `center_offset` from targets, where polylines are selected around.
 
-        # Linear interpolation
-        den = cumulative_length[idx + 1] - cumulative_length[idx]
-        t = (mid_length - cumulative_length[idx]) / den if abs(den) > 1e-6 else 0
-        center_point = (1 - t) * valid_points[idx] + t * valid_points[idx + 1]
+        Args:
+        ----
+            target_state (AgentState | AgentTrajectory): Single target state, or target states in shape (B, Da).
+            num_target (int): Number of targets.
 
-        return center_point
+        Returns:
+        -------
+            NDArrayF32: Positions in shape (B, 2).
 
-    def _generate_batch(self, polylines: NDArrayF32) -> tuple[NDArrayF32, NDArrayBool]:
-        """Generate batch polylines from points shape with (N, Dp) to (K, P, Dp).
+        """
+        center_offset: NDArrayF32 = np.array(self.center_offset, dtype=np.float32)[None, :].repeat(
+            num_target,
+            axis=0,
+        )
+        center_offset = rotate_along_z(
+            points=center_offset.reshape(num_target, 1, 2),
+            angle=target_state.yaw,
+        ).reshape(num_target, 2)
+        return target_state.xy + center_offset
+
+    def _select_indices(self, polyline_center: NDArrayF32, center_pos: NDArrayF32) -> NDArrayI64:
+        """Return indices of `num_polylines` polylines closest to each position.
 
         Args:
         ----
-            polylines (NDArrayF32): Points, in shape (N, D).
+            polyline_center (NDArrayF32): Centers of polylines in shape (K, 2).
+            center_pos (NDArrayF32): Positions in shape (B, 2).
 
         Returns:
         -------
-            tuple[NDArrayF32, NDArrayBool]: Separated polylines and its mask.
-                `ret_polylines`: Batch polylines, in shape (K, P, Dp).
-                `ret_polylines_mask`: Mask of polylines, in shape (K, P).
+            NDArrayI64: Indices in shape (B, num_polylines).
 
         """
-        point_dim = polylines.shape[-1]
-        polyline_shifts = np.roll(polylines, shift=1, axis=0)
-        buffer = np.concatenate((polylines[:, 0:2], polyline_shifts[:, 0:2]), axis=-1)
-        buffer[0, 2:4] = buffer[0, 0:2]
-
-        break_idxs: NDArrayI64 = (
-            np.linalg.norm(buffer[:, 0:2] - buffer[:, 2:4], axis=-1) > self.break_distance
-        ).nonzero()[0]
-        polyline_list: list[NDArrayF32] = np.array_split(polylines, break_idxs, axis=0)
-
-        ret_polylines, ret_polylines_mask = [], []
-
-        def append_single_polyline(new_polyline: NDArrayF32) -> None:
-            num_new_polyline = len(new_polyline)
-            cur_polyline = np.zeros((self.num_points, point_dim), dtype=np.float32)
-            cur_valid_mask = np.zeros((self.num_points), dtype=np.int32)
-            cur_polyline[:num_new_polyline] = new_polyline
-            cur_valid_mask[:num_new_polyline] = 1
-            ret_polylines.append(cur_polyline)
-            ret_polylines_mask.append(cur_valid_mask)
-
-        for line in polyline_list:
-            num_pts = len(line)
-            if num_pts <= 0:
-                continue
-            for idx in range(0, num_pts, self.num_points):
-                append_single_polyline(line[idx: idx + self.num_points])
+        distances: NDArrayF32 = np.linalg.norm(
+            center_pos[:, None, :] - polyline_center[None, ...], axis=-1)
+        return np.argsort(distances, axis=1)[:, : self.num_polylines]
 
-        ret_polylines = np.stack(ret_polylines, axis=0)
-        ret_polylines_mask = np.stack(ret_polylines_mask, axis=0) > 0
+    def _reuse_selection(
+        self,
+        batch_polylines: NDArrayF32,
+        batch_polylines_mask: NDArrayBool,
+        polyline_center: NDArrayF32 | None,
+        target_state: AgentState | AgentTrajectory,
+        num_target: int,
+        target_keys: Sequence[Hashable] | None = None,
+    ) -> tuple[NDArrayF32, NDArrayBool, NDArrayF64]:
+        """Return polylines selected for targets in map coords, reusing the last selection of each target if it stays.
 
-        return ret_polylines, ret_polylines_mask
+        Selections are cached for each target key, so that callers predicting different targets, e.g. the ego and
+        tracked objects, do not discard selections of each other. Polylines are selected again only for targets whose
+        offset positions have moved more than `reuse_radius` from their last selections. All selections are discarded
+        if batch polylines change.
+
+        Args:
+        ----
+            batch_polylines (NDArrayF32): All polylines in shape (K, P, Dp).
+            batch_polylines_mask (NDArrayBool): Mask of all polylines in shape (K, P).
+            polyline_center (NDArrayF32 | None): Centers of all polylines in shape (K, 2),
+                which is required if there are more than `num_polylines` polylines.
+            target_state (AgentState | AgentTrajectory): Single target state, or target states in shape (B, Da).
+            num_target (int): Number of targets.
+            target_keys (Sequence[Hashable] | None, optional): Keys of targets, e.g. uuids. Defaults to None, which
+                uses indices of targets.
 
-    def __call__(self, static_map: AWMLStaticMap, target_state: AgentState, num_target: int,  batch_polylines=None, batch_polylines_mask=None, polyline_center: NDArrayF32 | None = None) -> dict:
+        Returns:
+        -------
+            tuple[NDArrayF32, NDArrayBool, NDArrayF64]: Selected polylines in shape (B, L, P, Dp), their masks in shape
+                (B, L, P) and their centers `(x, y, z)` in map coords in shape (B, L, 3).
+
+        """
+        center_pos = self._center_positions(target_state, num_target)
+        if self._selected_map is not batch_polylines:
+            self._selected_map = batch_polylines
+            self._selections.clear()
+
+        keys = range(num_target) if target_keys is None else target_keys
+        selections = [self._selections.get(key) for key in keys]
+        is_stale = np.array(
+            [
+                selection is None or np.linalg.norm(center_pos[b] - selection.center_pos) > self.reuse_radius
+                for b, selection in enumerate(selections)
+            ],
+        )
+
+        num_stale = int(is_stale.sum())
+        if num_stale > 0:
+            if len(batch_polylines) > self.num_polylines:
+                topk_idxs = self._select_indices(polyline_center, center_pos[is_stale])
+            else:
+                topk_idxs = np.arange(len(batch_polylines))[None, :].repeat(num_stale, axis=0)
+            polylines, polylines_mask = batch_polylines[topk_idxs], batch_polylines_mask[topk_idxs]
+            # NOTE: centers are computed in double precision, because they are in map coords
+            centers = compute_polyline_centers(polylines[..., :3].astype(np.float64), polylines_mask)
+            for i, b in enumerate(np.flatnonzero(is_stale)):
+                selections[b] = _Selection(center_pos[b].copy(), polylines[i], polylines_mask[i], centers[i])
+
+        for key, selection in zip(keys, selections):
+            self._selections[key] = selection
+            self._selections.move_to_end(key)
+        while len(self._selections) > self.max_reused_targets:
+            self._selections.popitem(last=False)
+        self.num_selected += num_stale
+        self.num_reused += num_target - num_stale
+        return (
+            np.stack([selection.polylines for selection in selections]),
+            np.stack([selection.polylines_mask for selection in selections]),
+            np.stack([selection.centers for selection in selections]),
+        )
+
+    def __call__(self, static_map: AWMLStaticMap, target_state: AgentState | AgentTrajectory, num_target: int,  batch_polylines=None, batch_polylines_mask=None, polyline_center: NDArrayF32 | None = None, target_keys: Sequence[Hashable] | None = None) -> dict:
         """Run transformation.
 
+        Polylines are selected and transformed for all targets at once, where `target_state` is
+        `AgentTrajectory` in shape (B, Da) for multiple targets. If `reuse_radius` is positive, selections are cached
+        for each of `target_keys`, e.g. uuids, or for each index of targets if it is None.
+
         Args:
         ----
             info (dict): Source info.
@@ -242,28 +398,18 @@ class TargetCentricPolyline:
             all_polylines: NDArrayF32 = static_map.get_all_polyline(as_array=True, full=True)
             batch_polylines, batch_polylines_mask = self._generate_batch(all_polylines)
 
+        if len(batch_polylines) > self.num_polylines and polyline_center is None:
+            polyline_center = compute_polyline_centers(batch_polylines, batch_polylines_mask)[..., :2]
+
         ret_polylines: NDArrayF32
         ret_polylines_mask: NDArrayBool
-        if len(batch_polylines) > self.num_polylines:
-            if polyline_center is None:
-                polyline_center: NDArrayF32 = np.array([
-                    self._load_polyline_center(polyline, mask)
-                    for polyline, mask in zip(batch_polylines, batch_polylines_mask)
-                ])[..., :2]
-
-            center_offset: NDArrayF32 = np.array(self.center_offset, dtype=np.float32)[None, :].repeat(
-                num_target,
-                axis=0,
-            )
-            center_offset = rotate_along_z(
-                points=center_offset.reshape(num_target, 1, 2),
-                angle=target_state.yaw,
-            ).reshape(num_target, 2)
-
-            center_pos = target_state.xy + center_offset
-            distances: NDArrayF32 = np.linalg.norm(
-                center_pos[:, None, :] - polyline_center[None, ...], axis=-1)
-            topk_idxs = np.argsort(distances, axis=1)[:, : self.num_polylines]
+        if self.reuse_radius > 0.0:
+            # NOTE: selections are stacked into new arrays, so the cache is not modified by `_do_transform`
+            ret_polylines, ret_polylines_mask, selected_centers = self._reuse_selection(
+                batch_polylines, batch_polylines_mask, polyline_center, target_state, num_target, target_keys)
+        elif len(batch_polylines) > self.num_polylines:
+            center_pos = self._center_positions(target_state, num_target)
+            topk_idxs = self._select_indices(polyline_center, center_pos)
             ret_polylines = batch_polylines[topk_idxs]
             ret_polylines_mask = batch_polylines_mask[topk_idxs]
         else:
@@ -275,6 +421,15 @@ class TargetCentricPolyline:
         info["polylines"] = ret_polylines
         info["polylines_mask"] = ret_polylines_mask > 0
 
-        info["polyline_centers"] = compute_polyline_centers_batch(
-            ret_polylines, ret_polylines_mask)
+        if self.reuse_radius > 0.0:
+            # NOTE: arc-length centers are invariant to the rigid transform, so centers of the selection are reused
+            polyline_centers = selected_centers - np.reshape(target_state.xyz, (num_target, 1, 3))
+            polyline_centers[..., :2] = rotate_along_z(points=polyline_centers[..., :2], angle=-target_state.yaw)
+            info["polyline_centers"] = polyline_centers.astype(np.float32)
+        else:
+            # NOTE: numba specializes on dtypes and memory layouts, which must be same as `warmup`
+            info["polyline_centers"] = compute_polyline_centers_batch(
+                np.ascontiguousarray(ret_polylines, dtype=np.float32),
+                np.ascontiguousarray(info["polylines_mask"]),
+            )
         return info, batch_polylines, batch_polylines_mask, polyline_center
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple, Sequence
+
+import numpy as np
+
+from autoware_mtr.geometry import rotate_along_z
+
+from .polyline import TargetCentricPolyline
+
+if TYPE_CHECKING:
+    from awml_pred.typing import NDArray, NDArrayBool, NDArrayF32, NDArrayF64, NDArrayI64
+
+
+__all__ = ("Scenario", "ScenarioPreprocessor", "embed_agents", "to_world_coords")
+
+# NOTE: same layout as `AgentTrajectory`, (x, y, z, length, width, height, yaw, vx, vy, is_valid)
+XYZ_IDX = slice(0, 3)
+SIZE_IDX = slice(3, 6)
+YAW_IDX = 6
+IS_VALID_IDX = 9
+NUM_AGENT_DIM = 10
+
+NUM_AGENT_TYPE = 3
+
+
+@dataclass
+class Scenario:
+    """A class represents an offline scenario in map coords, which is predicted without ROS.
+
+    Attributes
+    ----------
+        scenario_id (str): Scenario id, which is used as the output file name.
+        agents (NDArrayF64): Past trajectories of agents in the shape of (N, T, 10), which has the same layout as
+            `AgentTrajectory`. This is kept in double precision as the node does.
+        label_ids (NDArrayI64): Label ids of agents in the shape of (N,).
+        timestamps (NDArrayF32): Timestamps of the past trajectories in [s] in the shape of (T,).
+        target_indices (NDArrayI64): Indices of target agents in the shape of (B,).
+        polylines (NDArrayF32 | None): Map points `(x, y, z, dx, dy, dz, type_id)` in the shape of (M, 7),
+            None if the scenario is on the map shared by scenarios.
+        ego_index (int): Index of the ego agent, which is flagged in the frame of each target.
+
+    """
+
+    scenario_id: str
+    agents: NDArrayF64
+    label_ids: NDArrayI64
+    timestamps: NDArrayF32
+    target_indices: NDArrayI64
+    polylines: NDArrayF32 | None = None
+    ego_index: int = 0
+
+    def __post_init__(self) -> None:
+        assert self.agents.ndim == 3 and self.agents.shape[-1] == NUM_AGENT_DIM
+        assert len(self.agents) == len(self.label_ids)
+        assert self.agents.shape[1] == len(self.timestamps)
+
+    @property
+    def num_target(self) -> int:
+        return len(self.target_indices)
+
+    @classmethod
+    def load(cls, filepath: str) -> Scenario:
+        """Load a scenario from `.npz` file.
+
+        Args:
+        ----
+            filepath (str): Scenario file path.
+
+        Returns:
+        -------
+            Scenario: Loaded scenario.
+
+        """
+        with np.load(filepath) as data:
+            return cls(
+                scenario_id=str(data["scenario_id"]),
+                agents=data["agents"].astype(np.float64),
+                label_ids=data["label_ids"].astype(np.int64),
+                timestamps=data["timestamps"].astype(np.float32),
+                target_indices=data["target_indices"].astype(np.int64),
+                polylines=data["polylines"].astype(np.float32) if "polylines" in data else None,
+                ego_index=int(data["ego_index"]) if "ego_index" in data else 0,
+            )
+
+    def save(self, filepath: str) -> None:
+        """Save the scenario to `.npz` file.
+
+        Args:
+        ----
+            filepath (str): Scenario file path.
+
+        """
+        arrays = {
+            "scenario_id": np.array(self.scenario_id),
+            "agents": self.agents,
+            "label_ids": self.label_ids,
+            "timestamps": self.timestamps,
+            "target_indices": self.target_indices,
+            "ego_index": np.array(self.ego_index),
+        }
+        if self.polylines is not None:
+            arrays["polylines"] = self.polylines
+        np.savez_compressed(filepath, **arrays)
+
+
+class _TargetState(NamedTuple):
+    """Target states, which are passed to `TargetCentricPolyline` as well as `AgentTrajectory`."""
+
+    xyz: NDArray
+    yaw: NDArray
+
+    @property
+    def xy(self) -> NDArray:
+        return self.xyz[..., :2]
+
+
+class ScenarioPreprocessor:
+    """Preprocess scenarios into inputs of `MTR` in the same way as the node, vectorized over targets and agents.
+
+    Each target is centered on itself, and agents are embedded by `embed_agents`.
+    """
+
+    def __init__(
+        self,
+        intention_points: NDArrayF32,
+        label_ids: Sequence[int],
+        polylines: NDArrayF32 | None = None,
+        polyline_transform: TargetCentricPolyline | None = None,
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            intention_points (NDArrayF32): Intention points in the shape of (L, M, 2), stacked in the order of
+                `label_ids`.
+            label_ids (Sequence[int]): Label ids of targets.
+            polylines (NDArrayF32 | None, optional): Map points in the shape of (M, 7) shared by scenarios.
+                Defaults to None.
+            polyline_transform (TargetCentricPolyline | None, optional): Polyline transform.
+                Defaults to `TargetCentricPolyline()`.
+
+        """
+        self.intention_points = intention_points
+        self.label_indices = {label_id: i for i, label_id in enumerate(label_ids)}
+        self.polyline_transform = polyline_transform or TargetCentricPolyline()
+        self._shared_map = self._generate_map(polylines) if polylines is not None else None
+
+    def _generate_map(self, polylines: NDArrayF32) -> tuple[NDArrayF32, NDArrayBool, NDArrayF32 | None]:
+        batch_polylines, batch_polylines_mask = self.polyline_transform._generate_batch(polylines)
+        return batch_polylines, batch_polylines_mask, None
+
+    def __call__(self, scenario: Scenario) -> tuple[dict[str, NDArray], NDArrayF64]:
+        """Run preprocess.
+
+        Args:
+        ----
+            scenario (Scenario): Scenario.
+
+        Returns:
+        -------
+            tuple[dict[str, NDArray], NDArrayF64]: Inputs keyed by `INPUT_NAMES`, and current states of targets
+                in the shape of (B, 10).
+
+        """
+        if scenario.polylines is not None:
+            batch_polylines, batch_polylines_mask, polyline_center = self._generate_map(scenario.polylines)
+        elif self._shared_map is not None:
+            batch_polylines, batch_polylines_mask, polyline_center = self._shared_map
+        else:
+            msg = f"No map is given for {scenario.scenario_id}"
+            raise ValueError(msg)
+
+        current_targets = scenario.agents[scenario.target_indices, -1]
+        target_state = _TargetState(xyz=current_targets[:, XYZ_IDX], yaw=current_targets[:, YAW_IDX])
+        polyline_info, *_, polyline_center = self.polyline_transform(
+            None,
+            target_state,
+            scenario.num_target,
+            batch_polylines,
+            batch_polylines_mask,
+            polyline_center,
+        )
+        if scenario.polylines is None:
+            # polyline centers of the shared map are computed once
+            self._shared_map = (batch_polylines, batch_polylines_mask, polyline_center)
+
+        obj_trajs, obj_trajs_mask, obj_trajs_last_pos = embed_agents(
+            scenario.agents,
+            scenario.label_ids,
+            scenario.timestamps,
+            current_targets,
+            scenario.ego_index,
+        )
+        target_label_ids = scenario.label_ids[scenario.target_indices]
+        label_indices = [self.label_indices.get(label_id, 0) for label_id in target_label_ids]
+        inputs = {
+            "obj_trajs": obj_trajs,
+            "obj_trajs_mask": obj_trajs_mask,
+            "map_polylines": polyline_info["polylines"].astype(np.float32),
+            "map_polylines_mask": polyline_info["polylines_mask"],
+            "map_polylines_center": polyline_info["polyline_centers"].astype(np.float32),
+            "obj_trajs_last_pos": obj_trajs_last_pos,
+            "track_index_to_predict": np.zeros(scenario.num_target, dtype=np.int32),
+            "intention_points": self.intention_points[label_indices],
+        }
+        return inputs, current_targets
+
+
+def embed_agents(
+    agents: NDArrayF64,
+    label_ids: NDArrayI64,
+    timestamps: NDArrayF64,
+    current_targets: NDArrayF64,
+    ego_index: int | None = None,
+) -> tuple[NDArrayF32, NDArrayBool, NDArrayF32]:
+    """Embed agents in each target frame as `get_embedded_inputs` of the node, vectorized over targets and agents.
+
+    Speeds are recalculated by the central difference of positions along headings. For each target, agents are sorted
+    from the closest to the target, so that the target comes first.
+
+    Args:
+    ----
+        agents (NDArrayF64): Past trajectories of agents in the shape of (N, T, 10), which has the same layout as
+            `AgentTrajectory`.
+        label_ids (NDArrayI64): Label ids of agents in the shape of (N,).
+        timestamps (NDArrayF64): Timestamps of the past trajectories in [s] in the shape of (T,), or (N, T) for
+            timestamps of each agent.
+        current_targets (NDArrayF64): Current states of targets in the shape of (B, 10).
+        ego_index (int | None, optional): Index of the ego agent, which is flagged in the frame of each target.
+            Defaults to None, which flags no agent.
+
+    Returns:
+    -------
+        tuple[NDArrayF32, NDArrayBool, NDArrayF32]: Embedded agents in the shape of (B, N, T, 29),
+            their mask in the shape of (B, N, T), and the last positions in the shape of (B, N, 3).
+
+    """
+    num_agent, num_time, _ = agents.shape
+    num_target = len(current_targets)
+
+    # speeds by the central difference
+    xy = agents[..., 0:2]
+    prev_xy = np.concatenate((xy[:, :1], xy[:, :-1]), axis=1)
+    next_xy = np.concatenate((xy[:, 1:], xy[:, -1:]), axis=1)
+    time_diff = np.concatenate((timestamps[..., 1:], timestamps[..., -1:]), axis=-1) - np.concatenate(
+        (timestamps[..., :1], timestamps[..., :-1]),
+        axis=-1,
+    )
+    time_diff = np.broadcast_to(time_diff, (num_agent, num_time))
+    speed = np.divide(
+        np.linalg.norm(next_xy - prev_xy, axis=-1),
+        time_diff,
+        out=np.zeros((num_agent, num_time)),
+        where=time_diff != 0,
+    )
+
+    # sort agents from the closest to the furthest for each target
+    distances = np.linalg.norm(agents[None, :, -1, XYZ_IDX] - current_targets[:, None, XYZ_IDX], axis=-1)
+    order = np.argsort(distances, axis=1, kind="stable")  # (B, N)
+    sorted_agents = agents[order]  # (B, N, T, D)
+    sorted_speed = speed[order]
+    sorted_label_ids = label_ids[order]
+
+    # transform to each target frame
+    xyz = sorted_agents[..., XYZ_IDX] - current_targets[:, None, None, XYZ_IDX]
+    xyz[..., :2] = rotate_along_z(
+        points=xyz[..., :2].reshape(num_target, -1, 2),
+        angle=-current_targets[:, YAW_IDX],
+    ).reshape(num_target, num_agent, num_time, 2)
+    yaw = sorted_agents[..., YAW_IDX] - current_targets[:, None, None, YAW_IDX]
+    vxy = sorted_speed[..., None] * np.stack((np.cos(yaw), np.sin(yaw)), axis=-1)
+
+    type_onehot = np.zeros((num_target, num_agent, num_time, NUM_AGENT_TYPE + 2), dtype=np.float32)
+    type_onehot[...] = np.eye(NUM_AGENT_TYPE + 2, dtype=np.float32)[sorted_label_ids][:, :, None]
+    type_onehot[:, 0, :, NUM_AGENT_TYPE] = 1  # target itself
+    if ego_index is not None:
+        type_onehot[np.arange(num_target), np.argmax(order == ego_index, axis=1), :, NUM_AGENT_TYPE + 1] = 1
+
+    time_embed = np.zeros((num_target, num_agent, num_time, num_time + 1), dtype=np.float32)
+    time_embed[..., np.arange(num_time), np.arange(num_time)] = 1
+    time_embed[..., -1] = np.arange(0, num_time * 0.1, 0.1, dtype=np.float32)[:num_time]
+
+    accel = np.diff(vxy, axis=2, prepend=vxy[:, :, :1]) / 0.1
+    accel[:, :, 0] = accel[:, :, 1]
+
+    obj_trajs = np.concatenate(
+        (
+            xyz,
+            sorted_agents[..., SIZE_IDX],
+            type_onehot,
+            time_embed,
+            np.sin(yaw)[..., None],
+            np.cos(yaw)[..., None],
+            vxy,
+            accel,
+        ),
+        axis=-1,
+        dtype=np.float32,
+    )
+    obj_trajs_mask = sorted_agents[..., IS_VALID_IDX] > 0
+    return obj_trajs, obj_trajs_mask, np.ascontiguousarray(xyz[:, :, -1], dtype=np.float32)
+
+
+def to_world_coords(
+    pred_scores: NDArrayF32,
+    pred_trajs: NDArrayF32,
+    current_targets: NDArrayF64,
+) -> tuple[NDArrayF32, NDArrayF32]:
+    """Transform predictions from each target frame to map coords, and sort them by scores.
+
+    Args:
+    ----
+        pred_scores (NDArrayF32): Predicted scores in the shape of (B, M).
+        pred_trajs (NDArrayF32): Predicted trajectories in the shape of (B, M, T, 7).
+        current_targets (NDArrayF64): Current states of targets in the shape of (B, 10).
+
+    Returns:
+    -------
+        tuple[NDArrayF32, NDArrayF32]: Transformed and sorted predictions.
+
+    """
+    num_target, num_mode, num_future, num_feat = pred_trajs.shape
+    pred_trajs = rotate_along_z(
+        points=pred_trajs.reshape(num_target, num_mode * num_future, num_feat),
+        angle=current_targets[:, YAW_IDX],
+    ).reshape(num_target, num_mode, num_future, num_feat)
+    pred_trajs[..., 0:2] += current_targets[:, None, None, 0:2]
+
+    sort_indices = np.argsort(-pred_scores, axis=1)
+    pred_scores = np.take_along_axis(pred_scores, sort_indices, axis=1)
+    pred_trajs = np.take_along_axis(pred_trajs, sort_indices[..., None, None], axis=1)
+    return pred_scores, pred_trajs
@@ -0,0 +1,297 @@
+"""Tiled map store, which loads polylines around targets from tiles on disk instead of keeping the whole map.
+
+Polylines are precomputed offline by `TargetCentricPolyline` and partitioned into square tiles by their centers, so
+that each tile is a `.npz` file of batch polylines, their masks and centers. At runtime, tiles within a radius of
+targets are kept in an LRU cache bounded by the number of tiles, and tiles ahead of the ego in the direction of travel
+are prefetched by a background thread.
+
+Example:
+-------
+    $ python -m utils.tiled_map lanelet2_map.osm tiles/ --tile-size 200
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import os.path as osp
+import queue
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .polyline import TargetCentricPolyline, compute_polyline_centers
+
+if TYPE_CHECKING:
+    from awml_pred.typing import NDArray, NDArrayBool, NDArrayF32
+
+__all__ = ("TiledMap", "build_tiles")
+
+# file of the tile size, the number of points of each polyline and the number of polylines of each tile
+TILE_INDEX_FILE = "index.json"
+
+# names of arrays in each tile, which are in the same order as returned by `TiledMap.update`
+TILE_ARRAY_NAMES = ("polylines", "polylines_mask", "polyline_centers")
+
+TileKey = tuple[int, int]
+
+
+def _tile_name(key: TileKey) -> str:
+    return f"{key[0]}_{key[1]}"
+
+
+def build_tiles(
+    points: NDArrayF32,
+    directory: str,
+    tile_size: float = 200.0,
+    transform: TargetCentricPolyline | None = None,
+) -> dict[str, int]:
+    """Partition polylines of the map into tiles, and write them to the directory.
+
+    Args:
+    ----
+        points (NDArrayF32): Map points `(x, y, z, dx, dy, dz, type_id)` in shape (N, 7),
+            which is returned by `AWMLStaticMap.get_all_polyline(as_array=True, full=True)`.
+        directory (str): Output directory.
+        tile_size (float, optional): Side length of each tile in [m]. Defaults to 200.0.
+        transform (TargetCentricPolyline | None, optional): Transform which separates points into polylines.
+            Defaults to `TargetCentricPolyline()`.
+
+    Returns:
+    -------
+        dict[str, int]: Number of polylines of each tile keyed by its name.
+
+    """
+    transform = transform or TargetCentricPolyline()
+    polylines, polylines_mask = transform._generate_batch(points)
+    polyline_centers = compute_polyline_centers(polylines, polylines_mask)[..., :2]
+
+    keys = np.floor(polyline_centers / tile_size).astype(np.int64)
+    # NOTE: lexsort is stable, so that polylines in each tile are in the original order
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    unique_keys, starts = np.unique(keys[order], axis=0, return_index=True)
+
+    os.makedirs(directory, exist_ok=True)
+    tiles: dict[str, int] = {}
+    for key, indices in zip(unique_keys, np.split(order, starts[1:])):
+        name = _tile_name(tuple(key))
+        arrays = (polylines[indices], polylines_mask[indices], polyline_centers[indices])
+        np.savez(osp.join(directory, f"{name}.npz"), **dict(zip(TILE_ARRAY_NAMES, arrays)))
+        tiles[name] = len(indices)
+
+    with open(osp.join(directory, TILE_INDEX_FILE), "w") as f:
+        json.dump({"tile_size": tile_size, "num_points": transform.num_points, "tiles": tiles}, f)
+    return tiles
+
+
+class TiledMap:
+    """Map store of tiles around targets, which is bounded by the number of tiles in memory.
+
+    Tiles within `radius` of any target are required and loaded on the caller thread if they are not cached yet.
+    Tiles within `radius` of the point `prefetch_distance` ahead of the ego are loaded by the background thread. Cached
+    tiles are evicted from the least recently required one, except of tiles required currently.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        radius: float = 300.0,
+        max_tiles: int = 64,
+        prefetch_distance: float = 100.0,
+    ) -> None:
+        """Construct instance.
+
+        Args:
+        ----
+            directory (str): Directory of tiles written by `build_tiles`.
+            radius (float, optional): Radius around targets where polylines are required in [m]. Defaults to 300.0.
+            max_tiles (int, optional): Max number of cached tiles, which is exceeded only if more tiles are required.
+                Defaults to 64.
+            prefetch_distance (float, optional): Distance ahead of the ego where tiles are prefetched in [m].
+                Defaults to 100.0.
+
+        """
+        with open(osp.join(directory, TILE_INDEX_FILE)) as f:
+            index = json.load(f)
+        self.directory = directory
+        self.tile_size: float = index["tile_size"]
+        self.num_points: int = index["num_points"]
+        self.radius = radius
+        self.max_tiles = max_tiles
+        self.prefetch_distance = prefetch_distance
+
+        self._available: set[TileKey] = {tuple(int(v) for v in name.split("_")) for name in index["tiles"]}
+        assert len(self._available) > 0, f"No tiles are found in {directory}"
+        self._cache: OrderedDict[TileKey, tuple[NDArray, ...]] = OrderedDict()
+        self._pending: set[TileKey] = set()
+        self._required: tuple[TileKey, ...] = ()
+        self._merged_keys: tuple[TileKey, ...] = ()
+        self._merged: tuple[NDArrayF32, NDArrayBool, NDArrayF32] | None = None
+        self.num_sync_loads = 0
+        self.num_prefetched = 0
+        self.num_evicted = 0
+
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[TileKey | None] = queue.Queue()
+        self._thread = threading.Thread(target=self._load_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def num_cached(self) -> int:
+        return len(self._cache)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return bytes of cached tiles and merged polylines of required tiles."""
+        with self._lock:
+            arrays = [array for arrays in self._cache.values() for array in arrays]
+        if self._merged is not None:
+            arrays += list(self._merged)
+        return sum(array.nbytes for array in arrays)
+
+    def _tiles_within(self, xy: NDArray, radius: float) -> set[TileKey]:
+        keys: set[TileKey] = set()
+        for x, y in np.reshape(xy, (-1, 2)):
+            for ix in range(math.floor((x - radius) / self.tile_size), math.floor((x + radius) / self.tile_size) + 1):
+                for iy in range(
+                    math.floor((y - radius) / self.tile_size),
+                    math.floor((y + radius) / self.tile_size) + 1,
+                ):
+                    if (ix, iy) not in self._available:
+                        continue
+                    # distance from the point to the closest point in the tile
+                    dx = max(ix * self.tile_size - x, 0.0, x - (ix + 1) * self.tile_size)
+                    dy = max(iy * self.tile_size - y, 0.0, y - (iy + 1) * self.tile_size)
+                    if dx * dx + dy * dy <= radius * radius:
+                        keys.add((ix, iy))
+        return keys
+
+    def _nearest_tile(self, xy: NDArray) -> TileKey:
+        x, y = np.reshape(xy, (-1, 2))[0] / self.tile_size - 0.5
+        return min(self._available, key=lambda key: (key[0] - x) ** 2 + (key[1] - y) ** 2)
+
+    def _load(self, key: TileKey) -> tuple[NDArray, ...]:
+        with np.load(osp.join(self.directory, f"{_tile_name(key)}.npz")) as data:
+            return tuple(data[name] for name in TILE_ARRAY_NAMES)
+
+    def _load_loop(self) -> None:
+        while (key := self._queue.get()) is not None:
+            arrays = self._load(key)
+            with self._lock:
+                self._pending.discard(key)
+                if key not in self._cache:
+                    self._cache[key] = arrays
+                    self.num_prefetched += 1
+                    self._evict()
+
+    def _evict(self) -> None:
+        # NOTE: this must be called with the lock
+        for key in list(self._cache):
+            if len(self._cache) <= self.max_tiles:
+                break
+            if key not in self._required:
+                del self._cache[key]
+                self.num_evicted += 1
+
+    def update(self, xy: NDArray, ego_xy: NDArray, ego_yaw: float) -> tuple[NDArrayF32, NDArrayBool, NDArrayF32]:
+        """Update tiles around targets, and return polylines of required tiles.
+
+        Args:
+        ----
+            xy (NDArray): Positions of targets in shape (B, 2) or (2,).
+            ego_xy (NDArray): Position of the ego in shape (2,), which is not necessarily one of targets.
+            ego_yaw (float): Heading of the ego in [rad], tiles ahead of the ego are prefetched.
+
+        Returns:
+        -------
+            tuple[NDArrayF32, NDArrayBool, NDArrayF32]: Read-only polylines in shape (K, P, 7), their masks in shape
+                (K, P) and centers in shape (K, 2). The same arrays are returned while required tiles are not changed.
+
+        """
+        required = self._tiles_within(xy, self.radius)
+        if len(required) == 0:
+            # NOTE: polylines are never empty, the nearest tile is used if targets are out of the map
+            required = {self._nearest_tile(xy)}
+
+        ahead = np.reshape(ego_xy, (2,)) + self.prefetch_distance * np.array((math.cos(ego_yaw), math.sin(ego_yaw)))
+        prefetch = self._tiles_within(ahead, self.radius) - required
+
+        with self._lock:
+            self._required = tuple(sorted(required))
+            missing = [key for key in self._required if key not in self._cache]
+            for key in prefetch:
+                if key not in self._cache and key not in self._pending:
+                    self._pending.add(key)
+                    self._queue.put(key)
+
+        for key in missing:
+            arrays = self._load(key)
+            with self._lock:
+                self._cache.setdefault(key, arrays)
+            self.num_sync_loads += 1
+
+        with self._lock:
+            for key in self._required:
+                self._cache.move_to_end(key)
+            self._evict()
+            tiles = [self._cache[key] for key in self._required]
+
+        if self._merged is None or self._merged_keys != self._required:
+            merged = tuple(np.concatenate([tile[i] for tile in tiles], axis=0) for i in range(len(TILE_ARRAY_NAMES)))
+            for array in merged:
+                array.flags.writeable = False
+            self._merged = merged
+            self._merged_keys = self._required
+        return self._merged
+
+    def close(self) -> None:
+        """Stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build tiles of polylines from a lanelet map.")
+    parser.add_argument("map", type=str, help="Lanelet map file (.osm), or a .npy file of map points.")
+    parser.add_argument("output", type=str, help="Output directory.")
+    parser.add_argument("--tile-size", type=float, default=200.0, help="Side length of each tile in [m].")
+    parser.add_argument("--num-points", type=int, default=20, help="Max number of points of each polyline.")
+    parser.add_argument(
+        "--break-distance",
+        type=float,
+        default=1.0,
+        help="Distance to separate polylines in [m], 0 to separate them by segments as for simplified map points.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.map.endswith(".npy"):
+        points = np.load(args.map)
+    else:
+        # NOTE: lanelet2 is required only if the map is converted
+        from .lanelet_converter import convert_lanelet
+
+        points = convert_lanelet(args.map).get_all_polyline(as_array=True, full=True)
+
+    transform = TargetCentricPolyline(
+        num_points=args.num_points,
+        break_distance=args.break_distance if args.break_distance > 0.0 else None,
+    )
+    tiles = build_tiles(points, args.output, tile_size=args.tile_size, transform=transform)
+    counts = list(tiles.values())
+    print(
+        f"{sum(counts)} polylines are written to {len(tiles)} tiles in {args.output}, "
+        f"polylines per tile: mean={np.mean(counts):.1f}, max={np.max(counts)}",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Run prediction over offline scenarios with a pool of worker processes.
+
+Each worker loads the model once, pulls chunks of scenario files from a queue, runs preprocess and inference, and
+writes predictions in map coords to `<output>/<scenario_id>.npz`. Weights are shared by workers either with
+`share_memory()` of the model built in the main process, or with the mmap'd checkpoint loaded by each worker.
+
+Example:
+-------
+    $ python -m utils.worker_pool config/mtr.yaml mtr_best.pth scenarios/ --output predictions/ \
+        --intention-point-file data/cluster64_dict.pkl --map lanelet2_map.osm --num-workers 1 2 4 --num-threads 2
+
+If multiple numbers of workers are given, all scenarios are predicted for each of them and the scaling of throughput
+is reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import os.path as osp
+import queue
+import time
+from dataclasses import dataclass
+from glob import glob
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from autoware_mtr.datatype import AgentLabel
+from awml_pred.common import Config, load_checkpoint
+from awml_pred.deploy import build_backend, fuse_for_inference
+from awml_pred.models import build_model
+
+from .load import LoadIntentionPoint
+from .scenario import Scenario, ScenarioPreprocessor, to_world_coords
+
+if TYPE_CHECKING:
+    from awml_pred.typing import Module
+
+__all__ = ("PoolConfig", "run_worker_pool")
+
+# NOTE: environment variables are read by OpenMP/MKL and numba on import in each spawned worker
+THREAD_ENV_NAMES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "NUMBA_NUM_THREADS")
+
+
+@dataclass
+class PoolConfig:
+    """Configuration shared by workers.
+
+    Attributes
+    ----------
+        config (str): Model configuration file.
+        checkpoint (str): Checkpoint file.
+        intention_point_file (str): Intention point file.
+        labels (list[str]): Labels of targets, which are in the order of intention points.
+        output (str): Output directory.
+        map_file (str | None): Lanelet map file shared by scenarios, None if scenarios contain their map.
+        backend (str): Name of the inference backend.
+        num_threads (int): Number of threads of each worker.
+        share_weights (str): How to share weights, `memory` or `mmap`.
+
+    """
+
+    config: str
+    checkpoint: str
+    intention_point_file: str
+    labels: list[str]
+    output: str
+    map_file: str | None = None
+    backend: str = "EagerBackend"
+    num_threads: int = 1
+    share_weights: str = "mmap"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Predict offline scenarios with a pool of worker processes.")
+    parser.add_argument("config", type=str, help="Model configuration file.")
+    parser.add_argument("checkpoint", type=str, help="Checkpoint file.")
+    parser.add_argument("scenarios", type=str, help="Directory of scenario .npz files.")
+    parser.add_argument("--output", type=str, default="predictions", help="Output directory.")
+    parser.add_argument("--intention-point-file", type=str, required=True, help="Intention point file.")
+    parser.add_argument("--labels", type=str, nargs="+", default=["VEHICLE"], help="Labels of targets.")
+    parser.add_argument("--map", type=str, default=None, help="Lanelet map file shared by scenarios.")
+    parser.add_argument("--backend", type=str, default="EagerBackend", help="Name of the inference backend.")
+    parser.add_argument("--num-workers", type=int, nargs="+", default=[1], help="Numbers of workers.")
+    parser.add_argument("--num-threads", type=int, default=1, help="Number of threads of each worker.")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Number of scenarios in each chunk.")
+    parser.add_argument(
+        "--share-weights",
+        type=str,
+        choices=["memory", "mmap"],
+        default="mmap",
+        help="Share weights by share_memory() of the model, or by the mmap'd checkpoint.",
+    )
+    return parser.parse_args()
+
+
+def _load_model(cfg: PoolConfig) -> Module:
+    model = build_model(Config.from_file(cfg.config).model)
+    model, _ = load_checkpoint(model, cfg.checkpoint, mmap=True)
+    return fuse_for_inference(model).eval()
+
+
+def _load_map(map_file: str | None) -> np.ndarray | None:
+    if map_file is None:
+        return None
+    # NOTE: lanelet2 is required only if the map is converted
+    from .lanelet_converter import convert_lanelet
+
+    return convert_lanelet(map_file).get_all_polyline(as_array=True, full=True)
+
+
+def _worker(
+    rank: int,
+    cfg: PoolConfig,
+    model: Module | None,
+    task_queue: mp.Queue,
+    result_queue: mp.Queue,
+) -> None:
+    torch.set_num_threads(cfg.num_threads)
+    if model is None:
+        model = _load_model(cfg)
+    backend = build_backend({"name": cfg.backend, "device": "cpu"}, model)
+
+    intention_points = LoadIntentionPoint(cfg.intention_point_file, cfg.labels)()["intention_points"]
+    preprocess = ScenarioPreprocessor(
+        intention_points,
+        label_ids=[AgentLabel.from_str(label).value for label in cfg.labels],
+        polylines=_load_map(cfg.map_file),
+    )
+
+    while (chunk := task_queue.get()) is not None:
+        preprocess_time, inference_time = 0.0, 0.0
+        for filepath in chunk:
+            start = time.perf_counter()
+            scenario = Scenario.load(filepath)
+            inputs, current_targets = preprocess(scenario)
+            inputs = {name: torch.from_numpy(value) for name, value in inputs.items()}
+            preprocess_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            with torch.no_grad():
+                pred_scores, pred_trajs = backend(**inputs)
+            inference_time += time.perf_counter() - start
+
+            pred_scores, pred_trajs = to_world_coords(pred_scores.numpy(), pred_trajs.numpy(), current_targets)
+            np.savez_compressed(
+                osp.join(cfg.output, f"{scenario.scenario_id}.npz"),
+                pred_scores=pred_scores,
+                pred_trajs=pred_trajs,
+                target_indices=scenario.target_indices,
+            )
+        result_queue.put((rank, len(chunk), preprocess_time, inference_time))
+
+
+def run_worker_pool(cfg: PoolConfig, filepaths: list[str], num_workers: int, chunk_size: int = 8) -> dict[str, float]:
+    """Predict scenarios with a pool of worker processes.
+
+    Args:
+    ----
+        cfg (PoolConfig): Configuration shared by workers.
+        filepaths (list[str]): Scenario files.
+        num_workers (int): Number of workers.
+        chunk_size (int, optional): Number of scenarios in each chunk. Defaults to 8.
+
+    Returns:
+    -------
+        dict[str, float]: Throughput in [scenarios/s], elapsed time and mean latencies of stages in [ms].
+
+    """
+    os.makedirs(cfg.output, exist_ok=True)
+    for name in THREAD_ENV_NAMES:
+        os.environ[name] = str(cfg.num_threads)
+
+    model = None
+    if cfg.share_weights == "memory":
+        model = _load_model(cfg)
+        model.share_memory()
+
+    ctx = mp.get_context("spawn")
+    task_queue, result_queue = ctx.Queue(), ctx.Queue()
+    for i in range(0, len(filepaths), chunk_size):
+        task_queue.put(filepaths[i : i + chunk_size])
+    for _ in range(num_workers):
+        task_queue.put(None)
+
+    start = time.perf_counter()
+    workers = [
+        ctx.Process(target=_worker, args=(rank, cfg, model, task_queue, result_queue), daemon=True)
+        for rank in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    num_done, preprocess_time, inference_time = 0, 0.0, 0.0
+    while num_done < len(filepaths):
+        try:
+            _, num_scenarios, chunk_preprocess, chunk_inference = result_queue.get(timeout=1.0)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                msg = f"All workers exited with {len(filepaths) - num_done} scenarios remaining"
+                raise RuntimeError(msg) from None
+            continue
+        num_done += num_scenarios
+        preprocess_time += chunk_preprocess
+        inference_time += chunk_inference
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.join()
+
+    # NOTE: elapsed time includes the model loading of workers
+    return {
+        "throughput": len(filepaths) / elapsed,
+        "elapsed": elapsed,
+        "preprocess": preprocess_time / len(filepaths) * 1e3,
+        "inference": inference_time / len(filepaths) * 1e3,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    filepaths = sorted(glob(osp.join(args.scenarios, "*.npz")))
+    if len(filepaths) == 0:
+        msg = f"No scenarios are found in {args.scenarios}"
+        raise FileNotFoundError(msg)
+
+    cfg = PoolConfig(
+        config=args.config,
+        checkpoint=args.checkpoint,
+        intention_point_file=args.intention_point_file,
+        labels=args.labels,
+        output=args.output,
+        map_file=args.map,
+        backend=args.backend,
+        num_threads=args.num_threads,
+        share_weights=args.share_weights,
+    )
+
+    base_throughput = None
+    for num_workers in args.num_workers:
+        report = run_worker_pool(cfg, filepaths, num_workers, chunk_size=args.chunk_size)
+        base_throughput = base_throughput or report["throughput"] / num_workers
+        print(
+            f"[workers={num_workers}, threads={args.num_threads}] {len(filepaths)} scenarios in "
+            f"{report['elapsed']:.2f}s, throughput: {report['throughput']:.2f} scenarios/s "
+            f"(scaling efficiency: {report['throughput'] / (base_throughput * num_workers):.2f}), "
+            f"preprocess: {report['preprocess']:.2f}ms, inference: {report['inference']:.2f}ms",
+        )
+
+
+if __name__ == "__main__":
+    main()